@@ -0,0 +1,92 @@
+"""
+Benchmark: latency of a cheap endpoint while large summaries are running,
+with analysis inline in the request threads vs. in the analysis process pool.
+
+Background threads keep POSTing a large log to /summarize (cache disabled by
+making every text unique); the main thread polls GET /network/status and
+records its latency. Also shows the pool's 503 backpressure once the queue is full.
+
+    python backend/benchmarks/bench_analysis_pool.py [--lines 8000] [--clients 3] [--seconds 8]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+import subprocess
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.append(SRC)
+
+POLL = "/network/status"
+
+WORDS = ["error", "timeout", "connection", "refused", "latency", "packet", "drop", "disk", "user", "login",
+         "service", "restart", "cpu", "memory", "warning", "critical", "gateway", "dns", "ssl", "port"]
+
+
+def log_text(lines, rng):
+    return "\n".join(" ".join(rng.choice(WORDS) for _ in range(8)) + f" id={rng.randint(0, 10 ** 9)}"
+                     for _ in range(lines))
+
+
+def measure(lines, clients, seconds):
+    import numpy as np
+    import api
+    api.get_pool().start()
+    client = api.app.test_client()
+    stop = threading.Event()
+    statuses = []
+
+    def load(seed):
+        rng = random.Random(seed)
+        while not stop.is_set():
+            statuses.append(client.post("/summarize", json={"log_text": log_text(lines, rng)}).status_code)
+
+    threads = [threading.Thread(target=load, args=(i,), daemon=True) for i in range(clients)]
+    for t in threads:
+        t.start()
+    time.sleep(0.5)
+    latencies = []
+    end = time.time() + seconds
+    while time.time() < end:
+        start = time.perf_counter()
+        client.get(POLL)
+        latencies.append(time.perf_counter() - start)
+        time.sleep(0.02)
+    stop.set()
+    for t in threads:
+        t.join()
+    ms = np.asarray(latencies) * 1000
+    print(f"  GET {POLL} p50={np.percentile(ms, 50):.2f}ms p99={np.percentile(ms, 99):.2f}ms max={ms.max():.1f}ms "
+          f"({len(ms)} polls); /summarize statuses: "
+          f"{ {s: statuses.count(s) for s in sorted(set(statuses))} }")
+    api.get_pool().shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=8000)
+    parser.add_argument("--clients", type=int, default=3)
+    parser.add_argument("--seconds", type=float, default=8)
+    parser.add_argument("--child", choices=["inline", "pool"])
+    args = parser.parse_args()
+
+    if args.child:
+        measure(args.lines, args.clients, args.seconds)
+        return
+    # Each mode in a fresh interpreter: the pool setting is read at import
+    for mode in ("inline", "pool"):
+        print(f"{mode}:", flush=True)
+        env = dict(os.environ, NEXOOPS_WARMUP="0", NEXOOPS_ANALYSIS_POOL="0" if mode == "inline" else "1")
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--child", mode, "--lines", str(args.lines),
+                        "--clients", str(args.clients), "--seconds", str(args.seconds)], cwd=SRC, env=env, check=True)
+
+    print("backpressure (1 worker, queue of 1, 6 concurrent clients):", flush=True)
+    env = dict(os.environ, NEXOOPS_WARMUP="0", NEXOOPS_ANALYSIS_WORKERS="1", NEXOOPS_ANALYSIS_QUEUE="1")
+    subprocess.run([sys.executable, os.path.abspath(__file__), "--child", "pool", "--lines", str(args.lines),
+                    "--clients", "6", "--seconds", str(args.seconds / 2)], cwd=SRC, env=env, check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark: shared connection snapshot vs. the legacy per-view table reads.
+
+Builds a synthetic 50k-row inet connection table (pids drawn from real running
+processes so name lookups hit psutil), then times one "dashboard refresh"
+(network stats + connections + listening ports + process usage) both ways.
+
+    python backend/benchmarks/bench_connection_snapshot.py [--rows 50000] [--rounds 5]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+from collections import namedtuple
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import psutil
+from netstats import ConnectionSnapshot
+
+Addr = namedtuple("Addr", ["ip", "port"])
+Conn = namedtuple("Conn", ["fd", "family", "type", "laddr", "raddr", "status", "pid"])
+
+
+def synthetic_table(rows, seed=42):
+    rng = random.Random(seed)
+    pids = psutil.pids()[:200] or [os.getpid()]
+    statuses = ['ESTABLISHED'] * 7 + ['LISTEN', 'TIME_WAIT', 'CLOSE_WAIT']
+    table = []
+    for i in range(rows):
+        status = rng.choice(statuses)
+        laddr = Addr(f"10.0.{rng.randint(0, 255)}.{rng.randint(1, 254)}", rng.randint(1, 65535))
+        raddr = None if status == 'LISTEN' else Addr(f"192.168.{rng.randint(0, 255)}.{rng.randint(1, 254)}", rng.randint(1024, 65535))
+        table.append(Conn(i, 2, 1, laddr, raddr, status, rng.choice(pids)))
+    return table
+
+
+def legacy_refresh(read_table):
+    """The four original views, each re-reading the table and resolving names per row."""
+    conns = read_table()
+    _ = (len([c for c in conns if c.status == 'ESTABLISHED']),
+         len([c for c in conns if c.status == 'LISTEN']), len(conns))
+
+    conns = read_table()
+    established = []
+    for c in conns:
+        if c.status == 'ESTABLISHED':
+            try:
+                proc = psutil.Process(c.pid).name() if c.pid else "Unknown"
+            except Exception:
+                proc = "Unknown"
+            established.append((c.laddr, c.raddr, c.pid, proc))
+
+    conns = read_table()
+    listening = []
+    for c in conns:
+        if c.status == 'LISTEN':
+            try:
+                proc = psutil.Process(c.pid).name() if c.pid else "Unknown"
+            except Exception:
+                proc = "Unknown"
+            listening.append((c.laddr, c.pid, proc))
+
+    conns = read_table()
+    usage = {}
+    for c in conns:
+        if c.pid:
+            try:
+                name = psutil.Process(c.pid).name()
+                usage[name] = usage.get(name, 0) + 1
+            except Exception:
+                pass
+
+
+def snapshot_refresh(snapshot):
+    snapshot.counts()
+    snapshot.established(limit=50)
+    snapshot.listening()
+    snapshot.process_usage()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    table = synthetic_table(args.rows)
+    reads = [0]
+
+    def read_table():
+        reads[0] += 1
+        return table
+
+    print(f"Synthetic table: {len(table):,} connections, {len({c.pid for c in table})} distinct pids")
+
+    reads[0] = 0
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        legacy_refresh(read_table)
+    legacy = (time.perf_counter() - start) / args.rounds
+    legacy_reads = reads[0] / args.rounds
+
+    snapshot = ConnectionSnapshot(max_age=3600, source=read_table)
+    reads[0] = 0
+    start = time.perf_counter()
+    for _ in range(args.rounds):
+        snapshot._refresh(force=True)
+        snapshot_refresh(snapshot)
+    shared = (time.perf_counter() - start) / args.rounds
+    shared_reads = reads[0] / args.rounds
+
+    print(f"legacy   : {legacy * 1000:9.1f} ms/refresh  ({legacy_reads:.0f} table reads)")
+    print(f"snapshot : {shared * 1000:9.1f} ms/refresh  ({shared_reads:.0f} table read)")
+    print(f"speedup  : {legacy / shared:9.1f}x")
+    print(f"name cache: {snapshot.names.stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark: numpy-only fast scorer vs. the sklearn pipeline it was exported from.
+
+Measures (1) cold start, i.e. a fresh interpreter importing what it needs,
+loading the stored artifact and scoring one line, and (2) warm single-line and
+batch latency in-process. It also checks that both give the same probabilities.
+
+    python backend/benchmarks/bench_fast_scorer.py [--rows 2000] [--cold-runs 5]
+
+Needs a stored alert model whose manifest lists a verified fast scorer
+(i.e. logistic regression was selected at training time).
+"""
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.append(SRC)
+
+import numpy as np
+
+LINE = "authentication failed for user root from IPADDR"
+
+COLD_SCORER = f"""
+from log_features import clean_text, extract_features, FEATURE_COLUMNS
+from fast_scorer import LinearSeverityScorer
+from model_store import ModelStore
+store = ModelStore("alert_model")
+scorer = LinearSeverityScorer.load(store.sidecar_path("scorer.npz"))
+t = clean_text({LINE!r}); f = extract_features(t)
+scorer.predict_proba([t], [[f[c] for c in FEATURE_COLUMNS]])
+"""
+
+COLD_PIPELINE = f"""
+import pandas as pd
+from log_features import clean_text, extract_features
+from model_store import ModelStore
+model, _ = ModelStore("alert_model").load()
+t = clean_text({LINE!r})
+model.predict_proba(pd.DataFrame([dict(extract_features(t), text=t)]))
+"""
+
+
+def cold_start(code, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=SRC, check=True)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)) * 1000
+
+
+def percentiles(samples):
+    return (float(np.percentile(samples, 50)) * 1000, float(np.percentile(samples, 99)) * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--cold-runs", type=int, default=5)
+    args = parser.parse_args()
+
+    import pandas as pd
+    from alert_classifier import load_training_data, MODEL_STORE, SCORER_SUFFIX, FEATURE_COLUMNS
+    from fast_scorer import LinearSeverityScorer
+
+    manifest = MODEL_STORE.manifest()
+    if not manifest or not (manifest.get("fast_scorer") or {}).get("verified"):
+        sys.exit("Stored model has no verified fast scorer; train with logistic regression selected first.")
+    pipeline, _ = MODEL_STORE.load()
+    scorer = LinearSeverityScorer.load(MODEL_STORE.sidecar_path(SCORER_SUFFIX, manifest))
+
+    df = load_training_data().head(args.rows)
+    frame = pd.concat([df['cleaned_text'].rename('text'), df[FEATURE_COLUMNS]], axis=1)
+    texts = frame['text'].tolist()
+    features = frame[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    print(f"artifact v{manifest['version']}: max |p_pipeline - p_scorer| over {len(frame)} rows = "
+          f"{scorer.max_difference(pipeline, frame):.2e}")
+
+    pipe_single, fast_single = [], []
+    for i in range(len(frame)):
+        row = pd.DataFrame([dict(zip(FEATURE_COLUMNS, features[i]), text=texts[i])])
+        start = time.perf_counter()
+        pipeline.predict_proba(row)
+        pipe_single.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        scorer.predict_proba(texts[i:i + 1], features[i:i + 1])
+        fast_single.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    pipeline.predict_proba(frame)
+    pipe_batch = (time.perf_counter() - start) * 1000 / len(frame)
+    start = time.perf_counter()
+    scorer.predict_proba(texts, features)
+    fast_batch = (time.perf_counter() - start) * 1000 / len(frame)
+
+    print("single line (incl. building the request row):")
+    print("  pipeline  p50=%.3fms p99=%.3fms" % percentiles(pipe_single))
+    print("  scorer    p50=%.3fms p99=%.3fms" % percentiles(fast_single))
+    print(f"batch of {len(frame)}: pipeline {pipe_batch:.4f}ms/row, scorer {fast_batch:.4f}ms/row")
+
+    print(f"cold start (fresh interpreter, import + load + one prediction, median of {args.cold_runs}):")
+    print(f"  pipeline  {cold_start(COLD_PIPELINE, args.cold_runs):.0f}ms")
+    print(f"  scorer    {cold_start(COLD_SCORER, args.cold_runs):.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
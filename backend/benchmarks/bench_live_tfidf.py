@@ -0,0 +1,83 @@
+"""
+Benchmark: `summarize logs` over LogStorage with the live hashed TF-IDF vs.
+refitting TfidfVectorizer over the whole window on every request.
+
+Fills a store with synthetic network log entries, then repeats "append a
+batch of new entries, summarize the window" and times the vectorize step and
+the whole summary both ways. Also reports how many summary lines agree.
+
+    python backend/benchmarks/bench_live_tfidf.py [--logs 10000] [--batch 100] [--rounds 10]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import numpy as np
+from chatbot import LogStorage
+from summary_engine import get_engine
+
+MESSAGES = [
+    "Ping to {ip} timeout after {n} ms", "Port scan of {ip} complete: {n} open ports",
+    "DNS lookup for host{n}.example.com failed", "Connection refused by {ip}:{n}",
+    "Bandwidth test: {n} Mbps down", "SSL certificate for {ip} expires in {n} days",
+    "Interface eth{n} up", "Packet loss {n}% to gateway {ip}", "Subnet scan found {n} hosts",
+    "Critical alert: CPU at {n}% on {ip}", "Warning: latency {n} ms on route to {ip}"
+]
+
+
+def entry(rng):
+    ip = ".".join(str(rng.randint(1, 254)) for _ in range(4))
+    return rng.choice(MESSAGES).format(ip=ip, n=rng.randint(1, 999))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logs", type=int, default=10000)
+    parser.add_argument("--batch", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    engine = get_engine("network")
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)  # LogStorage appends to ./network_logs.txt
+        storage = LogStorage(max_logs=args.logs)
+        for _ in range(args.logs):
+            storage.add(entry(rng))
+        storage.tfidf.transform([0])  # hash the initial fill outside the timed rounds
+
+        refit, live, refit_vec, live_vec, agree = [], [], [], [], []
+        for _ in range(args.rounds):
+            for _ in range(args.batch):
+                storage.add(entry(rng))
+            text = storage.get_text()
+
+            start = time.perf_counter()
+            old = engine.run(text, use_cache=False)
+            refit.append(time.perf_counter() - start)
+            refit_vec.append(old["timings_ms"]["vectorize"])
+
+            start = time.perf_counter()
+            vectors = storage.tfidf.transform()
+            new = engine.run(text, use_cache=False, vectors=vectors)
+            live.append(time.perf_counter() - start)
+            live_vec.append(new["timings_ms"]["vectorize"] + (live[-1] * 1000 - sum(new["timings_ms"].values())))
+
+            old_lines = set(old["summary"].splitlines()[2:])
+            agree.append(len(old_lines & set(new["summary"].splitlines()[2:])) / max(1, len(old_lines)))
+
+        print(f"{args.logs} stored entries, {args.batch} new per round, median of {args.rounds} rounds:")
+        print(f"  refit  total {np.median(refit) * 1000:8.1f}ms  vectorize {np.median(refit_vec):8.1f}ms")
+        print(f"  live   total {np.median(live) * 1000:8.1f}ms  vectorize {np.median(live_vec):8.1f}ms "
+              f"(incl. hashing new rows + idf)")
+        print(f"  summary lines shared with the refit summary: {np.mean(agree):.0%}")
+        print(f"  live tf-idf state: {storage.tfidf.stats()}")
+
+
+if __name__ == "__main__":
+    main()
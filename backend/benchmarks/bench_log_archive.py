@@ -0,0 +1,111 @@
+"""
+Benchmark: "errors per device per hour over 30 days" from the text log vs.
+from the columnar archive.
+
+Writes --entries synthetic entries spread over 30 days in LogStorage's
+"[iso-timestamp] content" format. The text path is what answering the query
+takes today: read every line, match the line regex, parse the header of the
+content and count in Python. The archive path compacts the file once (timed
+separately) and then answers with LogArchive.aggregate, which memory-maps
+only the ts, level and device columns. Also reports on-disk sizes.
+
+    python backend/benchmarks/bench_log_archive.py [--entries 2000000]
+"""
+import os
+import re
+import sys
+import time
+import random
+import argparse
+import tempfile
+from collections import Counter
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from log_records import content_match, LEVEL_SEVERITY
+from log_archive import LogArchive, compact
+
+DEVICES = [f"{kind}-{n}" for kind in ("Router", "Switch", "FW", "AP") for n in range(1, 26)]
+LEVELS = ["INFO"] * 6 + ["WARN"] * 3 + ["ERROR", "CRITICAL"]
+MESSAGES = ["BGP neighbor 10.0.{a}.{b} flapped", "Interface Gi0/{a} changed state to down",
+            "CPU at {a}% on line card {b}", "ACL deny tcp 10.1.{a}.{b} -> 10.0.0.1:443",
+            "DHCP pool {a} exhausted", "Fan {b} speed {a} rpm"]
+
+
+def write_log(path, entries, now, rng):
+    start = now - timedelta(days=30)
+    step = 30 * 86400 / entries
+    with open(path, "w") as f:
+        for i in range(entries):
+            ts = (start + timedelta(seconds=i * step)).isoformat()
+            message = rng.choice(MESSAGES).format(a=rng.randint(0, 255), b=rng.randint(1, 254))
+            f.write(f"[{ts}] {rng.choice(LEVELS)} {rng.choice(DEVICES)}: {message}\n")
+
+
+def text_query(path, since):
+    """Errors per device per hour, the way the text log has to be read."""
+    line_re = re.compile(r'\[(.*?)\] (.*)')
+    errors = {level for level, severity in LEVEL_SEVERITY.items() if severity in ("High", "Critical")}
+    counts = Counter()
+    with open(path) as f:
+        for line in f:
+            m = line_re.match(line)
+            if not m or m.group(1) < since:
+                continue
+            header = content_match(m.group(2))
+            if header and header.group("level").upper() in errors:
+                counts[(header.group("source"), m.group(1)[:13])] += 1
+    return counts
+
+
+def size_of(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=2000000)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    now = datetime.now().replace(microsecond=0)
+    since = now - timedelta(days=30)
+    with tempfile.TemporaryDirectory() as tmp:
+        log = os.path.join(tmp, "network_logs.txt")
+        write_log(log, args.entries, now, rng)
+        text_bytes = size_of(log)
+
+        start = time.perf_counter()
+        expected = text_query(log, since.isoformat())
+        text_s = time.perf_counter() - start
+
+        archive = LogArchive(os.path.join(tmp, "archive"))
+        start = time.perf_counter()
+        result = compact(log, archive, keep_hours=0, now=now + timedelta(seconds=1))
+        compact_s = time.perf_counter() - start
+
+        best = float("inf")
+        for _ in range(3):
+            start = time.perf_counter()
+            counts = archive.aggregate(("device", "hour"), severities=("High", "Critical"), since=since)
+            best = min(best, time.perf_counter() - start)
+        got = {(g["device"], g["hour"][:13]): g["count"] for g in counts["groups"]}
+
+        archive_bytes = size_of(archive.root)
+        column_bytes = sum(size_of(os.path.join(path, f"{c}.npy")) for path, _ in archive.partitions()
+                           for c in ("ts", "level", "device"))
+        print(f"{args.entries} entries over 30 days, {text_bytes / 1e6:.0f} MB of text")
+        print(f"  text scan:        {text_s:7.2f} s")
+        print(f"  compaction:       {compact_s:7.2f} s once ({result['archived']} rows archived)")
+        print(f"  archive query:    {best * 1000:7.1f} ms  ({text_s / best:,.0f}x), "
+              f"reads {column_bytes / 1e6:.0f} MB of columns")
+        print(f"  archive on disk:  {archive_bytes / 1e6:.0f} MB (text blob included)")
+        print(f"  {len(got)} device-hours, {counts['total']} errors; "
+              f"{'same counts as the text scan' if got == dict(expected) else 'COUNTS DIFFER from the text scan'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark: log search with the inverted index vs. a linear scan.
+
+Indexes synthetic network log entries spread over the last --days, then runs
+incident-style queries (an IP or an interface, a boolean combination, and
+the same over the last 6 hours) both through LogIndex.search and as a scan
+that lowercases and substring-matches every stored entry, the way `show logs`
+output would have to be grepped. Reports index build rate, memory per entry
+and query latency. Hit counts differ where substring and term matching
+disagree: the scan's 10.0.3.7 also matches 10.0.3.70, while the index's
+gi0/24 also finds GigabitEthernet0/24.
+
+    python backend/benchmarks/bench_log_index.py [--entries 1000000] [--days 7]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from log_index import LogIndex
+
+MESSAGES = [
+    "Ping to {ip} timeout after {n} ms", "Interface Gi0/{port} changed state to down",
+    "Interface GigabitEthernet0/{port} changed state to up", "Connection refused by {ip}:{n}",
+    "BGP neighbor {ip} flapped", "Packet loss {n}% to gateway {ip}", "DHCP lease for {ip} renewed",
+    "Critical alert: CPU at {n}% on {ip}", "Warning: latency {n} ms on route to {ip}",
+    "ACL deny tcp {ip} -> 10.0.0.1:{n} on Te1/0/{port}"
+]
+QUERIES = [
+    ("ip", "10.0.3.7", None),
+    ("ip OR interface", "10.0.3.7 OR gi0/24", None),
+    ("ip OR interface, last 6h", "10.0.3.7 OR gi0/24", 6),
+    ("words AND, exclude", "interface down -gi0/1", None),
+]
+
+
+def entry(rng):
+    ip = f"10.0.{rng.randint(0, 15)}.{rng.randint(1, 254)}"
+    return rng.choice(MESSAGES).format(ip=ip, n=rng.randint(1, 999), port=rng.randint(1, 48))
+
+
+def scan(entries, query, since):
+    """What a search costs without an index: every entry is lowercased and tested."""
+    branches, excluded = [], []
+    for branch in query.split(" OR "):
+        words = branch.lower().split()
+        excluded += [w[1:] for w in words if w.startswith("-")]
+        branches.append([w for w in words if not w.startswith("-")])
+    hits = []
+    for ts, text in entries:
+        if since is not None and ts < since:
+            continue
+        lowered = text.lower()
+        if any(all(w in lowered for w in branch) for branch in branches) and not any(w in lowered for w in excluded):
+            hits.append(ts)
+    return hits
+
+
+def timed(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=1000000)
+    parser.add_argument("--days", type=float, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(7)
+    now = time.time()
+    span = args.days * 86400
+    entries = [(now - span + span * i / args.entries, entry(rng)) for i in range(args.entries)]
+
+    index = LogIndex(max_docs=args.entries)
+    start = time.perf_counter()
+    for ts, text in entries:
+        index.add(ts, text)
+    build = time.perf_counter() - start
+    # Memory is traced on a separate, smaller build: tracing slows indexing down
+    sample = entries[:min(len(entries), 100000)]
+    tracemalloc.start()
+    traced = LogIndex(max_docs=len(sample))
+    for ts, text in sample:
+        traced.add(ts, text)
+    memory = tracemalloc.get_traced_memory()[0] / len(sample)
+    tracemalloc.stop()
+    del traced
+    print(f"indexed {args.entries} entries over {args.days:g} days in {build:.1f}s "
+          f"({args.entries / build:,.0f}/s), ~{memory:.0f} bytes/entry, {index.stats()}")
+
+    for name, query, hours in QUERIES:
+        since = now - hours * 3600 if hours else None
+        index_ms, seqs = timed(lambda: index.search(query, since=since))
+        scan_ms, hits = timed(lambda: scan(entries, query, since), repeat=1)
+        print(f"  {name:<26} {len(seqs):>7} hits  index {index_ms:8.2f} ms   scan {scan_ms:8.1f} ms"
+              f"   ({scan_ms / index_ms:,.0f}x){'' if len(seqs) == len(hits) else f'  [scan found {len(hits)}]'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Benchmark: per-worker memory of the model artifacts, loaded normally vs. memory-mapped.
+
+Starts N worker processes that each load the stored artifacts (the served alert
+model and the online learner) the way an API worker does, touch every array so
+all pages are resident, then hold the model while memory is measured. RSS
+counts shared pages in every process; PSS splits them between the processes
+mapping them, so the PSS sum is the real physical cost of N workers.
+
+    python backend/benchmarks/bench_model_mmap.py [--workers 1 8] [--names alert_model alert_online]
+
+Run the API (or train a model) first so the store has artifacts to load.
+"""
+import os
+import sys
+import time
+import argparse
+import multiprocessing as mp
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+import numpy as np
+import psutil
+
+MB = 1024 * 1024
+
+
+def iter_arrays(obj, seen=None):
+    """Every numpy array reachable from a fitted estimator's attributes."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        yield obj
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            yield from iter_arrays(value, seen)
+    elif isinstance(obj, (list, tuple)):
+        for value in obj:
+            yield from iter_arrays(value, seen)
+    elif hasattr(obj, "__dict__"):
+        yield from iter_arrays(vars(obj), seen)
+
+
+def memory():
+    info = psutil.Process().memory_full_info()
+    return {"rss": info.rss, "uss": info.uss, "pss": getattr(info, "pss", info.uss)}
+
+
+def worker(names, mmap_mode, ready, release, results):
+    # Import what unpickling pulls in up front, so the baseline already includes the libraries
+    import sklearn.pipeline, sklearn.compose, sklearn.preprocessing, sklearn.feature_extraction.text  # noqa: E401
+    import sklearn.linear_model, sklearn.ensemble, sklearn.svm  # noqa: E401
+    from model_store import ModelStore
+
+    before = memory()
+    models = []
+    array_bytes = 0
+    mapped_bytes = 0
+    for name in names:
+        model, _ = ModelStore(name).load(mmap_mode=mmap_mode)
+        if model is None:
+            continue
+        models.append(model)
+        for array in iter_arrays(model):
+            if array.dtype.kind in "biuf":
+                # Fault every page in, as a warm worker would after serving traffic
+                float(array.sum())
+            if array.dtype != object:
+                array_bytes += array.nbytes
+                if isinstance(array, np.memmap):
+                    mapped_bytes += array.nbytes
+
+    ready.wait()
+    after = memory()
+    results.put({
+        "pid": os.getpid(),
+        "artifacts": len(models),
+        "array_mb": array_bytes / MB,
+        "mapped_mb": mapped_bytes / MB,
+        **{f"{k}_mb": (after[k] - before[k]) / MB for k in after}
+    })
+    release.wait()
+
+
+def run(workers, names, mmap_mode):
+    ctx = mp.get_context("spawn")
+    ready, release = ctx.Barrier(workers), ctx.Barrier(workers + 1)
+    results = ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(names, mmap_mode, ready, release, results))
+             for _ in range(workers)]
+    for p in procs:
+        p.start()
+    rows = [results.get(timeout=300) for _ in procs]
+    release.wait()
+    for p in procs:
+        p.join()
+    return rows
+
+
+def summarize(label, workers, rows):
+    mean = lambda key: sum(r[key] for r in rows) / len(rows)
+    total_pss = sum(r["pss_mb"] for r in rows)
+    print(f"  {label:<8} workers={workers}  arrays={mean('array_mb'):7.2f}MB  mapped={mean('mapped_mb'):7.2f}MB  "
+          f"rss/worker={mean('rss_mb'):7.2f}MB  uss/worker={mean('uss_mb'):7.2f}MB  "
+          f"pss/worker={mean('pss_mb'):7.2f}MB  pss total={total_pss:7.2f}MB")
+    return total_pss
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--names", nargs="+", default=["alert_model", "alert_online"])
+    args = parser.parse_args()
+
+    from model_store import ModelStore
+    for name in args.names:
+        manifest = ModelStore(name).manifest()
+        size = os.path.getsize(ModelStore(name).artifact_path(manifest)) / MB if manifest else 0
+        print(f"{name}: " + (f"v{manifest['version']} {size:.2f}MB on disk" if manifest else "no artifact"))
+
+    print("Memory added by loading the artifacts (delta over an idle worker):")
+    for workers in args.workers:
+        start = time.perf_counter()
+        before = summarize("before", workers, run(workers, args.names, None))
+        after = summarize("after", workers, run(workers, args.names, "r"))
+        print(f"  -> {workers} workers: {before:.2f}MB -> {after:.2f}MB physical "
+              f"({before - after:+.2f}MB saved, {time.perf_counter() - start:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
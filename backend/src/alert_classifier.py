@@ -12,82 +12,352 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import accuracy_score
 from sklearn.compose import ColumnTransformer
 from sklearn.preprocessing import StandardScaler
-from datetime import datetime
+from log_features import (clean_text, extract_features, _CLEAN_STEPS, FEATURE_COLUMNS,
+                          CRITICAL_KEYWORDS, WARNING_KEYWORDS, INFO_KEYWORDS)
+from model_store import ModelStore, fingerprint
+from fast_scorer import LinearSeverityScorer
+from online_learner import OnlineSeverityLearner, blend_probabilities, SEVERITIES
+from log_records import parse_records
+from template_cache import TemplateCache
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
+import threading
+import time
+import os
 import warnings
 warnings.filterwarnings('ignore')
 
 # -----------------------------
-# CLEAN LOG TEXT
+# VECTORIZED CLEANING & FEATURES
 # -----------------------------
-def clean_text(text):
-    if not isinstance(text, str):
-        return ""
-    text = text.lower()
-    text = re.sub(r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}', ' IPADDR ', text)
-    text = re.sub(r'\[.*?\]', ' ', text)
-    text = re.sub(r'\{.*?\}', ' ', text)
-    text = re.sub(r'\(.*?\)', ' ', text)
-    text = re.sub(r'\b(0x)?[0-9a-f]+\b', ' HEX ', text)
-    text = re.sub(r'\b\d+\b', ' NUM ', text)
-    text = re.sub(r'[^a-z\s]', ' ', text)
-    text = re.sub(r'\s+', ' ', text).strip()
-    return text
+def clean_text_series(texts):
+    """clean_text() over a whole pandas Series using vectorized .str operations."""
+    texts = texts.fillna("").astype(str).str.lower()
+    for pattern, repl in _CLEAN_STEPS:
+        texts = texts.str.replace(pattern, repl, regex=True)
+    return texts.str.strip()
+
+def extract_features_frame(texts):
+    """extract_features() for a whole Series at once, without per-row apply(pd.Series)."""
+    def keyword_hits(words):
+        return sum(texts.str.contains(word, regex=False).astype(np.int32) for word in words)
+    return pd.DataFrame({
+        'char_count': texts.str.len().astype(np.int32),
+        'word_count': texts.str.count(r'\S+').astype(np.int32),
+        'critical_words': keyword_hits(CRITICAL_KEYWORDS),
+        'warning_words': keyword_hits(WARNING_KEYWORDS),
+        'info_words': keyword_hits(INFO_KEYWORDS)
+    }, index=texts.index)
 
 # -----------------------------
-# FEATURE EXTRACTION
+# GENERATE SYNTHETIC LOG DATA FOR TRAINING
 # -----------------------------
-def extract_features(text):
-    features = {}
-    features['char_count'] = len(text)
-    features['word_count'] = len(text.split())
-    critical_keywords = ['error', 'failed', 'critical', 'fatal', 'panic', 'crash', 'corruption', 'breach']
-    warning_keywords = ['warning', 'timeout', 'slow', 'high', 'full', 'exceeded', 'congestion']
-    info_keywords = ['success', 'completed', 'started', 'normal', 'stable']
-    features['critical_words'] = sum(1 for word in critical_keywords if word in text)
-    features['warning_words'] = sum(1 for word in warning_keywords if word in text)
-    features['info_words'] = sum(1 for word in info_keywords if word in text)
-    return features
+LOG_TEMPLATES = {
+    'Low': ["system rebooted successfully at TIMESTAMP", "service SERVICE started normally", "configuration file CONFIG loaded successfully"],
+    'Medium': ["minor delay detected in response time for SERVICE", "network latency slightly above normal on INTERFACE"],
+    'High': ["disk usage at NUM percent warning issued", "connection timeout detected multiple times for SERVICE"],
+    'Critical': ["authentication failed for user root from IPADDR", "database connection lost during backup operation"]
+}
+SEVERITY_WEIGHTS = [0.4, 0.3, 0.2, 0.1]
+PLACEHOLDER_VALUES = {
+    'SERVICE': ['ssh','httpd','mysql','nginx','redis'],
+    'CONFIG': ['/etc/app.conf','config.yaml','settings.json'],
+    'INTERFACE': ['eth0','eth1','bond0','wlan0']
+}
+# Everything that determines the generated dataset. Bump `revision` when the
+# generator changes in a way the other fields don't capture.
+DATASET_CONFIG = {
+    "revision": 2,
+    "n_samples": int(os.environ.get("NEXOOPS_TRAIN_SAMPLES", "5000")),
+    "seed": 42,
+    "templates": LOG_TEMPLATES,
+    "severity_weights": SEVERITY_WEIGHTS,
+    "placeholder_values": PLACEHOLDER_VALUES
+}
+
+# Everything that determines the trained model.
+TRAINING_CONFIG = dict(DATASET_CONFIG, feature_columns=FEATURE_COLUMNS)
+
+DATASET_CACHE_DIR = os.environ.get(
+    "NEXOOPS_DATASET_CACHE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "datasets")
+)
+
+_PLACEHOLDER_RE = re.compile(r'(TIMESTAMP|SERVICE|IPADDR|CONFIG|INTERFACE|NUM)')
+
+def _placeholder_column(name, rng, n):
+    """n random fill values for one placeholder, as a numpy string array."""
+    if name in PLACEHOLDER_VALUES:
+        return np.asarray(PLACEHOLDER_VALUES[name])[rng.integers(0, len(PLACEHOLDER_VALUES[name]), n)]
+    if name == 'NUM':
+        return rng.integers(1, 100, n).astype(str)
+    if name == 'IPADDR':
+        octets = rng.integers(1, 255, (n, 4)).astype(str)
+        ip = octets[:, 0]
+        for k in range(1, 4):
+            ip = np.char.add(np.char.add(ip, '.'), octets[:, k])
+        return ip
+    if name == 'TIMESTAMP':
+        seconds = np.datetime64('2025-01-01T00:00:00') + rng.integers(0, 365 * 86400, n).astype('timedelta64[s]')
+        return np.char.replace(np.datetime_as_string(seconds, unit='s'), 'T', ' ')
+    raise ValueError(f"Unknown placeholder {name}")
+
+def generate_enterprise_logs(n_samples=5000, seed=42):
+    """
+    Labeled synthetic logs, generated column-wise: severities, template choices
+    and placeholder values are drawn as whole arrays and each template's rows
+    are assembled with numpy string ops, so millions of rows take seconds.
+    """
+    rng = np.random.default_rng(seed)
+    severities = list(LOG_TEMPLATES)
+    flat = [(sev, tmpl) for sev in severities for tmpl in LOG_TEMPLATES[sev]]
+    counts = np.array([len(LOG_TEMPLATES[sev]) for sev in severities])
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+    sev_idx = rng.choice(len(severities), size=n_samples, p=SEVERITY_WEIGHTS)
+    tmpl_idx = offsets[sev_idx] + (rng.random(n_samples) * counts[sev_idx]).astype(np.int64)
+
+    summary = np.empty(n_samples, dtype=object)
+    for t, (_, template) in enumerate(flat):
+        rows = np.flatnonzero(tmpl_idx == t)
+        if not len(rows):
+            continue
+        text = np.full(len(rows), '', dtype='<U1')
+        for part in _PLACEHOLDER_RE.split(template):
+            if _PLACEHOLDER_RE.fullmatch(part):
+                text = np.char.add(text, _placeholder_column(part, rng, len(rows)))
+            elif part:
+                text = np.char.add(text, part)
+        summary[rows] = text
+
+    return pd.DataFrame({"summary": summary.astype(str), "severity": np.asarray(severities)[sev_idx]})
+
+def _dataset_cache_path(config):
+    return os.path.join(DATASET_CACHE_DIR, f"training-{fingerprint(config)[:16]}.npz")
+
+def load_training_data(n_samples=None, seed=None, use_cache=True):
+    """
+    Generated training frame with cleaned text and numeric features.
+    Results are cached as an uncompressed .npz of columns keyed by the generator
+    config, so repeat trainings skip generation and featurization entirely.
+    """
+    config = dict(DATASET_CONFIG)
+    if n_samples is not None:
+        config["n_samples"] = n_samples
+    if seed is not None:
+        config["seed"] = seed
+    path = _dataset_cache_path(config)
+
+    if use_cache and os.path.exists(path):
+        try:
+            with np.load(path, allow_pickle=False) as cached:
+                return pd.DataFrame({name: cached[name] for name in cached.files})
+        except Exception as e:
+            print(f"Ignoring unreadable dataset cache {path}: {e}")
+
+    df = generate_enterprise_logs(config["n_samples"], config["seed"])
+    df['cleaned_text'] = clean_text_series(df['summary'])
+    df = pd.concat([df, extract_features_frame(df['summary'])], axis=1)
+
+    if use_cache:
+        try:
+            os.makedirs(DATASET_CACHE_DIR, exist_ok=True)
+            tmp = f"{path}.tmp-{os.getpid()}"
+            with open(tmp, "wb") as f:
+                np.savez(f, **{col: df[col].to_numpy(dtype=str if df[col].dtype == object else None)
+                              for col in df.columns})
+            os.replace(tmp, path)
+        except OSError as e:
+            print(f"Could not write dataset cache: {e}")
+    return df
 
 # -----------------------------
-# GENERATE SYNTHETIC LOG DATA FOR TRAINING
+# CANDIDATE MODELS
 # -----------------------------
-def generate_enterprise_logs(n_samples=5000):
-    np.random.seed(42)
-    templates = {
-        'Low': ["system rebooted successfully at TIMESTAMP", "service SERVICE started normally", "configuration file CONFIG loaded successfully"],
-        'Medium': ["minor delay detected in response time for SERVICE", "network latency slightly above normal on INTERFACE"],
-        'High': ["disk usage at NUM percent warning issued", "connection timeout detected multiple times for SERVICE"],
-        'Critical': ["authentication failed for user root from IPADDR", "database connection lost during backup operation"]
+TRAIN_WORKERS = int(os.environ.get("NEXOOPS_TRAIN_WORKERS", "0")) or None
+TRAIN_MEMORY_MB = int(os.environ.get("NEXOOPS_TRAIN_MEMORY_MB", "2048"))
+
+# Model selection policy: a p99 single-row latency budget and/or an accuracy
+# penalty per millisecond of p50 single-row latency. Unset means accuracy only,
+# with ties going to the faster model.
+SELECTION_POLICY = {
+    "latency_budget_ms": float(os.environ["NEXOOPS_LATENCY_BUDGET_MS"]) if os.environ.get("NEXOOPS_LATENCY_BUDGET_MS") else None,
+    "accuracy_per_ms": float(os.environ["NEXOOPS_ACCURACY_PER_MS"]) if os.environ.get("NEXOOPS_ACCURACY_PER_MS") else None
+}
+
+def candidate_models(n_jobs=1):
+    """Candidate classifiers; `n_jobs` is the core budget for estimators that can use it."""
+    return {
+        'random_forest': RandomForestClassifier(n_estimators=200, random_state=42, n_jobs=n_jobs),
+        'svm': SVC(probability=True, random_state=42),
+        'logistic_regression': LogisticRegression(max_iter=1000, random_state=42)
     }
 
-    severity_weights = [0.4, 0.3, 0.2, 0.1]
-    data = []
-    for _ in range(n_samples):
-        severity = np.random.choice(['Low','Medium','High','Critical'], p=severity_weights)
-        template = np.random.choice(templates[severity])
-        log_entry = template.replace('TIMESTAMP', datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
-        log_entry = log_entry.replace('SERVICE', np.random.choice(['ssh','httpd','mysql','nginx','redis']))
-        log_entry = log_entry.replace('IPADDR', f"{np.random.randint(1,255)}.{np.random.randint(1,255)}.{np.random.randint(1,255)}.{np.random.randint(1,255)}")
-        log_entry = log_entry.replace('CONFIG', np.random.choice(['/etc/app.conf','config.yaml','settings.json']))
-        log_entry = log_entry.replace('INTERFACE', np.random.choice(['eth0','eth1','bond0','wlan0']))
-        log_entry = log_entry.replace('NUM', str(np.random.randint(1,100)))
-        data.append((log_entry, severity))
-    return pd.DataFrame(data, columns=["summary","severity"])
-
-def load_training_data():
-    df = generate_enterprise_logs(5000)
-    df['cleaned_text'] = df['summary'].apply(clean_text)
-    feature_data = df['summary'].apply(extract_features).apply(pd.Series)
-    df = pd.concat([df, feature_data], axis=1)
-    return df
+def _matrix_nbytes(X):
+    if hasattr(X, 'data') and hasattr(X, 'indices'):
+        return X.data.nbytes + X.indices.nbytes + X.indptr.nbytes
+    return getattr(X, 'nbytes', 0)
+
+def _fit_candidate(name, model, X_train, y_train, X_test, y_test):
+    """Fit one classifier on pre-transformed features; runs inside a pool worker."""
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred = model.predict(X_test)
+    predict_seconds = time.perf_counter() - start
+
+    return name, model, {
+        "accuracy": round(accuracy_score(y_test, y_pred), 4),
+        "fit_seconds": round(fit_seconds, 3),
+        "predict_ms_per_row": round(predict_seconds * 1000 / X_test.shape[0], 4)
+    }
+
+def fit_candidates(X_train, y_train, X_test, y_test, max_workers=None, memory_mb=TRAIN_MEMORY_MB):
+    """
+    Fit every candidate concurrently in a process pool.
+
+    Workers receive the already-transformed feature matrices, so the shared
+    TF-IDF/scaler step is fitted once rather than once per candidate. Pool size
+    is capped by the candidate count, the CPU count and a memory budget (each
+    worker holds its own copy of the training matrices); the cores left over
+    go to estimators that support n_jobs.
+    """
+    cpus = os.cpu_count() or 1
+    n_candidates = len(candidate_models())
+    payload_mb = max(1, 3 * (_matrix_nbytes(X_train) + _matrix_nbytes(X_test)) // (1024 * 1024))
+    workers = min(max_workers or cpus, n_candidates, cpus, max(1, memory_mb // payload_mb))
+    models = candidate_models(n_jobs=max(1, cpus // workers))
+
+    results = {}
+    if workers > 1:
+        try:
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                futures = [pool.submit(_fit_candidate, name, model, X_train, y_train, X_test, y_test)
+                           for name, model in models.items()]
+                for future in as_completed(futures):
+                    name, model, metrics = future.result()
+                    results[name] = (model, metrics)
+            return results, workers
+        except Exception as e:
+            print(f"Parallel training failed, fitting sequentially: {e}")
+            results = {}
+            models = candidate_models(n_jobs=cpus)
+
+    for name, model in models.items():
+        name, model, metrics = _fit_candidate(name, model, X_train, y_train, X_test, y_test)
+        results[name] = (model, metrics)
+    return results, 1
+
+# -----------------------------
+# LATENCY PROFILING & SELECTION
+# -----------------------------
+def _percentile_ms(samples, q):
+    return round(float(np.percentile(samples, q)) * 1000, 4)
+
+def _latency_profile(predict, n, single_rows=200, batch_size=256):
+    """p50/p99 of predict(rows) for single held-out rows and for fixed-size batches."""
+    rng = np.random.RandomState(0)
+    rows = rng.choice(n, size=min(single_rows, n), replace=False)
+
+    predict([rows[0]])  # warm-up
+    single = []
+    for i in rows:
+        start = time.perf_counter()
+        predict([i])
+        single.append(time.perf_counter() - start)
+
+    batch = []
+    for lo in range(0, n, batch_size):
+        chunk = slice(lo, min(lo + batch_size, n))
+        start = time.perf_counter()
+        predict(chunk)
+        batch.append((time.perf_counter() - start) / (chunk.stop - chunk.start))
+
+    return {
+        "single_p50_ms": _percentile_ms(single, 50),
+        "single_p99_ms": _percentile_ms(single, 99),
+        "batch_size": batch_size,
+        "batch_row_p50_ms": _percentile_ms(batch, 50),
+        "batch_row_p99_ms": _percentile_ms(batch, 99)
+    }
+
+def profile_latency(pipeline, X_test_combined, single_rows=200, batch_size=256):
+    """
+    p50/p99 inference latency of a full pipeline on held-out rows, both for
+    single-row requests (what /classify does) and for fixed-size batches.
+    """
+    return _latency_profile(lambda rows: pipeline.predict_proba(X_test_combined.iloc[rows]),
+                            len(X_test_combined), single_rows, batch_size)
+
+def select_model(candidates, latency_budget_ms=None, accuracy_per_ms=None):
+    """
+    Pick a candidate name from {name: metrics-with-latency}.
+    Candidates over the p99 budget are excluded (the fastest one wins if none
+    fit); the rest are ranked by accuracy minus `accuracy_per_ms` x p50 latency,
+    with lower latency breaking ties. Returns (name, reason).
+    """
+    names = list(candidates)
+    if latency_budget_ms is not None:
+        within = [n for n in names if candidates[n]["latency"]["single_p99_ms"] <= latency_budget_ms]
+        if not within:
+            fastest = min(names, key=lambda n: candidates[n]["latency"]["single_p99_ms"])
+            return fastest, f"no candidate within {latency_budget_ms}ms p99 budget, chose fastest"
+        names = within
+
+    penalty = accuracy_per_ms or 0.0
+    def score(name):
+        m = candidates[name]
+        return (m["accuracy"] - penalty * m["latency"]["single_p50_ms"], -m["latency"]["single_p50_ms"])
+
+    best = max(names, key=score)
+    if penalty:
+        reason = f"best accuracy - {penalty} x p50 ms"
+    else:
+        reason = "best accuracy, ties to lowest latency"
+    if latency_budget_ms is not None:
+        reason += f" within {latency_budget_ms}ms p99 budget"
+    return best, reason
+
+# -----------------------------
+# FAST SCORER EXPORT
+# -----------------------------
+FAST_SCORER = os.environ.get("NEXOOPS_FAST_SCORER", "1") != "0"
+FAST_SCORER_TOLERANCE = 1e-9
+
+def export_fast_scorer(pipeline, X_test_combined):
+    """
+    Compile a linear pipeline into a numpy-only scorer, check it against the
+    pipeline on held-out rows and profile it like profile_latency(). Returns
+    (scorer, report), or (None, report) when the pipeline cannot be exported
+    or does not reproduce the pipeline's probabilities.
+    """
+    try:
+        scorer = LinearSeverityScorer.from_pipeline(pipeline)
+    except ValueError as e:
+        return None, {"verified": False, "reason": str(e)}
+
+    max_diff = scorer.max_difference(pipeline, X_test_combined)
+    report = {"verified": max_diff <= FAST_SCORER_TOLERANCE, "max_abs_diff": max_diff,
+              "tolerance": FAST_SCORER_TOLERANCE, "rows_checked": len(X_test_combined)}
+    if not report["verified"]:
+        return None, report
+
+    texts = X_test_combined['text'].to_numpy(dtype=object)
+    features = X_test_combined[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+    report["latency"] = _latency_profile(lambda rows: scorer.predict_proba(texts[rows], features[rows]),
+                                         len(texts))
+    return scorer, report
 
 # -----------------------------
 # TRAIN MODEL
 # -----------------------------
-def train_alert_model():
+def train_alert_model(max_workers=TRAIN_WORKERS, latency_budget_ms=None, accuracy_per_ms=None):
     df = load_training_data()
     X_text = df['cleaned_text']
-    feature_columns = ['char_count','word_count','critical_words','warning_words','info_words']
+    feature_columns = FEATURE_COLUMNS
     X_features = df[feature_columns]
     y = df['severity']
 
@@ -105,63 +375,285 @@ def train_alert_model():
     X_train_combined = pd.concat([X_train_text.rename('text'), X_train_features], axis=1)
     X_test_combined = pd.concat([X_test_text.rename('text'), X_test_features], axis=1)
 
-    models = {
-        'random_forest': RandomForestClassifier(n_estimators=200, random_state=42),
-        'svm': SVC(probability=True, random_state=42),
-        'logistic_regression': LogisticRegression(max_iter=1000, random_state=42)
-    }
+    # Shared preprocessing is fitted once and reused by every candidate
+    start = time.perf_counter()
+    X_train_matrix = preprocessor.fit_transform(X_train_combined)
+    X_test_matrix = preprocessor.transform(X_test_combined)
+    preprocess_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fitted, workers = fit_candidates(X_train_matrix, y_train, X_test_matrix, y_test, max_workers=max_workers)
+    selection_seconds = time.perf_counter() - start
 
+    policy = _policy(latency_budget_ms, accuracy_per_ms)
+    candidates = {}
     pipelines = {}
-    best_model = None
-    best_score = 0
+    scorers = {}
 
-    for name, model in models.items():
-        pipe = Pipeline([('preprocessor', preprocessor), ('clf', model)])
-        pipe.fit(X_train_combined, y_train)
-        y_pred = pipe.predict(X_test_combined)
-        acc = accuracy_score(y_test, y_pred)
-        if acc > best_score:
-            best_score = acc
-            best_model = name
-            best_pipeline = pipe
-
-    joblib.dump(best_pipeline, "alert_model.joblib")
-    print(f"Best model: {best_model} with accuracy {best_score:.4f}")
+    for name in candidate_models():
+        model, metrics = fitted[name]
+        pipelines[name] = Pipeline([('preprocessor', preprocessor), ('clf', model)])
+        metrics["latency"] = profile_latency(pipelines[name], X_test_combined)
+        # Linear candidates are served by their numpy export, so select on that latency
+        scorer, metrics["fast_scorer"] = export_fast_scorer(pipelines[name], X_test_combined)
+        if scorer is not None:
+            scorers[name] = scorer
+            metrics["pipeline_latency"] = metrics["latency"]
+            metrics["latency"] = metrics["fast_scorer"].pop("latency")
+        candidates[name] = metrics
+        print(f"  {name:<20} acc={metrics['accuracy']:.4f} fit={metrics['fit_seconds']:.2f}s "
+              f"p50={metrics['latency']['single_p50_ms']:.3f}ms p99={metrics['latency']['single_p99_ms']:.3f}ms "
+              f"batch={metrics['latency']['batch_row_p50_ms']:.4f}ms/row")
+
+    best_model, reason = select_model(candidates, **policy)
+    best_score = candidates[best_model]['accuracy']
+    best_pipeline = pipelines[best_model]
+    scorer = scorers.get(best_model)
+
+    manifest = MODEL_STORE.save(
+        best_pipeline, training_fingerprint(policy),
+        metrics={"model": best_model, "accuracy": round(best_score, 4), "candidates": candidates,
+                 "preprocess_seconds": round(preprocess_seconds, 3),
+                 "selection_seconds": round(selection_seconds, 3), "workers": workers},
+        extra={"latency_profile": candidates[best_model]["latency"],
+               "selection": {"policy": policy, "reason": reason},
+               "fast_scorer": candidates[best_model]["fast_scorer"]},
+        sidecars={SCORER_SUFFIX: scorer.save} if scorer is not None else None
+    )
+    _set_model(scorer if scorer is not None and FAST_SCORER else best_pipeline, manifest)
+    print(f"Best model: {best_model} with accuracy {best_score:.4f} (artifact v{manifest['version']})")
     return best_pipeline
 
 # -----------------------------
-# PREDICT SEVERITY FOR SINGLE LOG
+# MODEL ARTIFACT LOADING
 # -----------------------------
-def predict_severity_from_log(log_text):
+MODEL_STORE = ModelStore("alert_model")
+SCORER_SUFFIX = "scorer.npz"
+_model_lock = threading.Lock()
+_train_lock = threading.Lock()
+_model = None
+_model_manifest = None
+_model_mtime = None
+
+def _policy(latency_budget_ms=None, accuracy_per_ms=None):
+    return {
+        "latency_budget_ms": latency_budget_ms if latency_budget_ms is not None else SELECTION_POLICY["latency_budget_ms"],
+        "accuracy_per_ms": accuracy_per_ms if accuracy_per_ms is not None else SELECTION_POLICY["accuracy_per_ms"]
+    }
+
+def training_fingerprint(policy=None):
+    return fingerprint(dict(TRAINING_CONFIG, selection=policy or _policy()))
+
+def _set_model(model, manifest):
+    global _model, _model_manifest, _model_mtime
+    with _model_lock:
+        _model, _model_manifest, _model_mtime = model, manifest, MODEL_STORE.mtime()
+
+def load_alert_model():
+    """
+    Return the current model, loading it from the artifact store on first use
+    and again whenever another process publishes a new version.
+    """
+    mtime = MODEL_STORE.mtime()
+    if _model is not None and mtime == _model_mtime:
+        return _model
+    if mtime is None:
+        return _model
+    try:
+        manifest = MODEL_STORE.manifest()
+        scorer_path = MODEL_STORE.sidecar_path(SCORER_SUFFIX, manifest)
+        if FAST_SCORER and scorer_path and (manifest.get("fast_scorer") or {}).get("verified"):
+            # The exported scorer needs only numpy: no pipeline unpickling
+            model = LinearSeverityScorer.load(scorer_path)
+        else:
+            model, manifest = MODEL_STORE.load()
+    except Exception as e:
+        print(f"Failed to load model artifact: {e}")
+        return _model
+    _set_model(model, manifest)
+    return model
+
+def model_info():
+    """Manifest of the model currently being served (None before the first load)."""
+    return _model_manifest
+
+def serving_backend():
+    """"fast_scorer" when the numpy-only export is serving, "pipeline" for the sklearn pipeline."""
+    if _model is None:
+        return None
+    return "fast_scorer" if isinstance(_model, LinearSeverityScorer) else "pipeline"
+
+def is_training():
+    return _train_lock.locked()
+
+def ensure_alert_model(force=False, **policy):
+    """
+    Load the stored artifact when it matches the current training inputs,
+    selection policy and library versions; otherwise retrain.
+    Returns "loaded", "trained" or "busy".
+    """
+    if not force and MODEL_STORE.is_current(training_fingerprint(_policy(**policy))):
+        load_alert_model()
+        return "loaded"
+    if not _train_lock.acquire(blocking=False):
+        return "busy"
     try:
-        model = joblib.load("alert_model.joblib")
-    except FileNotFoundError:
+        train_alert_model(**policy)
+        return "trained"
+    finally:
+        _train_lock.release()
+
+# -----------------------------
+# PREDICT SEVERITY FOR SINGLE LOG
+# -----------------------------
+TEMPLATE_CACHE = TemplateCache(max_size=int(os.environ.get("NEXOOPS_TEMPLATE_CACHE_SIZE", "50000")))
+
+def log_template(log_text, deadline_ms=None):
+    """
+    The cleaned text the model actually sees: clean_text masks IPs, numbers,
+    hex ids and bracketed fields, so every line of one template maps to one key.
+    Multi-line input is summarized first (within `deadline_ms`, if given).
+    """
+    if '\n' in log_text.strip():
+        summary = summarize_log(log_text, n_sentences=2, num_clusters=2, deadline_ms=deadline_ms)
+        if summary.strip():
+            log_text = summary
+    return clean_text(log_text)
+
+def _model_version():
+    manifest = model_info() or {}
+    return (manifest.get("version"), get_online_learner().version)
+
+def _predict_templates(model, templates):
+    """Run the model once over a batch of distinct templates -> [(prediction, probability dict)]."""
+    if isinstance(model, LinearSeverityScorer):
+        features = [[f[col] for col in FEATURE_COLUMNS] for f in map(extract_features, templates)]
+        probabilities = model.predict_proba(templates, features)
+    else:
+        X_df = pd.DataFrame([dict(extract_features(t), text=t) for t in templates])
+        for col in FEATURE_COLUMNS:
+            if col not in X_df.columns:
+                X_df[col] = 0
+
+        try:
+            probabilities = model.predict_proba(X_df)
+        except:
+            return [(p, None) for p in model.predict(X_df)]
+
+    labels = model.classes_
+    learner = get_online_learner()
+    results = []
+    for template, row in zip(templates, probabilities):
+        probs = {labels[i]: float(row[i]) for i in range(len(labels))}
+        # Blend in what operators have taught the online learner
+        online = learner.predict_proba(template)
+        if online is not None:
+            probs = blend_probabilities(probs, online, ONLINE_WEIGHT)
+        prediction = max(probs, key=probs.get)
+        results.append((prediction, {label: round(p*100,2) for label, p in probs.items()}))
+    return results
+
+def classify_templates(templates):
+    """
+    Verdicts for already-normalized templates. Cached templates are served from
+    the LRU; the misses are deduplicated and scored in one model call.
+    """
+    model = load_alert_model()
+    if model is None:
         print("Model not found. Train the model first.")
-        return None, None
+        return [(None, None)] * len(templates)
 
-    summary = summarize_log(log_text, n_sentences=2, num_clusters=2)
-    if not summary.strip():
-        summary = log_text
-    clean_summary = clean_text(summary)
+    version = _model_version()
+    unique = {t: TEMPLATE_CACHE.get(t, version) for t in dict.fromkeys(templates)}
+    # Repeats of a template inside the batch are served without the model too
+    TEMPLATE_CACHE.count_hits(len(templates) - len(unique))
+    misses = [t for t, v in unique.items() if v is None]
+    if misses:
+        for template, verdict in zip(misses, _predict_templates(model, misses)):
+            TEMPLATE_CACHE.put(template, verdict, version)
+            unique[template] = verdict
+    return [(prediction, dict(probs) if probs else probs)
+            for prediction, probs in (unique[t] for t in templates)]
 
-    feature_data = extract_features(clean_summary)
-    feature_data['text'] = clean_summary
-    X_df = pd.DataFrame([feature_data])
+def explicit_verdict(records):
+    """
+    (severity, probabilities) from the records' own log levels, or None unless
+    every record has one. Several records give the most severe level, with
+    probabilities being each severity's share of the records.
+    """
+    severities = [r.severity for r in records]
+    if not severities or None in severities:
+        return None
+    worst = max(severities, key=SEVERITIES.index)
+    return worst, {s: round(100 * severities.count(s) / len(severities), 2) for s in SEVERITIES}
 
-    for col in ['char_count','word_count','critical_words','warning_words','info_words']:
-        if col not in X_df.columns:
-            X_df[col] = 0
+def predict_severity_from_log(log_text, deadline_ms=None):
+    verdict = explicit_verdict(list(parse_records(log_text)))
+    if verdict is not None:
+        return verdict
+    return classify_templates([log_template(log_text, deadline_ms)])[0]
 
-    prediction = model.predict(X_df)[0]
+def classify_lines(lines):
+    """Classify many log lines with one model call for all uncached templates."""
+    results = classify_templates([log_template(line) for line in lines])
+    return [{"severity": s, "probabilities": p} for s, p in results]
 
-    try:
-        probabilities = model.predict_proba(X_df)[0]
-        labels = model.classes_
-        prob_dict = {labels[i]: round(probabilities[i]*100,2) for i in range(len(labels))}
-    except:
-        prob_dict = None
+def classify_records(records):
+    """
+    Classify parsed LogRecords. A record with an explicit level is mapped
+    straight to its severity; only the rest go through the model, in one batch.
+    """
+    results = [None] * len(records)
+    pending = []
+    for i, record in enumerate(records):
+        verdict = explicit_verdict([record])
+        if verdict is not None:
+            results[i] = {"severity": verdict[0], "probabilities": verdict[1], "source": "level"}
+        else:
+            pending.append(i)
+    if pending:
+        verdicts = classify_templates([clean_text(records[i].text) for i in pending])
+        for i, (severity, probabilities) in zip(pending, verdicts):
+            results[i] = {"severity": severity, "probabilities": probabilities, "source": "model"}
+    return results
+
+def classify_stream(lines, batch_size=512):
+    """
+    Streaming classification: yields (record text, result) for an iterable of
+    lines, assembling multi-line records first and working in batches so
+    repeated templates hit the cache.
+    """
+    batch = []
+    for record in parse_records(lines):
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield from zip((r.text for r in batch), classify_records(batch))
+            batch = []
+    if batch:
+        yield from zip((r.text for r in batch), classify_records(batch))
+
+# -----------------------------
+# OPERATOR FEEDBACK
+# -----------------------------
+ONLINE_WEIGHT = float(os.environ.get("NEXOOPS_ONLINE_WEIGHT", "0.5"))
+_online_learner = None
+
+def get_online_learner():
+    global _online_learner
+    if _online_learner is None:
+        with _model_lock:
+            if _online_learner is None:
+                _online_learner = OnlineSeverityLearner(clean=clean_text)
+    return _online_learner
 
-    return prediction, prob_dict
+def record_feedback(examples):
+    """
+    Teach the online learner operator-corrected severities.
+    `examples` is a list of (log_text, severity); returns the learner status.
+    """
+    learner = get_online_learner()
+    learner.learn_many(examples)
+    return learner.status()
 
 # -----------------------------
 # PREDICT BATCH LOGS
@@ -172,25 +664,23 @@ def predict_batch_logs_plain_txt(log_files):
         print(f"\nProcessing: {log_file}")
         try:
             with open(log_file,'r',encoding='utf-8') as f:
-                lines = f.readlines()
-            for line_num, log_text in enumerate(lines,1):
-                log_text = log_text.strip()
-                if not log_text:
-                    continue
-                severity, probabilities = predict_severity_from_log(log_text)
+                records = list(parse_records(f))
+            for record, prediction in zip(records, classify_records(records)):
                 results.append({
                     'file': log_file,
-                    'line': line_num,
-                    'severity': severity,
-                    'probabilities': probabilities
+                    'line': record.line,
+                    'event': record.event,
+                    'severity': prediction['severity'],
+                    'probabilities': prediction['probabilities'],
+                    'source': prediction['source']
                 })
         except Exception as e:
             print(f"Error reading {log_file}: {str(e)}")
             results.append({'file': log_file,'line':None,'severity':'Error','probabilities':None})
     return results
 
-def classify_log(text):
-    severity, probabilities = predict_severity_from_log(text)
+def classify_log(text, deadline_ms=None):
+    severity, probabilities = predict_severity_from_log(text, deadline_ms)
     return {
         "severity": severity,
         "probabilities": probabilities
@@ -204,9 +694,9 @@ if __name__ == "__main__":
     print("ALERT CLASSIFICATION SYSTEM FOR PLAIN LOGS")
     print("="*50)
     
-    # Train model 
-    print("1. Training model...")
-    train_alert_model()
+    # Train model (skipped when the stored artifact is current)
+    print("1. Loading or training model...")
+    print(f"   {ensure_alert_model()}")
     
     # predict your log file
     log_files = ["log1.txt"]
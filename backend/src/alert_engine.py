@@ -0,0 +1,207 @@
+import os
+import json
+import time
+import threading
+from datetime import datetime
+
+from netstats import PeriodicSampler
+
+RULES_FILE = os.environ.get(
+    "NEXOOPS_ALERT_RULES",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "alert_rules.json")
+)
+
+SEVERITY_ORDER = ["LOW", "MEDIUM", "HIGH", "CRITICAL"]
+
+# Thresholds match the previous hard-coded check_alerts() values; `clear` adds
+# hysteresis so a metric hovering at the threshold does not flap.
+DEFAULT_RULES = [
+    {"name": "cpu", "type": "CPU", "metric": "cpu_percent", "label": "High CPU", "unit": "%",
+     "levels": {"HIGH": 85, "CRITICAL": 95}, "clear": 80, "for_count": 2},
+    {"name": "memory", "type": "Memory", "metric": "memory_percent", "label": "High memory", "unit": "%",
+     "levels": {"HIGH": 85, "CRITICAL": 95}, "clear": 82},
+    {"name": "disk", "type": "Disk", "metric": "disk_percent", "label": "High disk", "unit": "%",
+     "levels": {"HIGH": 85, "CRITICAL": 95}, "clear": 83},
+    {"name": "network_errors", "type": "Network", "metric": "network_errors_per_sec", "label": "Network errors",
+     "unit": "/s", "levels": {"MEDIUM": 1.0, "HIGH": 10.0}, "clear": 0.1},
+]
+
+
+# -----------------------------
+# RULE DEFINITION
+# -----------------------------
+class AlertRule:
+    """
+    Threshold rule over one metric.
+
+    `levels` maps severity -> threshold (breached when value > threshold); the
+    alert resolves only once the value drops below `clear`. `for_count` is the
+    number of consecutive breaching evaluations needed to fire, and
+    `suppress_seconds` is the minimum gap between notifications for the rule.
+    """
+
+    def __init__(self, name, type, metric, levels, clear=None, label=None, unit="",
+                 for_count=1, suppress_seconds=300):
+        self.name = name
+        self.type = type
+        self.metric = metric
+        self.levels = sorted(levels.items(), key=lambda x: x[1])
+        self.clear = clear if clear is not None else self.levels[0][1]
+        self.label = label or name
+        self.unit = unit
+        self.for_count = max(1, int(for_count))
+        self.suppress_seconds = suppress_seconds
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(**d)
+
+    def to_dict(self):
+        return {
+            "name": self.name, "type": self.type, "metric": self.metric,
+            "levels": dict(self.levels), "clear": self.clear, "label": self.label,
+            "unit": self.unit, "for_count": self.for_count, "suppress_seconds": self.suppress_seconds
+        }
+
+    def severity_for(self, value):
+        """Highest severity whose threshold the value exceeds, or None."""
+        severity = None
+        for level, threshold in self.levels:
+            if value > threshold:
+                severity = level
+        return severity
+
+
+def load_rules(path=RULES_FILE):
+    """Rules from a JSON list at `path`, falling back to DEFAULT_RULES."""
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                return [AlertRule.from_dict(d) for d in json.load(f)]
+        except Exception as e:
+            print(f"Invalid alert rules in {path}, using defaults: {e}")
+    return [AlertRule.from_dict(d) for d in DEFAULT_RULES]
+
+
+# -----------------------------
+# EVALUATION ENGINE
+# -----------------------------
+class AlertEngine(PeriodicSampler):
+    """
+    Evaluates alert rules at a fixed cadence on a background thread.
+
+    Each rule is a small state machine (ok -> pending -> firing -> ok). Only
+    transitions produce events: a breach that stays breached is one alert, not
+    one per evaluation, and notifications for a rule inside its suppression
+    window are counted instead of emitted.
+    """
+
+    def __init__(self, metrics, on_event=None, rules=None, interval=10.0):
+        super().__init__(interval, "alert-engine")
+        self.metrics = metrics
+        self.on_event = on_event
+        self.rules = rules if rules is not None else load_rules()
+        self._state = {r.name: self._fresh_state() for r in self.rules}
+        self._lock = threading.Lock()
+        self.evaluations = 0
+        self.suppressed = 0
+
+    @staticmethod
+    def _fresh_state():
+        return {"state": "ok", "severity": None, "value": None, "since": None,
+                "breaches": 0, "notified": False, "last_notified": 0.0}
+
+    def sample(self):
+        self.evaluate(self.metrics())
+
+    def evaluate(self, values, now=None):
+        """Run every rule against a metrics dict; returns the events emitted."""
+        now = time.time() if now is None else now
+        events = []
+        with self._lock:
+            self.evaluations += 1
+            for rule in self.rules:
+                value = values.get(rule.metric)
+                if value is None:
+                    continue
+                event = self._step(rule, self._state[rule.name], value, now)
+                if event:
+                    events.append(event)
+
+        for event in events:
+            if self.on_event:
+                self.on_event(event)
+        return events
+
+    def _step(self, rule, st, value, now):
+        st["value"] = value
+        severity = rule.severity_for(value)
+
+        if st["state"] == "firing":
+            if value < rule.clear:
+                fired_severity, notified = st["severity"], st["notified"]
+                st.update(state="ok", severity=None, since=None, breaches=0, notified=False)
+                # A firing that was suppressed resolves silently as well
+                return self._event(rule, "resolved", fired_severity, value, now) if notified else None
+            if severity and SEVERITY_ORDER.index(severity) > SEVERITY_ORDER.index(st["severity"]):
+                st["severity"] = severity
+                st["notified"] = True
+                st["last_notified"] = now
+                return self._event(rule, "firing", severity, value, now)
+            # Inside the hysteresis band or de-escalating: keep firing, no new event
+            if severity:
+                st["severity"] = severity
+            return None
+
+        if severity is None:
+            st.update(state="ok", breaches=0)
+            return None
+
+        st["breaches"] += 1
+        if st["breaches"] < rule.for_count:
+            st["state"] = "pending"
+            return None
+
+        st.update(state="firing", severity=severity, since=now)
+        if st["last_notified"] and now - st["last_notified"] < rule.suppress_seconds:
+            self.suppressed += 1
+            st["notified"] = False
+            return None
+        st["notified"] = True
+        st["last_notified"] = now
+        return self._event(rule, "firing", severity, value, now)
+
+    @staticmethod
+    def _event(rule, state, severity, value, now):
+        prefix = f"{rule.label} resolved" if state == "resolved" else rule.label
+        return {
+            "ts": round(now, 3),
+            "time": datetime.fromtimestamp(now).strftime("%Y-%m-%d %H:%M:%S"),
+            "severity": severity,
+            "type": rule.type,
+            "msg": f"{prefix}: {round(value, 2)}{rule.unit}",
+            "rule": rule.name,
+            "state": state,
+            "value": round(value, 2)
+        }
+
+    def active(self):
+        """Alerts that are currently firing."""
+        with self._lock:
+            result = []
+            for rule in self.rules:
+                st = self._state[rule.name]
+                if st["state"] == "firing":
+                    result.append(self._event(rule, "firing", st["severity"], st["value"], st["since"]))
+            return result
+
+    def status(self):
+        with self._lock:
+            return {
+                "interval": self.interval,
+                "evaluations": self.evaluations,
+                "suppressed": self.suppressed,
+                "rules": [dict(rule.to_dict(), **{"state": self._state[rule.name]["state"],
+                                                  "value": self._state[rule.name]["value"]})
+                          for rule in self.rules]
+            }
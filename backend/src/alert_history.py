@@ -0,0 +1,170 @@
+import os
+import json
+import time
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+HISTORY_FILE = os.environ.get(
+    "NEXOOPS_ALERT_HISTORY",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "alert_history.jsonl")
+)
+
+
+class _Series:
+    """Time-sorted parallel lists of numeric timestamps and alert records."""
+
+    __slots__ = ("ts", "records")
+
+    def __init__(self):
+        self.ts = []
+        self.records = []
+
+    def add(self, ts, record):
+        if not self.ts or ts >= self.ts[-1]:
+            self.ts.append(ts)
+            self.records.append(record)
+        else:
+            i = bisect_right(self.ts, ts)
+            self.ts.insert(i, ts)
+            self.records.insert(i, record)
+
+    def range(self, since=None, until=None):
+        lo = bisect_left(self.ts, since) if since is not None else 0
+        hi = bisect_right(self.ts, until) if until is not None else len(self.ts)
+        return self.records[lo:hi]
+
+
+# -----------------------------
+# INDEXED ALERT HISTORY
+# -----------------------------
+class AlertHistory:
+    """
+    Persistent alert history kept sorted by numeric timestamp.
+
+    Besides the global timeline, every alert is indexed by severity, by type and
+    by (severity, type), so a query such as "CRITICAL Memory alerts in the last
+    6 hours" bisects one small series instead of scanning and re-parsing every
+    stored alert. Alerts are appended to a JSONL file and reloaded on startup.
+    """
+
+    def __init__(self, path=HISTORY_FILE, max_entries=50000):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._reset()
+        self._load()
+
+    def _reset(self):
+        self._all = _Series()
+        self._by_severity = {}
+        self._by_type = {}
+        self._by_pair = {}
+
+    @staticmethod
+    def _key(value):
+        return (value or "").lower()
+
+    def _index(self, record):
+        ts = record["ts"]
+        sev, typ = self._key(record.get("severity")), self._key(record.get("type"))
+        self._all.add(ts, record)
+        self._by_severity.setdefault(sev, _Series()).add(ts, record)
+        self._by_type.setdefault(typ, _Series()).add(ts, record)
+        self._by_pair.setdefault((sev, typ), _Series()).add(ts, record)
+
+    @staticmethod
+    def _normalize(alert):
+        record = dict(alert)
+        if "ts" not in record:
+            try:
+                record["ts"] = datetime.strptime(record["time"], "%Y-%m-%d %H:%M:%S").timestamp()
+            except (KeyError, ValueError):
+                record["ts"] = time.time()
+        if "time" not in record:
+            record["time"] = datetime.fromtimestamp(record["ts"]).strftime("%Y-%m-%d %H:%M:%S")
+        return record
+
+    def add(self, alert):
+        record = self._normalize(alert)
+        with self._lock:
+            self._index(record)
+            self._append_file(record)
+            if len(self._all.ts) > self.max_entries:
+                self._trim()
+        return record
+
+    def query(self, since=None, until=None, severity=None, type=None, state=None, limit=None):
+        """
+        Alerts with since <= ts <= until (epoch seconds), oldest first.
+        `limit` keeps the most recent matches.
+        """
+        sev, typ = self._key(severity), self._key(type)
+        with self._lock:
+            if sev and typ:
+                series = self._by_pair.get((sev, typ))
+            elif sev:
+                series = self._by_severity.get(sev)
+            elif typ:
+                series = self._by_type.get(typ)
+            else:
+                series = self._all
+            result = series.range(since, until) if series else []
+
+        if state:
+            result = [r for r in result if r.get("state", "firing") == state]
+        if limit:
+            result = result[-limit:]
+        return result
+
+    def recent(self, hours=24, **filters):
+        return self.query(since=time.time() - hours * 3600, **filters)
+
+    def counts(self, since=None):
+        """Alert counts per severity since a timestamp."""
+        with self._lock:
+            return {sev: len(series.range(since)) for sev, series in self._by_severity.items()}
+
+    def __len__(self):
+        return len(self._all.ts)
+
+    # -----------------------------
+    # PERSISTENCE
+    # -----------------------------
+    def _append_file(self, record):
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(record) + "\n")
+        except OSError:
+            pass
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                for line in f:
+                    try:
+                        self._index(self._normalize(json.loads(line)))
+                    except (ValueError, TypeError):
+                        continue
+        except OSError:
+            return
+        if len(self._all.ts) > self.max_entries:
+            self._trim()
+
+    def _trim(self):
+        """Drop the oldest 10% beyond capacity, rebuild indexes and compact the file."""
+        keep = self._all.records[-int(self.max_entries * 0.9):]
+        self._reset()
+        for record in keep:
+            self._index(record)
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, 'w') as f:
+                for record in keep:
+                    f.write(json.dumps(record) + "\n")
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
@@ -0,0 +1,256 @@
+import os
+import time
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+ANALYSIS_POOL = os.environ.get("NEXOOPS_ANALYSIS_POOL", "1") != "0"
+POOL_WORKERS = int(os.environ.get("NEXOOPS_ANALYSIS_WORKERS", "0")) or max(1, min(4, (os.cpu_count() or 1) - 1))
+# Tasks allowed to wait for a worker; beyond workers + queue, submissions are rejected
+POOL_QUEUE = int(os.environ.get("NEXOOPS_ANALYSIS_QUEUE", "16"))
+TASK_TIMEOUT = float(os.environ.get("NEXOOPS_ANALYSIS_TIMEOUT", "30"))
+
+
+class PoolBusy(Exception):
+    """Every worker is busy and the queue is full (HTTP 503)."""
+
+
+class TaskTimeout(Exception):
+    """A task did not finish within its timeout (HTTP 504)."""
+
+
+# -----------------------------
+# WORKER SIDE
+# -----------------------------
+# Tasks are plain module-level functions so they pickle by name. Each worker
+# imports the ML stack and loads the model once, in the pool initializer.
+def _init_worker():
+    import summary_engine  # noqa: F401
+    from alert_classifier import load_alert_model, get_online_learner
+    load_alert_model()
+    get_online_learner()
+
+def _ping():
+    return os.getpid()
+
+def process_stats():
+    """
+    This process's classifier cache and summarizer counters. Caches and
+    stage timings are per process, so the API process and every worker each
+    have their own; AnalysisPool.merged_stats() combines them.
+    """
+    import summary_engine
+    from alert_classifier import TEMPLATE_CACHE
+    return {"pid": os.getpid(), "at": time.time(), "classifier_cache": TEMPLATE_CACHE.stats(),
+            "summarizer": summary_engine.stats()}
+
+def _run_task(task, args, kwargs):
+    """Run a task in a worker and return its result with the worker's counters as they are afterwards."""
+    return task(*args, **kwargs), process_stats()
+
+def _sync_models():
+    """Pick up what the API process published: load_alert_model reloads on a new
+    artifact by itself, the online learner on its next checkpoint."""
+    from alert_classifier import get_online_learner
+    get_online_learner().refresh()
+
+def summarize_task(text, n_sentences=None, backend=None, deadline_ms=None):
+    from summary_engine import get_engine
+    return get_engine("api").run(text, n_sentences=n_sentences, backend=backend, deadline_ms=deadline_ms)
+
+def classify_task(text):
+    from alert_classifier import classify_log
+    _sync_models()
+    return classify_log(text)
+
+def analyze_task(text, deadline_ms=None):
+    """Summary + classification; with a deadline, classification gets what the summary left."""
+    from summary_engine import get_engine
+    from alert_classifier import classify_log
+    _sync_models()
+    start = time.perf_counter()
+    summary = get_engine("api").run(text, deadline_ms=deadline_ms)
+    remaining = None
+    if deadline_ms is not None:
+        # Classification summarizes multi-line input too; it gets what is left
+        remaining = max(1.0, deadline_ms - (time.perf_counter() - start) * 1000)
+    classification = classify_log(text, deadline_ms=remaining)
+    return {"summary": summary, "classification": classification,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 3)}
+
+def classify_upload_task(upload_id, root):
+    """Bulk-classify every record of a chunked upload, read from the spool on disk."""
+    from upload_spool import load_upload
+    from bulk_ingest import ingest_lines, merge_reports
+    _sync_models()
+    upload = load_upload(upload_id, root)
+    start = time.perf_counter()
+    report = ingest_lines(upload.lines(), upload.meta["name"], nbytes=upload.meta["indexed"])
+    report = merge_reports([report], 0.0, time.perf_counter() - start, 1)
+    return dict(report, upload_id=upload_id, complete=upload.meta["complete"])
+
+def search_upload_task(upload_id, root, terms, limit=50, offset=0):
+    """SpoolUpload.search over a chunked upload, read from the spool on disk."""
+    from upload_spool import load_upload
+    return dict(load_upload(upload_id, root).search(terms, limit=limit, offset=offset), upload_id=upload_id)
+
+
+
+# -----------------------------
+# POOL
+# -----------------------------
+class AnalysisPool:
+    """
+    Process pool for CPU-bound analysis (TF-IDF, KMeans, model inference), so
+    it never holds the GIL of the Flask process and request threads stay free
+    for the network endpoints.
+
+    Workers are spawned up front by start() and each loads the model in its
+    initializer. At most `workers + queue_size` tasks are in flight; run()
+    raises PoolBusy beyond that instead of queueing without bound, and
+    TaskTimeout when a task takes longer than `timeout` seconds. A timed-out
+    task that is already running cannot be interrupted: it keeps its slot
+    until it finishes, so the bound still holds. Callers should pass a
+    deadline_ms to tasks that accept one so the work itself gives up in time.
+
+    With the pool disabled (NEXOOPS_ANALYSIS_POOL=0) tasks run inline in the
+    calling thread.
+
+    Every task returns the worker's cache and stage-timing counters along
+    with its result; those only change while a task runs, so the latest
+    snapshot per worker is current and merged_stats() needs no round trip.
+    """
+
+    def __init__(self, workers=POOL_WORKERS, queue_size=POOL_QUEUE, timeout=TASK_TIMEOUT, enabled=ANALYSIS_POOL):
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+        self.enabled = enabled
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pids = []
+        self._in_flight = 0
+        self._snapshots = {}  # worker pid -> process_stats() after its last completed task
+        self.counts = {"submitted": 0, "completed": 0, "rejected": 0, "timed_out": 0, "failed": 0, "restarts": 0}
+
+    def start(self):
+        """Spawn every worker and wait until each has loaded the model."""
+        if not self.enabled:
+            return self
+        with self._lock:
+            if self._executor is not None:
+                return self
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            # Submitted back to back, each ping finds no idle worker and spawns one
+            futures = [self._executor.submit(_ping) for _ in range(self.workers)]
+        try:
+            pids = sorted({f.result() for f in futures})
+        except Exception:
+            with self._lock:
+                executor, self._executor = self._executor, None
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        with self._lock:
+            self._pids = pids
+            # Counters of workers replaced by a restart are gone with them
+            self._snapshots = {pid: snap for pid, snap in self._snapshots.items() if pid in pids}
+        return self
+
+    def _count(self, key):
+        with self._lock:
+            self.counts[key] += 1
+
+    def run(self, task, *args, timeout=None, **kwargs):
+        """task(*args, **kwargs) in a worker; blocks the calling thread only until it completes."""
+        if not self.enabled:
+            return task(*args, **kwargs)
+        if not self._slots.acquire(blocking=False):
+            self._count("rejected")
+            raise PoolBusy(f"analysis queue is full ({self.workers} workers, {self.queue_size} queued)")
+        try:
+            executor = self._executor or self.start()._executor
+            future = executor.submit(_run_task, task, args, kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.counts["submitted"] += 1
+            self._in_flight += 1
+        future.add_done_callback(self._done)
+
+        try:
+            result, snapshot = future.result(timeout=timeout or self.timeout)
+        except FutureTimeout:
+            future.cancel()  # only succeeds while the task is still queued
+            self._count("timed_out")
+            raise TaskTimeout(f"analysis task did not finish within {timeout or self.timeout:g}s")
+        except BrokenProcessPool:
+            self._count("failed")
+            self._restart(executor)
+            raise
+        except Exception:
+            self._count("failed")
+            raise
+        with self._lock:
+            self.counts["completed"] += 1
+            self._snapshots[snapshot["pid"]] = snapshot
+        return result
+
+    def _done(self, future):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def _restart(self, broken):
+        """A worker died (e.g. killed for memory): replace the whole pool, once."""
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = None
+            self.counts["restarts"] += 1
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.start()
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def merged_stats(self):
+        """
+        Classifier cache and summarizer counters summed over the API process
+        and every worker that has run a task, with the processes they cover.
+        """
+        import summary_engine
+        from template_cache import merge_stats
+        with self._lock:
+            workers = sorted(self._snapshots.values(), key=lambda snap: snap["at"], reverse=True)
+        snapshots = [process_stats()] + workers
+        return {
+            "processes": [{"pid": snap["pid"], "role": "worker" if i else "api"} for i, snap in enumerate(snapshots)],
+            "classifier_cache": merge_stats([snap["classifier_cache"] for snap in snapshots]),
+            "summarizer": summary_engine.merge_stats([snap["summarizer"] for snap in snapshots])
+        }
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counts, enabled=self.enabled, started=self._executor is not None,
+                        in_flight=self._in_flight, workers=self.workers, worker_pids=list(self._pids),
+                        queue_size=self.queue_size, timeout_s=self.timeout)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_pool():
+    """The process-wide analysis pool (workers are spawned on start() or first use)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = AnalysisPool()
+        return _pool
@@ -0,0 +1,288 @@
+import os
+import math
+import time
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from log_records import content_match
+from log_features import clean_text
+
+# Events are counted per key in fixed buckets of this many seconds of log time
+BUCKET_SECONDS = float(os.environ.get("NEXOOPS_ANOMALY_BUCKET_SECONDS", "60"))
+# Weight of the newest bucket in the EWMA baseline (0.1 ~ the last 20 buckets)
+ALPHA = float(os.environ.get("NEXOOPS_ANOMALY_ALPHA", "0.1"))
+# z-scores at which a spike fires HIGH / CRITICAL, and below which it resolves
+Z_HIGH = float(os.environ.get("NEXOOPS_ANOMALY_Z", "4"))
+Z_CRITICAL = 2 * Z_HIGH
+Z_CLEAR = 1.0
+# A bucket needs at least this many events to count as a spike, so one-off lines don't alert
+MIN_COUNT = int(os.environ.get("NEXOOPS_ANOMALY_MIN_COUNT", "5"))
+# Closed buckets a series needs before it can alert
+WARMUP_BUCKETS = 10
+# Bounded memory: least recently seen series are evicted beyond this
+MAX_SERIES = int(os.environ.get("NEXOOPS_ANOMALY_MAX_SERIES", "5000"))
+TEMPLATE_MEMO_SIZE = 50000
+# Empty buckets folded into a baseline per gap; past this the EWMA has decayed to ~0 anyway
+_MAX_GAP = int(5 / ALPHA) if ALPHA > 0 else 50
+
+
+def _epoch(timestamp):
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    if isinstance(timestamp, datetime):
+        return timestamp.timestamp()
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return time.time()
+
+
+class _Series:
+    """Event-rate state of one key: the open bucket's count and an EWMA mean/variance of closed buckets."""
+
+    __slots__ = ("kind", "label", "bucket", "count", "mean", "var", "buckets",
+                 "state", "severity", "z", "since", "notified", "last_notified")
+
+    def __init__(self, kind, label, bucket):
+        self.kind = kind
+        self.label = label
+        self.bucket = bucket
+        self.count = 0
+        self.mean = 0.0
+        self.var = 0.0
+        self.buckets = 0
+        self.state = "ok"
+        self.severity = None
+        self.z = 0.0
+        self.since = None
+        self.notified = False
+        self.last_notified = 0.0
+
+    def fold(self, value, alpha):
+        diff = value - self.mean
+        step = alpha * diff
+        self.mean += step
+        self.var = (1 - alpha) * (self.var + diff * step)
+        self.buckets += 1
+
+    def score(self, count):
+        """
+        z-score of `count` against the baseline: the smaller of the EWMA
+        z-score and the Poisson one on square-root counts (variance 1/4), so
+        neither bursty series nor the noise of low-rate ones raise false spikes.
+        """
+        z = (count - self.mean) / max(math.sqrt(self.var), 1.0)
+        return min(z, 2 * (math.sqrt(count) - math.sqrt(self.mean)))
+
+
+# -----------------------------
+# STREAMING DETECTOR
+# -----------------------------
+class RateAnomalyDetector:
+    """
+    Streaming spike detector over per-template and per-device event rates.
+
+    Every observed record is counted in the current BUCKET_SECONDS bucket of
+    its template (the cleaned message, see clean_text) and of its device.
+    When a series moves to a new bucket the finished count is folded into an
+    exponentially weighted mean and variance, so memory per series is
+    constant and each record costs O(1): one header match, one memoized
+    template, two counter updates. A spike is detected while the bucket is
+    still filling, as soon as its count is Z_HIGH deviations above the
+    baseline; a series can alert once `warmup` buckets have passed since
+    it was first seen. Entries observed with replay=True only build
+    baselines and never change alert state: history reloaded at startup,
+    and stored records logged before live_cutoff() (an old rotated file
+    uploaded now), so alerts are only raised for what is happening now.
+    Alerts follow the AlertEngine event format and lifecycle:
+    one "firing" event per spike (escalating to CRITICAL at Z_CRITICAL),
+    "resolved" once a closed bucket scores below Z_CLEAR, and repeat
+    notifications for a series inside `suppress_seconds` are counted, not
+    emitted.
+    """
+
+    def __init__(self, on_event=None, bucket_seconds=BUCKET_SECONDS, alpha=ALPHA, z_high=Z_HIGH,
+                 z_critical=None, min_count=MIN_COUNT, warmup=WARMUP_BUCKETS, max_series=MAX_SERIES,
+                 suppress_seconds=300):
+        self.on_event = on_event
+        self.bucket_seconds = bucket_seconds
+        self.alpha = alpha
+        self.z_high = z_high
+        self.z_critical = z_critical if z_critical is not None else 2 * z_high
+        self.min_count = min_count
+        self.warmup = warmup
+        self.max_series = max_series
+        self.suppress_seconds = suppress_seconds
+        self._series = OrderedDict()  # (kind, label) -> _Series, least recently seen first
+        self._firing = {}
+        self._templates = {}
+        self._lock = threading.Lock()
+        self.records = 0
+        self.late = 0
+        self.evicted = 0
+        self.suppressed = 0
+        self.last_ts = None
+
+    def _template(self, message):
+        template = self._templates.get(message)
+        if template is None:
+            if len(self._templates) >= TEMPLATE_MEMO_SIZE:
+                self._templates.clear()
+            template = self._templates[message] = clean_text(message) or "(empty)"
+        return template
+
+    def live_cutoff(self, now=None):
+        """Epoch seconds before which an entry is history rather than live (two buckets ago)."""
+        return (time.time() if now is None else now) - 2 * self.bucket_seconds
+
+    def observe(self, timestamp, content, device=None, replay=False):
+        """
+        Count one stored entry ("[LEVEL] EVENT : message" content or plain
+        text); returns the events emitted. With `replay` the entry only
+        updates the baselines: nothing fires, resolves or is emitted.
+        """
+        ts = _epoch(timestamp)
+        if device is None:
+            match = content_match(content)
+            if match:
+                device, content = match.groupdict().get("source"), match.group("message")
+        template = self._template(content)
+        bucket = int(ts // self.bucket_seconds)
+        events = []
+        with self._lock:
+            self.records += 1
+            if self.last_ts is None or ts > self.last_ts:
+                self.last_ts = ts
+            self._count(("template", template), bucket, ts, events, replay)
+            if device:
+                self._count(("device", device), bucket, ts, events, replay)
+            if self._firing and not replay and self.records % 1024 == 0:
+                self._expire(events)
+
+        if self.on_event:
+            for event in events:
+                self.on_event(event)
+        return events
+
+    def _count(self, key, bucket, ts, events, replay=False):
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _Series(key[0], key[1], bucket)
+            if len(self._series) > self.max_series:
+                _, old = self._series.popitem(last=False)
+                self._firing.pop((old.kind, old.label), None)
+                self.evicted += 1
+        else:
+            self._series.move_to_end(key)
+            if bucket < series.bucket:
+                self.late += 1  # an older bucket is already folded into the baseline
+                return
+            if bucket > series.bucket:
+                self._close(series, bucket, events)
+        series.count += 1
+
+        if replay or series.buckets < self.warmup or series.count < self.min_count:
+            return
+        z = series.score(series.count)
+        severity = "CRITICAL" if z >= self.z_critical else "HIGH" if z >= self.z_high else None
+        if severity is None or (series.state == "firing" and (severity == series.severity or severity == "HIGH")):
+            return
+        escalated = series.state == "firing"
+        series.state, series.severity, series.z = "firing", severity, z
+        self._firing[key] = series
+        if not escalated:
+            series.since = ts
+            if series.last_notified and ts - series.last_notified < self.suppress_seconds:
+                self.suppressed += 1
+                series.notified = False
+                return
+        series.notified = True
+        series.last_notified = ts
+        events.append(self._event(series, "firing", severity, series.count, ts))
+
+    def _close(self, series, bucket, events):
+        """Fold the finished bucket and any empty ones up to `bucket` into the baseline."""
+        count = series.count
+        z = series.score(count)
+        series.fold(count, self.alpha)
+        for _ in range(min(bucket - series.bucket - 1, _MAX_GAP)):
+            series.fold(0, self.alpha)
+        series.bucket, series.count = bucket, 0
+        if series.state == "firing" and z < Z_CLEAR:
+            self._resolve(series, count, bucket * self.bucket_seconds, events)
+
+    def _resolve(self, series, count, ts, events):
+        severity, notified = series.severity, series.notified
+        series.state, series.severity, series.since, series.notified = "ok", None, None, False
+        self._firing.pop((series.kind, series.label), None)
+        # A firing that was suppressed resolves silently as well
+        if notified:
+            events.append(self._event(series, "resolved", severity, count, ts))
+
+    def _expire(self, events):
+        """Resolve firing series that have gone quiet: no events for a whole bucket of log time."""
+        current = int(self.last_ts // self.bucket_seconds)
+        for series in list(self._firing.values()):
+            if series.bucket < current - 1:
+                self._resolve(series, 0, current * self.bucket_seconds, events)
+
+    def _event(self, series, state, severity, count, ts):
+        what = f"{series.kind} '{series.label}'"
+        if state == "resolved":
+            msg = f"Log rate back to normal for {what}: {count} in {self.bucket_seconds:g}s"
+        else:
+            msg = (f"Log rate spike for {what}: {count} in {self.bucket_seconds:g}s "
+                   f"(baseline {series.mean:.1f}, z={series.z:.1f})")
+        return {
+            "ts": round(ts, 3),
+            "time": datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S"),
+            "severity": severity,
+            "type": "Logs",
+            "msg": msg,
+            "rule": f"log_rate:{series.kind}",
+            "key": series.label,
+            "state": state,
+            "value": count,
+            "baseline": round(series.mean, 2)
+        }
+
+    def active(self):
+        """Series whose rate spike is currently firing."""
+        with self._lock:
+            return [self._event(s, "firing", s.severity, s.count, s.since) for s in self._firing.values()]
+
+    def baseline(self, kind, label):
+        with self._lock:
+            series = self._series.get((kind, label))
+            if series is None:
+                return None
+            return {"kind": kind, "label": label, "count": series.count, "mean": round(series.mean, 3),
+                    "std": round(math.sqrt(series.var), 3), "buckets": series.buckets, "state": series.state}
+
+    def status(self):
+        with self._lock:
+            kinds = {}
+            for kind, _ in self._series:
+                kinds[kind] = kinds.get(kind, 0) + 1
+            return {
+                "bucket_seconds": self.bucket_seconds,
+                "alpha": self.alpha,
+                "z_high": self.z_high,
+                "z_critical": self.z_critical,
+                "min_count": self.min_count,
+                "records": self.records,
+                "late": self.late,
+                "series": kinds,
+                "max_series": self.max_series,
+                "evicted": self.evicted,
+                "suppressed": self.suppressed,
+                "firing": len(self._firing)
+            }
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+            self._firing.clear()
+            self.records = self.late = self.evicted = self.suppressed = 0
+            self.last_ts = None
@@ -4,17 +4,38 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from summarizer import summarize_log
-from alert_classifier import classify_log, train_alert_model
 from chatbot import chatbot_response, get_chatbot
+from analysis_pool import (get_pool, PoolBusy, TaskTimeout, summarize_task, classify_task, analyze_task,
+                           classify_upload_task, search_upload_task)
 import threading
+import time
 
 app = Flask(__name__)
 CORS(app)
 
-# Train model on startup
-model_thread = threading.Thread(target=train_alert_model, daemon=True)
-model_thread.start()
+# The ML stack (summarizer, alert classifier, sklearn, pandas) is not imported
+# at module level: routes import it on first use, and a warm-up thread loads it
+# right after startup so the server answers immediately. Summarize, classify
+# and analyze run in the analysis pool's worker processes, which the warm-up
+# starts once the model is current. Pool workers import this module as
+# __mp_main__ and must not warm up themselves.
+WARMUP = (os.environ.get("NEXOOPS_WARMUP", "1") != "0" and "--profile-startup" not in sys.argv
+          and __name__ != "__mp_main__")
+
+def warm_up():
+    """Import the ML stack, load the stored model (retraining if it is stale) and start the analysis pool."""
+    import summarizer  # noqa: F401
+    from alert_classifier import ensure_alert_model
+    status = ensure_alert_model()
+    try:
+        get_pool().start()
+    except Exception as e:
+        # Requests retry the start on first use
+        print(f"Analysis pool failed to start: {e}")
+    return status
+
+if WARMUP:
+    threading.Thread(target=warm_up, daemon=True, name="warm-up").start()
 
 @app.route('/', methods=['GET'])
 def home():
@@ -24,10 +45,12 @@ def home():
         "message": "NexoOps Backend API",
         "version": "1.0.0",
         "endpoints": {
-            "log_analysis": ["/summarize", "/classify"],
+            "log_analysis": ["/summarize", "/classify", "/analyze", "/ingest", "/upload", "/uploads", "/feedback",
+                             "/model", "/logs/search", "/logs/archive", "/logs/compact",
+                             "/logs/anomalies"],
             "chatbot": ["/chat"],
-            "network": ["/network/status", "/network/alerts", "/network/speed-test",
-                       "/network/interfaces", "/network/connections", "/network/bandwidth",
+            "network": ["/network/status", "/network/alerts", "/network/alert-rules", "/network/speed-test",
+                       "/network/interfaces", "/network/connections", "/network/processes", "/network/bandwidth",
                        "/network/ping", "/network/port-check", "/network/health"]
         }
     })
@@ -35,6 +58,25 @@ def home():
 
 # ==================== LOG ANALYSIS ENDPOINTS ====================
 
+def _pool_error(e):
+    """503 with Retry-After when the analysis queue is full, 504 when a task timed out."""
+    if isinstance(e, PoolBusy):
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "1"}
+    return jsonify({"error": str(e)}), 504
+
+def _deadline_ms(data):
+    """Optional positive `deadline_ms` from a request body; raises ValueError if malformed."""
+    value = data.get("deadline_ms")
+    if value is None:
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ValueError("deadline_ms must be a number")
+    if value <= 0:
+        raise ValueError("deadline_ms must be positive")
+    return value
+
 @app.route('/summarize', methods=['POST'])
 def summarize():
     """Summarize log text"""
@@ -45,14 +87,32 @@ def summarize():
         if not text:
             return jsonify({"error": "No log text provided"}), 400
         
+        from summary_engine import BACKENDS
         n_sentences = data.get("n_sentences", 5)
-        summary = summarize_log(text, n_sentences=n_sentences)
+        backend = data.get("backend")
+        if backend and backend not in BACKENDS:
+            return jsonify({"error": f"Unknown backend, expected one of {list(BACKENDS)}"}), 400
+        try:
+            deadline_ms = _deadline_ms(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        result = get_pool().run(summarize_task, text, n_sentences, backend, deadline_ms)
+        summary = result["summary"]
         
-        return jsonify({
+        response = {
             "summary": summary,
             "original_length": len(text),
-            "summary_length": len(summary)
-        })
+            "summary_length": len(summary),
+            "backend": result["backend"],
+            "tier": result["tier"],
+            "cached": result["cached"]
+        }
+        if deadline_ms is not None:
+            response.update(deadline_ms=deadline_ms, elapsed_ms=result["elapsed_ms"],
+                            deadline_met=result["deadline_met"])
+        return jsonify(response)
+    except (PoolBusy, TaskTimeout) as e:
+        return _pool_error(e)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -67,12 +127,44 @@ def classify():
         if not text:
             return jsonify({"error": "No log text provided"}), 400
         
-        result = classify_log(text)
+        result = get_pool().run(classify_task, text)
+        if result["severity"] is None:
+            from alert_classifier import is_training
+            return jsonify({"error": "Model is not available yet", "training": is_training()}), 503
         
         return jsonify({
             "classification": result,
             "timestamp": request.args.get('timestamp', None)
         })
+    except (PoolBusy, TaskTimeout) as e:
+        return _pool_error(e)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/feedback', methods=['POST'])
+def feedback():
+    """Teach the classifier operator-corrected severities"""
+    try:
+        from alert_classifier import record_feedback
+        from online_learner import normalize_severity
+        data = request.get_json()
+        items = data.get("items") or [data]
+        
+        examples = []
+        for item in items:
+            text = item.get("log_text", "")
+            severity = normalize_severity(item.get("severity"))
+            if not text or not severity:
+                return jsonify({"error": "Each item needs log_text and a severity of Low, Medium, High or Critical"}), 400
+            examples.append((text, severity))
+        
+        status = record_feedback(examples)
+        
+        return jsonify({
+            "accepted": len(examples),
+            "online_model": status
+        })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -87,14 +179,349 @@ def analyze():
         if not text:
             return jsonify({"error": "No log text provided"}), 400
         
-        summary = summarize_log(text)
-        classification = classify_log(text)
+        try:
+            deadline_ms = _deadline_ms(data)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         
-        return jsonify({
-            "summary": summary,
-            "classification": classification,
+        result = get_pool().run(analyze_task, text, deadline_ms)
+        
+        response = {
+            "summary": result["summary"]["summary"],
+            "summary_tier": result["summary"]["tier"],
+            "classification": result["classification"],
             "original_length": len(text)
+        }
+        if deadline_ms is not None:
+            response.update(deadline_ms=deadline_ms, elapsed_ms=result["elapsed_ms"],
+                            deadline_met=result["elapsed_ms"] <= deadline_ms)
+        return jsonify(response)
+    except (PoolBusy, TaskTimeout) as e:
+        return _pool_error(e)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+_ingest_lock = threading.Lock()
+
+@app.route('/ingest', methods=['POST'])
+def ingest_logs():
+    """Classify and template every log file in a directory or glob under the ingest root"""
+    try:
+        from bulk_ingest import resolve_paths, ingest, INGEST_ROOT
+        data = request.get_json(silent=True) or {}
+        target = data.get("path", "")
+        
+        if not target:
+            return jsonify({"error": "No path provided (a directory, glob or file under the ingest root)"}), 400
+        
+        try:
+            paths = resolve_paths(os.path.join(INGEST_ROOT, target), root=INGEST_ROOT)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 403
+        except FileNotFoundError:
+            return jsonify({"error": f"Nothing matches {target}"}), 404
+        if not paths:
+            return jsonify({"error": f"No log files match {target}"}), 404
+        
+        if not _ingest_lock.acquire(blocking=False):
+            return jsonify({"error": "An ingest is already running", "status": "busy"}), 409
+        try:
+            workers = data.get("workers")
+            report = ingest(paths, workers=int(workers) if workers else None)
+        finally:
+            _ingest_lock.release()
+        
+        report["files"] = [dict(f, file=os.path.relpath(f["file"], INGEST_ROOT)) for f in report["files"]]
+        return jsonify(report)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/upload', methods=['POST'])
+def upload_logs():
+    """Classify an uploaded log stream (raw body or multipart files; plain, gzip, bz2 or zstd)"""
+    try:
+        from itertools import groupby
+        from bulk_ingest import ingest_lines, merge_reports
+        from log_stream import StreamDecoder, iter_lines, iter_multipart_lines, UnsupportedCodec, UploadTooLarge
+        # The body is decompressed and parsed as it arrives, so it is read here
+        # rather than in the analysis pool; memory stays at one chunk plus one batch
+        store = request.args.get("store", "0").lower() in ("1", "true", "yes")
+        logs = get_chatbot().ops.logs if store else None
+        start = time.perf_counter()
+        reports, parts = [], []
+
+        def add(lines, name, decoder):
+            report = ingest_lines(lines, name, on_batch=logs.add_records if logs else None)
+            report["bytes"] = decoder.bytes_out
+            report["error"] = report["error"] or decoder.error
+            reports.append(report)
+            parts.append(dict(decoder.stats(), file=name, records=report["records"], error=report["error"]))
+
+        try:
+            if request.mimetype == "multipart/form-data":
+                boundary = request.mimetype_params.get("boundary")
+                if not boundary:
+                    return jsonify({"error": "multipart body without a boundary"}), 400
+                for (_, name), group in groupby(iter_multipart_lines(request.stream, boundary),
+                                                key=lambda item: item[:2]):
+                    decoder = next(group)[2]  # the part's opening item, without a line
+                    add((line for *_, line in group), name, decoder)
+            else:
+                decoder = StreamDecoder()
+                add(iter_lines(request.stream, decoder), request.args.get("name", "upload"), decoder)
+        except UploadTooLarge as e:
+            return jsonify({"error": str(e)}), 413
+        except UnsupportedCodec as e:
+            return jsonify({"error": str(e)}), 415
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        if not any(r["records"] for r in reports):
+            errors = [r["error"] for r in reports if r["error"]]
+            return jsonify({"error": errors[0] if errors else "No log records in upload"}), 400
+
+        report = merge_reports(reports, 0.0, time.perf_counter() - start, 1)
+        compressed = sum(p["compressed_bytes"] for p in parts)
+        decompressed = sum(p["decompressed_bytes"] for p in parts)
+        report["transfer"] = {
+            "parts": parts,
+            "compressed_bytes": compressed,
+            "decompressed_bytes": decompressed,
+            "ratio": round(decompressed / compressed, 2) if compressed else None
+        }
+        if logs:
+            logs.add(f"Uploaded {report['records']} log records from {len(parts)} file(s)")
+        report["stored"] = store
+        return jsonify(report)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/logs/search', methods=['GET'])
+def search_logs():
+    """Boolean full-text search over stored logs (?q=, hours or since/until, limit/offset)"""
+    try:
+        from datetime import datetime
+        query = request.args.get("q", "").strip()
+        if not query:
+            return jsonify({"error": "No query provided (words are ANDed; use OR and -word)"}), 400
+        try:
+            hours = float(request.args["hours"]) if request.args.get("hours") else None
+            since, until = (datetime.fromisoformat(request.args[key]) if request.args.get(key) else None
+                            for key in ("since", "until"))
+            limit = max(1, min(int(request.args.get("limit", 50)), 500))
+            offset = max(0, int(request.args.get("offset", 0)))
+        except ValueError as e:
+            return jsonify({"error": f"Bad parameter: {e}"}), 400
+
+        result = get_chatbot().ops.logs.search(query, hours=hours, since=since, until=until,
+                                               limit=limit, offset=offset)
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/logs/archive', methods=['GET'])
+def archive_counts():
+    """Archived entry counts grouped by columns (?by=device,hour&severities=High,Critical&days=30)"""
+    try:
+        from datetime import datetime, timedelta
+        from log_archive import get_archive
+
+        def listed(key):
+            value = request.args.get(key)
+            return [v.strip() for v in value.split(",") if v.strip()] if value else None
+
+        try:
+            since, until = (datetime.fromisoformat(request.args[key]) if request.args.get(key) else None
+                            for key in ("since", "until"))
+            if request.args.get("days") and since is None:
+                since = datetime.now() - timedelta(days=float(request.args["days"]))
+            top = int(request.args.get("top", 100))
+            result = get_archive().aggregate(listed("by") or ("device", "hour"), levels=listed("levels"),
+                                             severities=listed("severities"), since=since, until=until, top=top)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/logs/compact', methods=['POST'])
+def compact_logs():
+    """Roll text log entries older than keep_hours into the columnar archive"""
+    try:
+        data = request.get_json(silent=True) or {}
+        keep_hours = data.get("keep_hours")
+        try:
+            keep_hours = float(keep_hours) if keep_hours is not None else None
+        except (TypeError, ValueError):
+            return jsonify({"error": "keep_hours must be a number"}), 400
+        from log_archive import CompactionRunning
+        try:
+            return jsonify(get_chatbot().ops.logs.compact(keep_hours=keep_hours))
+        except CompactionRunning as e:
+            return jsonify({"error": str(e), "status": "busy"}), 409
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/logs/anomalies', methods=['GET'])
+def log_anomalies():
+    """Firing log-rate spikes and the streaming detector's state"""
+    try:
+        detector = get_chatbot().ops.logs.anomalies
+        active = detector.active()
+        return jsonify({"active": active, "active_count": len(active), "detector": detector.status()})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# ==================== CHUNKED UPLOADS ====================
+# POST /uploads opens an upload; the client PATCHes plain-text chunks with
+# their byte offset (Upload-Offset header or ?offset=) and resumes from the
+# offset GET returns after a failure. The data is spooled to disk and indexed
+# as it arrives, and the upload is then analyzed by its id.
+
+def _upload_error(e):
+    from upload_spool import UnknownUpload, OffsetMismatch, ChunkTooLarge
+    if isinstance(e, UnknownUpload):
+        return jsonify({"error": "Unknown or expired upload"}), 404
+    if isinstance(e, OffsetMismatch):
+        return jsonify({"error": str(e), "offset": e.expected}), 409, {"Upload-Offset": str(e.expected)}
+    if isinstance(e, ChunkTooLarge):
+        return jsonify({"error": str(e)}), 413
+    return jsonify({"error": str(e)}), 409
+
+@app.route('/uploads', methods=['POST'])
+def create_upload():
+    """Open a chunked upload"""
+    try:
+        from upload_spool import get_spool, MAX_CHUNK
+        data = request.get_json(silent=True) or {}
+        upload = get_spool().create(name=str(data.get("name") or "upload"))
+        return jsonify(dict(upload.status(), chunk_limit=MAX_CHUNK)), 201
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/uploads/<upload_id>', methods=['GET', 'PATCH', 'DELETE'])
+def upload_chunk(upload_id):
+    """Status of an upload, append a chunk, or delete it"""
+    try:
+        from upload_spool import get_spool, UnknownUpload, OffsetMismatch, UploadClosed, ChunkTooLarge
+        spool = get_spool()
+        try:
+            if request.method == 'DELETE':
+                spool.delete(upload_id)
+                return jsonify({"deleted": upload_id})
+            upload = spool.get(upload_id)
+            if request.method == 'GET':
+                return jsonify(upload.status())
+            offset = request.headers.get("Upload-Offset", request.args.get("offset"))
+            if offset is None or not str(offset).isdigit():
+                return jsonify({"error": "Each chunk needs its byte offset (Upload-Offset header or ?offset=)"}), 400
+            size = upload.append(int(offset), request.stream)
+        except (UnknownUpload, OffsetMismatch, UploadClosed, ChunkTooLarge) as e:
+            return _upload_error(e)
+        return jsonify(upload.status()), 200, {"Upload-Offset": str(size)}
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/uploads/<upload_id>/complete', methods=['POST'])
+def complete_upload(upload_id):
+    """Close an upload to further chunks"""
+    try:
+        from upload_spool import get_spool, UnknownUpload
+        try:
+            return jsonify(get_spool().get(upload_id).complete())
+        except UnknownUpload as e:
+            return _upload_error(e)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/uploads/<upload_id>/summarize', methods=['POST'])
+def summarize_upload(upload_id):
+    """Summarize an upload from evenly spaced records"""
+    try:
+        from upload_spool import get_spool, UnknownUpload, SAMPLE_RECORDS
+        data = request.get_json(silent=True) or {}
+        try:
+            upload = get_spool().get(upload_id)
+            deadline_ms = _deadline_ms(data)
+        except UnknownUpload as e:
+            return _upload_error(e)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        text = upload.sample_text()
+        if not text:
+            return jsonify({"error": "The upload has no records yet"}), 400
+
+        result = get_pool().run(summarize_task, text, data.get("n_sentences", 5), data.get("backend"), deadline_ms)
+        return jsonify({
+            "upload_id": upload_id,
+            "summary": result["summary"],
+            "records": upload.meta["records"],
+            "sampled_records": min(upload.meta["records"], SAMPLE_RECORDS),
+            "tier": result["tier"],
+            "complete": upload.meta["complete"]
         })
+    except (PoolBusy, TaskTimeout) as e:
+        return _pool_error(e)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/uploads/<upload_id>/classify', methods=['POST'])
+def classify_upload(upload_id):
+    """Classify and template every record of an upload (as /ingest does for files)"""
+    try:
+        from upload_spool import get_spool, UnknownUpload, UPLOAD_TASK_TIMEOUT
+        spool = get_spool()
+        try:
+            spool.get(upload_id)
+        except UnknownUpload as e:
+            return _upload_error(e)
+
+        if not _ingest_lock.acquire(blocking=False):
+            return jsonify({"error": "An ingest is already running", "status": "busy"}), 409
+        try:
+            report = get_pool().run(classify_upload_task, upload_id, spool.root, timeout=UPLOAD_TASK_TIMEOUT)
+        finally:
+            _ingest_lock.release()
+        return jsonify(report)
+    except (PoolBusy, TaskTimeout) as e:
+        return _pool_error(e)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/uploads/<upload_id>/search', methods=['GET'])
+def search_upload(upload_id):
+    """Records of an upload containing every word of ?q= (paginated with limit/offset)"""
+    try:
+        from upload_spool import get_spool, UnknownUpload, UPLOAD_TASK_TIMEOUT
+        terms = request.args.get("q", "").split()
+        if not terms:
+            return jsonify({"error": "No query provided"}), 400
+        try:
+            limit = min(int(request.args.get("limit", 50)), 500)
+            offset = int(request.args.get("offset", 0))
+        except ValueError:
+            return jsonify({"error": "limit and offset must be integers"}), 400
+        spool = get_spool()
+        try:
+            spool.get(upload_id)
+        except UnknownUpload as e:
+            return _upload_error(e)
+        # A scan of the whole spool: in the pool, so it is bounded like the other analysis routes
+        return jsonify(get_pool().run(search_upload_task, upload_id, spool.root, terms, limit, offset,
+                                      timeout=UPLOAD_TASK_TIMEOUT))
+    except (PoolBusy, TaskTimeout) as e:
+        return _pool_error(e)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -147,20 +574,36 @@ def network_alerts():
     """Get network alerts"""
     try:
         bot = get_chatbot()
-        hours = int(request.args.get('hours', 24))
+        hours = float(request.args.get('hours', 24))
+        severity = request.args.get('severity', None)
+        alert_type = request.args.get('type', None)
+        limit = request.args.get('limit', None)
         
-        current_alerts = bot.ops.check_alerts()
-        recent_alerts = bot.ops.get_recent_alerts(hours=hours)
+        active_alerts = bot.ops.check_alerts()
+        recent_alerts = bot.ops.get_recent_alerts(hours=hours, severity=severity, alert_type=alert_type,
+                                                  limit=int(limit) if limit else None)
         
         return jsonify({
-            "alerts": current_alerts + recent_alerts,
-            "count": len(current_alerts + recent_alerts),
+            "active": active_alerts,
+            "active_count": len(active_alerts),
+            "alerts": recent_alerts,
+            "count": len(recent_alerts),
             "time_window_hours": hours
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/network/alert-rules', methods=['GET'])
+def network_alert_rules():
+    """Get alert rules and their current evaluation state"""
+    try:
+        bot = get_chatbot()
+        return jsonify(bot.ops.alert_engine.status())
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route('/network/speed-test', methods=['POST'])
 def speed_test():
     """Run internet speed test"""
@@ -181,7 +624,8 @@ def network_interfaces():
     """Get network interfaces"""
     try:
         bot = get_chatbot()
-        interfaces = bot.ops.get_interfaces() 
+        window = request.args.get('window', None)
+        interfaces = bot.ops.get_interfaces(window=int(window) if window else None)
         
         return jsonify({
             "interfaces": interfaces,
@@ -207,12 +651,31 @@ def network_connections():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/network/processes', methods=['GET'])
+def network_processes():
+    """Get top talkers by per-process throughput"""
+    try:
+        bot = get_chatbot()
+        window = int(request.args.get('window', 60))
+        top = int(request.args.get('top', 10))
+        talkers = bot.ops.get_top_talkers(window=window, limit=top)
+        
+        return jsonify({
+            "top_talkers": talkers,
+            "sample_interval": bot.ops.process_io.interval,
+            "status": "success" if "error" not in talkers else "failed"
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 @app.route('/network/bandwidth', methods=['GET'])
 def network_bandwidth():
     """Get current bandwidth usage"""
     try:
         bot = get_chatbot()
-        bandwidth = bot.ops.get_bandwidth()  
+        window = request.args.get('window', None)
+        bandwidth = bot.ops.get_bandwidth(window=int(window) if window else None)
         
         return jsonify({
             "bandwidth": bandwidth,
@@ -302,10 +765,18 @@ def network_history():
 def train_model():
     """Manually trigger model training"""
     try:
-        def train_in_background():
-            train_alert_model()
+        from alert_classifier import ensure_alert_model, is_training
+        if is_training():
+            return jsonify({
+                "message": "Model training already in progress",
+                "status": "training"
+            }), 409
+        
+        data = request.get_json(silent=True) or {}
+        policy = {key: float(data[key]) for key in ("latency_budget_ms", "accuracy_per_ms")
+                  if data.get(key) is not None}
         
-        thread = threading.Thread(target=train_in_background, daemon=True)
+        thread = threading.Thread(target=ensure_alert_model, kwargs=dict(policy, force=True), daemon=True)
         thread.start()
         
         return jsonify({
@@ -315,21 +786,126 @@ def train_model():
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+
+@app.route('/model', methods=['GET'])
+def model_status():
+    """Get the manifest of the served alert model"""
+    try:
+        from alert_classifier import (model_info, serving_backend, get_online_learner, is_training,
+                                      training_fingerprint, MODEL_STORE)
+        return jsonify({
+            "model": model_info(),
+            "backend": serving_backend(),
+            "online_model": get_online_learner().status(),
+            "training": is_training(),
+            "current": MODEL_STORE.is_current(training_fingerprint())
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/stats', methods=['GET'])
 def api_stats():
     """Get API statistics"""
     try:
         bot = get_chatbot()
+        pool = get_pool()
+        # Each worker process has its own caches and timings: report them summed with the API process's
+        analysis = pool.merged_stats()
         
         return jsonify({
             "alerts_count": len(bot.ops.alerts),
             "logs_count": len(bot.ops.logs.logs),
+            "log_index": bot.ops.logs.index.stats(),
+            "log_anomalies": bot.ops.logs.anomalies.status(),
+            "classifier_cache": analysis["classifier_cache"],
+            "summarizer": analysis["summarizer"],
+            "stats_processes": analysis["processes"],
+            "analysis_pool": pool.stats(),
             "system_status": "operational"
         })
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+# ==================== STARTUP PROFILING ====================
+
+_PROFILE_CHILD = """
+import sys, time, json
+t0 = time.perf_counter()
+import api
+t1 = time.perf_counter()
+status = api.app.test_client().get('/').status_code
+t2 = time.perf_counter()
+answered = time.time()
+sys.stderr.write("-- warm-up --\\n")
+sys.stderr.flush()
+model = api.warm_up()
+t3 = time.perf_counter()
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "first_response_ms": (t2 - t1) * 1000, "status": status,
+                  "answered_at": answered, "warm_up_ms": (t3 - t2) * 1000, "model": model}))
+"""
+
+def _parse_importtime(lines):
+    """-X importtime lines -> [(module, self_us, cumulative_us, depth)]."""
+    modules = []
+    for line in lines:
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return modules
+
+def _print_import_phase(title, modules, top):
+    by_package = {}
+    for name, self_us, _, _ in modules:
+        package = name.split(".")[0]
+        by_package[package] = by_package.get(package, 0) + self_us
+    total_ms = sum(by_package.values()) / 1000
+    print(f"\n{title}: {len(modules)} modules, {total_ms:.0f}ms importing")
+    print(f"  {'package':<28}{'self ms':>10}")
+    for package, self_us in sorted(by_package.items(), key=lambda x: -x[1])[:top]:
+        print(f"  {package:<28}{self_us / 1000:>10.1f}")
+    slowest = sorted((m for m in modules if m[3] == 0), key=lambda m: -m[2])[:top]
+    print(f"  {'top-level import':<28}{'cumulative ms':>14}")
+    for name, _, cumulative_us, _ in slowest:
+        print(f"  {name:<28}{cumulative_us / 1000:>14.1f}")
+
+def profile_startup(top=15):
+    """
+    Start the API in a fresh interpreter under `python -X importtime`, answer
+    GET / and then run the warm-up phase, and report import time per package
+    for each phase plus the time until / was answered.
+    """
+    import json
+    import time
+    import subprocess
+
+    env = dict(os.environ, NEXOOPS_WARMUP="0")
+    started = time.time()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", _PROFILE_CHILD],
+                          cwd=os.path.dirname(os.path.abspath(__file__)), env=env,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        print(proc.stderr[-4000:])
+        return None
+
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    stderr = proc.stderr.splitlines()
+    split = stderr.index("-- warm-up --") if "-- warm-up --" in stderr else len(stderr)
+
+    print("=" * 60)
+    print("NexoOps API startup profile")
+    print("=" * 60)
+    print(f"  import api:                 {result['import_ms']:.0f}ms")
+    print(f"  first GET / (HTTP {result['status']}):     {result['first_response_ms']:.1f}ms")
+    print(f"  process start -> / answered: {(result['answered_at'] - started) * 1000:.0f}ms")
+    print(f"  warm-up (ML stack + model): {result['warm_up_ms']:.0f}ms ({result['model']})")
+    _print_import_phase("Startup imports", _parse_importtime(stderr[:split]), top)
+    _print_import_phase("Warm-up imports", _parse_importtime(stderr[split:]), top)
+    return result
+
+
 # ==================== ERROR HANDLERS ====================
 
 @app.errorhandler(404)
@@ -341,6 +917,15 @@ def internal_error(error):
     return jsonify({"error": "Internal server error"}), 500
 
 if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description="NexoOps Backend API Server")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="report per-module import time and time to first response, then exit")
+    parser.add_argument("--top", type=int, default=15, help="rows per table in --profile-startup")
+    args = parser.parse_args()
+    if args.profile_startup:
+        sys.exit(0 if profile_startup(args.top) else 1)
+
     print("=" * 60)
     print("NexoOps Backend API Server")
     print("=" * 60)
@@ -349,14 +934,25 @@ if __name__ == '__main__':
     print("  POST /summarize        - Summarize log text")
     print("  POST /classify         - Classify log severity")
     print("  POST /analyze          - Complete analysis")
+    print("  POST /ingest           - Bulk-analyze a log directory or glob")
+    print("  POST /upload           - Analyze an uploaded (optionally compressed) log stream")
+    print("  POST /uploads          - Open a resumable chunked upload (PATCH chunks, then")
+    print("                           /uploads/<id>/complete, summarize, classify, search)")
+    print("  POST /feedback         - Correct a log's severity")
+    print("  GET  /logs/search      - Search stored logs (?q=10.0.3.7 OR gi0/24&hours=6)")
+    print("  GET  /logs/archive     - Archived counts (?by=device,hour&severities=High,Critical&days=30)")
+    print("  POST /logs/compact     - Roll old text log entries into the columnar archive")
+    print("  GET  /logs/anomalies   - Firing per-template / per-device log rate spikes")
     print("\nChatbot:")
     print("  POST /chat             - Chat with assistant")
     print("\nNetwork Monitoring:")
     print("  GET  /network/status   - Current network status")
-    print("  GET  /network/alerts   - Recent alerts")
+    print("  GET  /network/alerts   - Firing and recent alerts")
+    print("  GET  /network/alert-rules - Alert rules and state")
     print("  POST /network/speed-test - Run speed test")
     print("  GET  /network/interfaces - List interfaces")
     print("  GET  /network/connections - Active connections")
+    print("  GET  /network/processes - Top talkers by process")
     print("  GET  /network/bandwidth - Bandwidth usage")
     print("  POST /network/ping     - Ping a host")
     print("  POST /network/port-check - Check port")
@@ -364,6 +960,7 @@ if __name__ == '__main__':
     print("  GET  /network/history  - Network history")
     print("\nUtility:")
     print("  POST /train-model      - Train ML model")
+    print("  GET  /model            - Served model manifest")
     print("  GET  /stats            - API statistics")
     print("=" * 60)
     print("\nStarting server on http://127.0.0.1:5000")
@@ -0,0 +1,251 @@
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+import multiprocessing
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from log_records import parse_records
+from log_features import clean_text
+
+# /ingest only reads below this directory
+INGEST_ROOT = os.path.realpath(os.environ.get(
+    "NEXOOPS_INGEST_ROOT",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data")
+))
+LOG_SUFFIXES = (".log", ".txt")
+BATCH_RECORDS = 2048
+# Per-file memo of message -> template; cleared when it reaches this size
+TEMPLATE_MEMO_SIZE = 100000
+TOP_TEMPLATES = 20
+STAGES = ("parse", "classify", "template")
+
+
+# -----------------------------
+# FILE SELECTION
+# -----------------------------
+def resolve_paths(target, root=None):
+    """
+    Files for a directory (its *.log / *.txt files, recursively), a glob or a
+    single file, sorted. With `root`, anything resolving outside it is
+    rejected with ValueError.
+    """
+    if os.path.isdir(target):
+        paths = [os.path.join(d, f) for d, _, files in os.walk(target) for f in files
+                 if f.endswith(LOG_SUFFIXES)]
+    elif glob.has_magic(target):
+        paths = [p for p in glob.glob(target, recursive=True) if os.path.isfile(p)]
+    elif os.path.isfile(target):
+        paths = [target]
+    else:
+        raise FileNotFoundError(f"No such file, directory or pattern: {target}")
+    paths = sorted(os.path.realpath(p) for p in paths)
+    if root is not None:
+        root = os.path.realpath(root)
+        candidates = paths if glob.has_magic(target) else paths + [os.path.realpath(target)]
+        if any(os.path.commonpath([root, p]) != root for p in candidates):
+            raise ValueError(f"Path must be inside {root}")
+    return paths
+
+
+# -----------------------------
+# PER-FILE WORK (POOL WORKERS)
+# -----------------------------
+def _init_worker():
+    from alert_classifier import load_alert_model
+    load_alert_model()
+
+def _ping():
+    return os.getpid()
+
+def _classify_batch(batch, report, timings, memo):
+    from alert_classifier import classify_records
+    start = time.perf_counter()
+    verdicts = classify_records(batch)
+    timings["classify"] += time.perf_counter() - start
+
+    start = time.perf_counter()
+    for record, verdict in zip(batch, verdicts):
+        severity = verdict["severity"] or "Unclassified"
+        report["severities"][severity] += 1
+        report["sources"][verdict["source"]] += 1
+        if record.level:
+            report["levels"][record.level] += 1
+        if record.event:
+            report["events"][record.event] += 1
+        template = memo.get(record.message)
+        if template is None:
+            if len(memo) >= TEMPLATE_MEMO_SIZE:
+                memo.clear()
+            template = memo[record.message] = clean_text(record.message)
+        report["templates"][template] += 1
+        report["samples"].setdefault(template, (severity, record.text))
+    timings["template"] += time.perf_counter() - start
+
+def ingest_lines(lines, name, nbytes=None, batch_records=BATCH_RECORDS, on_batch=None):
+    """
+    Stream the records of an iterable of lines (a file, a decompressing upload)
+    in batches; counts and per-stage seconds for the merge. `on_batch` gets
+    every classified batch of LogRecords, e.g. to store them. A read error
+    ends the stream and is recorded in the report with what was counted so far.
+    """
+    report = {"file": name, "bytes": nbytes, "records": 0, "severities": Counter(),
+              "sources": Counter(), "levels": Counter(), "events": Counter(), "templates": Counter(),
+              "samples": {}, "error": None}
+    timings = dict.fromkeys(STAGES, 0.0)
+    memo = {}
+    try:
+        records = parse_records(lines)
+        while True:
+            start = time.perf_counter()
+            batch = [record for _, record in zip(range(batch_records), records)]
+            timings["parse"] += time.perf_counter() - start
+            if not batch:
+                break
+            report["records"] += len(batch)
+            _classify_batch(batch, report, timings, memo)
+            if on_batch is not None:
+                on_batch(batch)
+    except (OSError, UnicodeError) as e:
+        report["error"] = str(e)
+    report["timings"] = timings
+    return report
+
+def ingest_file(path, batch_records=BATCH_RECORDS):
+    """ingest_lines over one file."""
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return ingest_lines(f, path, nbytes=os.path.getsize(path), batch_records=batch_records)
+    except OSError as e:
+        report = ingest_lines([], path, nbytes=0)
+        report["error"] = str(e)
+        return report
+
+
+# -----------------------------
+# SHARDING & MERGE
+# -----------------------------
+def merge_reports(reports, startup_seconds, run_seconds, workers):
+    """One report over per-file reports from ingest_lines/ingest_file."""
+    merged = {"severities": Counter(), "sources": Counter(), "levels": Counter(), "events": Counter(),
+              "templates": Counter()}
+    samples = {}
+    timings = dict.fromkeys(STAGES, 0.0)
+    files = []
+    for report in sorted(reports, key=lambda r: r["file"]):
+        for key in merged:
+            merged[key].update(report[key])
+        for template, sample in report["samples"].items():
+            samples.setdefault(template, sample)
+        for stage in STAGES:
+            timings[stage] += report["timings"][stage]
+        files.append({"file": report["file"], "bytes": report["bytes"], "records": report["records"],
+                      "severities": dict(report["severities"]), "error": report["error"],
+                      "seconds": round(sum(report["timings"].values()), 4)})
+
+    records = sum(f["records"] for f in files)
+    total_bytes = sum(f["bytes"] for f in files)
+    top = [{"template": t, "count": n, "severity": samples[t][0], "example": samples[t][1]}
+           for t, n in merged["templates"].most_common(TOP_TEMPLATES)]
+    start = time.perf_counter()
+    summary = _summarize(top)
+    timings["summary"] = time.perf_counter() - start
+    return {
+        "files": files,
+        "records": records,
+        "bytes": total_bytes,
+        "severities": dict(merged["severities"]),
+        "verdict_sources": dict(merged["sources"]),
+        "levels": dict(merged["levels"]),
+        "top_events": dict(merged["events"].most_common(TOP_TEMPLATES)),
+        "distinct_templates": len(merged["templates"]),
+        "top_templates": top,
+        "summary": summary,
+        # Rates are over the processing time, after workers have loaded the model
+        "throughput": {
+            "startup_seconds": round(startup_seconds, 4),
+            "processing_seconds": round(run_seconds, 4),
+            "records_per_sec": round(records / run_seconds, 1) if run_seconds else None,
+            "mb_per_sec": round(total_bytes / 1e6 / run_seconds, 3) if run_seconds else None,
+            "workers": workers
+        },
+        # Summed over workers, so they can exceed wall time
+        "stage_seconds": {stage: round(seconds, 4) for stage, seconds in timings.items()}
+    }
+
+def _summarize(top):
+    """Extractive summary over one example per frequent template, most severe first."""
+    from summary_engine import get_engine
+    order = {"Critical": 0, "High": 1, "Medium": 2, "Low": 3}
+    examples = [t["example"] for t in sorted(top, key=lambda t: order.get(t["severity"], 4))]
+    return get_engine("api").summarize("\n".join(examples)) if examples else ""
+
+def ingest(paths, workers=None):
+    """
+    Classify and template every file in `paths`, sharded across a process pool
+    one file per task (largest first), and merge the results into one report.
+    """
+    cpus = os.cpu_count() or 1
+    workers = max(1, min(workers or cpus, cpus, len(paths) or 1))
+    reports = []
+    start = time.perf_counter()
+    if workers > 1:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker) as pool:
+            # Spawn every worker (each loads the model) before the clock for processing starts
+            for future in [pool.submit(_ping) for _ in range(workers)]:
+                future.result()
+            startup = time.perf_counter() - start
+            start = time.perf_counter()
+            futures = [pool.submit(ingest_file, path)
+                       for path in sorted(paths, key=os.path.getsize, reverse=True)]
+            for future in as_completed(futures):
+                reports.append(future.result())
+    else:
+        _init_worker()
+        startup = time.perf_counter() - start
+        start = time.perf_counter()
+        reports = [ingest_file(path) for path in paths]
+    return merge_reports(reports, startup, time.perf_counter() - start, workers)
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+def print_report(report):
+    t = report["throughput"]
+    print(f"{len(report['files'])} files, {report['records']} records, {report['bytes'] / 1e6:.2f} MB "
+          f"in {t['processing_seconds']:.2f}s with {t['workers']} worker(s) (+{t['startup_seconds']:.2f}s startup)")
+    print(f"  {t['records_per_sec']} records/s, {t['mb_per_sec']} MB/s")
+    print("  stage seconds (summed over workers): "
+          + ", ".join(f"{stage}={seconds:.3f}" for stage, seconds in report["stage_seconds"].items()))
+    print(f"  severities: {report['severities']}  (verdicts from {report['verdict_sources']})")
+    print(f"  {report['distinct_templates']} distinct templates; most frequent:")
+    for t in report["top_templates"][:10]:
+        print(f"    {t['count']:>7}  {t['severity']:<8} {t['example'][:90]}")
+    for f in report["files"]:
+        if f["error"]:
+            print(f"  ! {f['file']}: {f['error']}")
+    print(f"\nSummary: {report['summary']}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Classify and template every log file in a directory or glob")
+    parser.add_argument("targets", nargs="+", help="directories, globs (quote them) or files")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = parser.parse_args()
+
+    try:
+        paths = sorted({p for target in args.targets for p in resolve_paths(target)})
+    except FileNotFoundError as e:
+        sys.exit(str(e))
+    if not paths:
+        sys.exit("No log files found")
+    report = ingest(paths, workers=args.workers)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
@@ -12,281 +12,128 @@ import ipaddress
 import random
 import struct
 import json
+from importlib.util import find_spec
 
-# ML imports for log summarization
-try:
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.cluster import KMeans
-    import numpy as np
-    ML_AVAILABLE = True
-except ImportError:
-    ML_AVAILABLE = False
+from netstats import ConnectionSnapshot, ProcessIOAccountant, InterfaceRateCollector
+from alert_engine import AlertEngine
+from alert_history import AlertHistory
+from summary_engine import get_engine
+from live_tfidf import IncrementalTfidf
+from log_index import LogIndex
+from anomaly_detector import RateAnomalyDetector
+from log_records import parse_records, content_fields
 
-try:
-    import nltk
-    NLTK_AVAILABLE = True
-except ImportError:
-    NLTK_AVAILABLE = False
-
-# imports with fallbacks
-try:
-    import requests
-    REQUESTS_AVAILABLE = True
-except ImportError:
-    REQUESTS_AVAILABLE = False
+# Optional dependencies are only probed here; each one is imported where it
+# is first used, so importing this module stays fast and never touches the network
+def _available(module):
+    try:
+        return find_spec(module) is not None
+    except (ImportError, ValueError):
+        return False
 
-try:
-    import speedtest
-    SPEEDTEST_AVAILABLE = True
-except ImportError:
-    SPEEDTEST_AVAILABLE = False
+ML_AVAILABLE = _available("sklearn") and _available("numpy")
+REQUESTS_AVAILABLE = _available("requests")
+SPEEDTEST_AVAILABLE = _available("speedtest")
 
-# Download NLTK data
-if NLTK_AVAILABLE:
-    try:
-        nltk.download('punkt', quiet=True)
-    except:
-        pass
+# Prefixes of the log entries NetworkOperations._record_alert stores for alert transitions
+ALERT_LOG_TAGS = ("ALERT: ", "RESOLVED: ")
 
 
 class LogSummarizer:
-    """ML-powered log summarization for network logs"""
+    """ML-powered log summarization for network logs (the "network" summary engine profile)"""
     
     def __init__(self):
-        self.network_keywords = [
-            'error', 'fail', 'timeout', 'warning', 'critical', 'alert',
-            'connection', 'port', 'ping', 'dns', 'ssl', 'certificate',
-            'bandwidth', 'latency', 'packet', 'drop', 'retry', 'refused',
-            'unreachable', 'closed', 'open', 'scan', 'subnet', 'arp',
-            'gateway', 'route', 'interface', 'adapter', 'throughput'
-        ]
-    
-    def preprocess_logs(self, log_text):
-        """Splits log text into non-empty lines."""
-        lines = log_text.split('\n')
-        sentences = [line.strip() for line in lines if line.strip()]
-        return sentences
-    
-    def detect_network_patterns(self, sentences):
-        """Detect repeated network-related error/warning patterns."""
-        network_error_keywords = [
-            'error', 'fail', 'timeout', 'warning', 'critical', 'alert',
-            'connection lost', 'connection refused', 'unreachable',
-            'port closed', 'ssl error', 'certificate', 'dns failed',
-            'packet loss', 'bandwidth', 'latency', 'drop', 'retry',
-            'scan complete', 'subnet scan', 'arp', 'gateway', 'route'
-        ]
-        
-        # Filter lines containing network-related keywords
-        relevant_lines = [line for line in sentences if any(
-            kw in line.lower() for kw in network_error_keywords
-        )]
-        line_counts = Counter(relevant_lines)
-        return line_counts
-    
-    def compute_tfidf_scores(self, sentences):
-        """Compute TF-IDF scores for sentences with network-focused vocabulary."""
-        if not ML_AVAILABLE or len(sentences) < 2:
-            return None, None
-            
-        try:
-            vectorizer = TfidfVectorizer(
-                stop_words='english',
-                max_features=1000,
-                ngram_range=(1, 2)
-            )
-            tfidf_matrix = vectorizer.fit_transform(sentences)
-            sentence_scores = np.array(tfidf_matrix.sum(axis=1)).ravel()
-            return sentence_scores, tfidf_matrix
-        except Exception as e:
-            print(f"TF-IDF computation failed: {e}")
-            return None, None
-    
-    def cluster_sentences(self, tfidf_matrix, sentences, num_clusters=5):
-        """Cluster similar sentences using KMeans."""
-        if not ML_AVAILABLE or tfidf_matrix is None or len(sentences) < 2:
-            return {0: list(range(len(sentences)))}
-            
-        try:
-            num_clusters = min(num_clusters, len(sentences), 10)
-            if num_clusters < 2:
-                return {0: list(range(len(sentences)))}
-                
-            kmeans = KMeans(n_clusters=num_clusters, random_state=42, n_init=10)
-            kmeans.fit(tfidf_matrix)
-            
-            clusters = {i: [] for i in range(num_clusters)}
-            for idx, label in enumerate(kmeans.labels_):
-                clusters[label].append(idx)
-            return clusters
-        except Exception as e:
-            print(f"Clustering failed: {e}")
-            return {0: list(range(len(sentences)))}
-    
-    def select_representatives(self, sentences, sentence_scores, clusters, line_counts):
-        """Select representative sentences from each cluster."""
-        rep_indices = []
-        
-        for cluster_id, indices in clusters.items():
-            if not indices:
-                continue
-                
-            cluster_scores = []
-            for idx in indices:
-                score = sentence_scores[idx] if sentence_scores is not None else 0
-                
-                # Boost network-critical lines
-                line = sentences[idx].lower()
-                if any(kw in line for kw in self.network_keywords):
-                    score += 2.0
-                if sentences[idx] in line_counts:
-                    score += line_counts[sentences[idx]] * 0.5
-                
-                cluster_scores.append((score, idx))
-            
-            if cluster_scores:
-                best_sentence_idx = max(cluster_scores)[1]
-                rep_indices.append(best_sentence_idx)
-        
-        return rep_indices
-    
-    def rank_top_sentences(self, sentences, sentence_scores, line_counts, rep_indices, n_sentences=5):
-        """Rank and select top sentences for summary."""
-        if not rep_indices:
-            return []
-            
-        final_scores = []
-        for idx in rep_indices:
-            score = sentence_scores[idx] if sentence_scores is not None else 0
-            
-            # Enhanced scoring for network logs
-            line = sentences[idx].lower()
-            
-            # High priority for errors and critical events
-            if any(word in line for word in ['error', 'fail', 'critical', 'alert']):
-                score += 3.0
-            elif any(word in line for word in ['warning', 'timeout', 'drop']):
-                score += 2.0
-            elif any(word in line for word in ['scan', 'ping', 'dns', 'ssl']):
-                score += 1.0
-            
-            if sentences[idx] in line_counts:
-                score += line_counts[sentences[idx]]
-            
-            final_scores.append((score, idx))
-        
-        # Sort by score descending
-        final_scores.sort(reverse=True)
-        
-        # Pick top n_sentences
-        top_indices = [idx for score, idx in final_scores[:n_sentences]]
-        top_indices.sort()  # Maintain chronological order
-        return top_indices
+        self.engine = get_engine("network")
     
-    def summarize_network_logs(self, log_text, n_sentences=8, num_clusters=5):
+    def summarize_network_logs(self, log_text, n_sentences=8, num_clusters=5, deadline_ms=None, vectors=None):
         """
         ML-powered summarization specifically for network logs.
-        Falls back to simple extraction if ML libraries are unavailable.
+        Falls back to simple extraction if ML libraries are unavailable, and
+        to cheaper tiers when clustering would overrun `deadline_ms`.
+        `vectors` are precomputed TF-IDF rows, one per line of `log_text`.
         """
-        sentences = self.preprocess_logs(log_text)
-        
-        # If few sentences or ML not available, use simple approach
-        if len(sentences) <= n_sentences or not ML_AVAILABLE:
-            return self._simple_network_summary(sentences, n_sentences)
-        
-        try:
-            line_counts = self.detect_network_patterns(sentences)
-            sentence_scores, tfidf_matrix = self.compute_tfidf_scores(sentences)
-            
-            if tfidf_matrix is None:
-                return self._simple_network_summary(sentences, n_sentences)
-            
-            clusters = self.cluster_sentences(tfidf_matrix, sentences, num_clusters)
-            rep_indices = self.select_representatives(sentences, sentence_scores, clusters, line_counts)
-            top_indices = self.rank_top_sentences(sentences, sentence_scores, line_counts, rep_indices, n_sentences)
-            
-            summary_sentences = [sentences[i] for i in top_indices]
-            return self._format_network_summary(summary_sentences, len(sentences))
-            
-        except Exception as e:
-            print(f"ML summarization failed, using fallback: {e}")
-            return self._simple_network_summary(sentences, n_sentences)
-    
-    def _simple_network_summary(self, sentences, n_sentences):
-        """Fallback summary for when ML is not available."""
-        # Prioritize network-related lines
-        network_sentences = []
-        other_sentences = []
-        
-        for sentence in sentences:
-            if any(kw in sentence.lower() for kw in self.network_keywords):
-                network_sentences.append(sentence)
-            else:
-                other_sentences.append(sentence)
-        
-        # Take network sentences first, then fill with others
-        summary_sentences = network_sentences[:n_sentences]
-        if len(summary_sentences) < n_sentences:
-            summary_sentences.extend(other_sentences[:n_sentences - len(summary_sentences)])
-        
-        return self._format_network_summary(summary_sentences[:n_sentences], len(sentences))
-    
-    def _format_network_summary(self, summary_sentences, total_lines):
-        """Format the summary with network-specific headers."""
-        header = f"🔍 NETWORK LOGS SUMMARY ({len(summary_sentences)} key entries from {total_lines} total)\n"
-        header += "━" * 50 + "\n\n"
-        
-        formatted_summary = header
-        for i, sentence in enumerate(summary_sentences, 1):
-            # Add icons based on content
-            line_lower = sentence.lower()
-            if any(word in line_lower for word in ['error', 'fail', 'critical']):
-                icon = "🔴"
-            elif any(word in line_lower for word in ['warning', 'timeout']):
-                icon = "🟡"
-            elif any(word in line_lower for word in ['success', 'complete', 'open']):
-                icon = "🟢"
-            elif any(word in line_lower for word in ['scan', 'ping', 'dns']):
-                icon = "🔍"
-            else:
-                icon = "📝"
-            
-            formatted_summary += f"{icon} {sentence}\n"
-        
-        if not ML_AVAILABLE:
-            formatted_summary += f"\n💡 Note: Basic summary mode (install scikit-learn and nltk for AI-powered summarization)"
-        
-        return formatted_summary
+        return self.engine.summarize(log_text, n_sentences=n_sentences, num_clusters=num_clusters,
+                                     deadline_ms=deadline_ms, vectors=vectors)
 
 
 class LogStorage:
-    """Persistent log storage with ML summarization"""
+    """
+    Persistent log storage with ML summarization.
+
+    `tfidf` tracks hashed term and document frequencies of every stored entry
+    as it arrives, so summaries transform only the windowed rows instead of
+    refitting a vectorizer over the whole window. `index` is an inverted
+    index over the same entries for search(). `anomalies` tracks per-template
+    and per-device event rates of the stored entries and reports spikes to
+    its on_event callback; entries replayed from log_file and stored
+    records logged before its live_cutoff() only build baselines, and
+    alerts stored by NetworkOperations are not counted.
+    """
     
     def __init__(self, max_logs=10000):
         self.logs = deque(maxlen=max_logs)
+        self.tfidf = IncrementalTfidf(max_docs=max_logs)
+        self.index = LogIndex(max_docs=max_logs)
+        self.anomalies = RateAnomalyDetector()
+        self._lock = threading.Lock()  # keeps logs, tfidf rows and index sequence numbers aligned
+        self._file_lock = threading.Lock()  # appends to log_file vs. compaction rewriting it
         self.log_file = "network_logs.txt"
         self.uploaded_logs = ""
         self.summarizer = LogSummarizer()
         self._load_logs()
     
-    def add(self, entry):
+    def _append(self, log, observe=True, replay=False):
+        with self._lock:
+            self.logs.append(log)
+            self.tfidf.add(log['content'])
+            self.index.add(log['timestamp'], log['content'])
+        # Outside _lock: a spike alert is itself stored through add()
+        if observe:
+            self.anomalies.observe(log['timestamp'], log['content'], replay=replay)
+    
+    def add(self, entry, observe=True):
+        """Store an entry logged now; observe=False keeps it out of the anomaly detector's rates."""
         log = {"timestamp": datetime.now().isoformat(), "content": entry}
-        self.logs.append(log)
+        self._append(log, observe=observe)
         self._save(log)
     
+    def add_records(self, records):
+        """
+        Store parsed LogRecords, one entry each, under their own timestamp
+        (now if they have none) and with their level and event as fields.
+        Records older than the anomaly detector's live window (an old log
+        file uploaded now) feed its baselines but cannot raise alerts.
+        """
+        count = 0
+        cutoff = self.anomalies.live_cutoff()
+        for record in records:
+            log = {"timestamp": (record.timestamp or datetime.now()).isoformat(), "content": record.content,
+                   "level": record.level, "event": record.event}
+            self._append(log, replay=record.timestamp is not None and record.timestamp.timestamp() < cutoff)
+            self._save(log)
+            count += 1
+        return count
+    
     def set_uploaded(self, text):
         self.uploaded_logs = text
-        self.add(f"Uploaded {len(text.splitlines())} log lines")
+        count = self.add_records(parse_records(text))
+        self.add(f"Uploaded {len(text.splitlines())} log lines ({count} records)")
     
     def get_uploaded(self):
         return self.uploaded_logs
     
     def _save(self, log):
         try:
-            with open(self.log_file, 'a') as f:
+            with self._file_lock, open(self.log_file, 'a') as f:
                 f.write(f"[{log['timestamp']}] {log['content']}\n")
         except: pass
     
+    def compact(self, keep_hours=None):
+        """Roll entries older than keep_hours out of log_file into the columnar archive (see log_archive)."""
+        from log_archive import compact, KEEP_HOURS
+        return compact(self.log_file, keep_hours=KEEP_HOURS if keep_hours is None else keep_hours,
+                       lock=self._file_lock)
+    
     def _load_logs(self):
         if os.path.exists(self.log_file):
             try:
@@ -294,33 +141,68 @@ class LogStorage:
                     for line in f:
                         m = re.match(r'\[(.*?)\] (.*)', line)
                         if m:
-                            self.logs.append({"timestamp": m.group(1), "content": m.group(2)})
+                            log = {"timestamp": m.group(1), "content": m.group(2)}
+                            log.update(content_fields(log["content"]))
+                            self._append(log, observe=not log["content"].startswith(ALERT_LOG_TAGS), replay=True)
             except: pass
     
-    def get_recent(self, hours=1):
+    @staticmethod
+    def _recent_positions(logs, hours):
         cutoff = datetime.now() - timedelta(hours=hours)
-        result = []
-        for log in self.logs:
+        positions = []
+        for i, log in enumerate(logs):
             try:
                 if datetime.fromisoformat(log['timestamp']) > cutoff:
-                    result.append(log)
+                    positions.append(i)
             except: pass
-        return result
+        return positions
     
-    def get_text(self, hours=None):
-        logs = self.get_recent(hours) if hours else list(self.logs)
+    def get_recent(self, hours=1):
+        logs = list(self.logs)
+        return [logs[i] for i in self._recent_positions(logs, hours)]
+    
+    def get_text(self, hours=None, logs=None):
+        if logs is None:
+            logs = self.get_recent(hours) if hours else list(self.logs)
         return "\n".join([f"[{l['timestamp']}] {l['content']}" for l in logs])
     
+    def search(self, query, hours=None, since=None, until=None, limit=50, offset=0):
+        """
+        Stored entries matching a boolean query (words ANDed, OR between
+        alternatives, -word or NOT word to exclude), newest first, paginated.
+        `hours` bounds the search to the last N hours unless `since` is given.
+        """
+        start = time.perf_counter()
+        if since is None and hours:
+            since = datetime.now() - timedelta(hours=hours)
+        with self._lock:
+            seqs = self.index.search(query, since=since, until=until)
+            first = self.index.first_seq
+            page = [dict(self.logs[seq - first]) for seq in seqs[offset:offset + limit]]
+        return {
+            "query": query,
+            "total": len(seqs),
+            "offset": offset,
+            "limit": limit,
+            "results": page,
+            "next_offset": offset + limit if offset + limit < len(seqs) else None,
+            "took_ms": round((time.perf_counter() - start) * 1000, 3)
+        }
+    
     def summarize_logs(self, hours=24, use_ml=True):
         """Generate AI-powered summary of logs"""
-        logs = self.get_recent(hours)
+        with self._lock:
+            snapshot = list(self.logs)
+            positions = self._recent_positions(snapshot, hours)
+            vectors = self.tfidf.transform(positions) if positions and use_ml and ML_AVAILABLE else None
+        logs = [snapshot[i] for i in positions]
         if not logs:
             return f"📊 No logs found in the last {hours} hours."
         
-        log_text = self.get_text(hours)
+        log_text = self.get_text(logs=logs)
         
         if use_ml and ML_AVAILABLE:
-            return self.summarizer.summarize_network_logs(log_text)
+            return self.summarizer.summarize_network_logs(log_text, vectors=vectors)
         else:
             return self._basic_summary(logs, hours)
     
@@ -373,7 +255,7 @@ class LogStorage:
             summary += f"  • {activity}\n"
         
         if not ML_AVAILABLE:
-            summary += f"\nTip: Install 'scikit-learn' and 'nltk' for AI-powered smart summarization"
+            summary += f"\nTip: Install 'scikit-learn' for AI-powered smart summarization"
         
         return summary
 
@@ -384,7 +266,13 @@ class NetworkOperations:
     def __init__(self):
         self.logs = LogStorage()
         self.stats_history = deque(maxlen=1000)
-        self.alerts = deque(maxlen=500)
+        self.alerts = AlertHistory()
+        self.connections = ConnectionSnapshot()
+        self.process_io = ProcessIOAccountant(self.connections).start()
+        self.nic_rates = InterfaceRateCollector().start()
+        psutil.cpu_percent(interval=None)  # prime the non-blocking CPU sampler
+        self.alert_engine = AlertEngine(metrics=self._alert_metrics, on_event=self._record_alert).start()
+        self.logs.anomalies.on_event = self._record_alert
         self.is_windows = platform.system().lower() == "windows"
     
     # ═══════════════════════════════════════════════════════════════
@@ -395,7 +283,7 @@ class NetworkOperations:
         """Get real network I/O statistics"""
         try:
             io = psutil.net_io_counters()
-            conns = psutil.net_connections(kind='inet')
+            counts = self.connections.counts()
             return {
                 "timestamp": datetime.now().isoformat(),
                 "bytes_sent": io.bytes_sent,
@@ -406,18 +294,19 @@ class NetworkOperations:
                 "errors_out": io.errout,
                 "drops_in": io.dropin,
                 "drops_out": io.dropout,
-                "established": len([c for c in conns if c.status == 'ESTABLISHED']),
-                "listening": len([c for c in conns if c.status == 'LISTEN']),
-                "total_connections": len(conns)
+                "established": counts["established"],
+                "listening": counts["listening"],
+                "total_connections": counts["total_connections"]
             }
         except Exception as e:
             return {"error": str(e)}
     
-    def get_interfaces(self):
-        """Get all network interfaces with details"""
+    def get_interfaces(self, window=None):
+        """Get all network interfaces with details and current throughput"""
         try:
             addrs = psutil.net_if_addrs()
             stats = psutil.net_if_stats()
+            rates = self.nic_rates.rates(window)
             result = []
             for name, addresses in addrs.items():
                 info = {
@@ -425,6 +314,7 @@ class NetworkOperations:
                     "is_up": stats[name].isup if name in stats else False,
                     "speed": stats[name].speed if name in stats else 0,
                     "mtu": stats[name].mtu if name in stats else 0,
+                    "rates": rates.get(name),
                     "addresses": []
                 }
                 for addr in addresses:
@@ -442,65 +332,28 @@ class NetworkOperations:
     def get_connections(self, limit=50):
         """Get active network connections"""
         try:
-            conns = psutil.net_connections(kind='inet')
-            result = []
-            for c in conns:
-                if c.status == 'ESTABLISHED':
-                    try:
-                        proc = psutil.Process(c.pid).name() if c.pid else "Unknown"
-                    except:
-                        proc = "Unknown"
-                    result.append({
-                        "local": f"{c.laddr.ip}:{c.laddr.port}" if c.laddr else "N/A",
-                        "remote": f"{c.raddr.ip}:{c.raddr.port}" if c.raddr else "N/A",
-                        "status": c.status,
-                        "pid": c.pid,
-                        "process": proc
-                    })
-            return result[:limit]
+            return self.connections.established(limit=limit)
         except Exception as e:
             return {"error": str(e)}
     
     def get_listening_ports(self):
         """Get all listening ports"""
         try:
-            conns = psutil.net_connections(kind='inet')
-            result = []
-            for c in conns:
-                if c.status == 'LISTEN':
-                    try:
-                        proc = psutil.Process(c.pid).name() if c.pid else "Unknown"
-                    except:
-                        proc = "Unknown"
-                    result.append({
-                        "address": c.laddr.ip if c.laddr else "0.0.0.0",
-                        "port": c.laddr.port if c.laddr else 0,
-                        "pid": c.pid,
-                        "process": proc
-                    })
-            return sorted(result, key=lambda x: x['port'])
+            return self.connections.listening()
         except Exception as e:
             return {"error": str(e)}
     
     def get_process_network_usage(self):
         """Get network usage per process"""
         try:
-            conns = psutil.net_connections(kind='inet')
-            usage = {}
-            for c in conns:
-                if c.pid:
-                    try:
-                        proc = psutil.Process(c.pid)
-                        name = proc.name()
-                        if name not in usage:
-                            usage[name] = {"pid": c.pid, "connections": 0, "established": 0, "listening": 0}
-                        usage[name]["connections"] += 1
-                        if c.status == 'ESTABLISHED':
-                            usage[name]["established"] += 1
-                        elif c.status == 'LISTEN':
-                            usage[name]["listening"] += 1
-                    except: pass
-            return dict(sorted(usage.items(), key=lambda x: x[1]['connections'], reverse=True))
+            return self.connections.process_usage()
+        except Exception as e:
+            return {"error": str(e)}
+    
+    def get_top_talkers(self, window=60, limit=10):
+        """Get processes moving the most bytes over a recent window"""
+        try:
+            return self.process_io.top_talkers(window=window, limit=limit)
         except Exception as e:
             return {"error": str(e)}
     
@@ -765,6 +618,7 @@ class NetworkOperations:
         """Check website status"""
         if not REQUESTS_AVAILABLE:
             return {"error": "requests library not installed"}
+        import requests
         
         try:
             if not url.startswith(('http://', 'https://')):
@@ -821,6 +675,7 @@ class NetworkOperations:
         """Get HTTP headers only"""
         if not REQUESTS_AVAILABLE:
             return {"error": "requests library not installed"}
+        import requests
         try:
             if not url.startswith(('http://', 'https://')):
                 url = 'https://' + url
@@ -840,6 +695,7 @@ class NetworkOperations:
         
         try:
             self.logs.add("Speed test started")
+            import speedtest
             st = speedtest.Speedtest()
             st.get_best_server()
             
@@ -858,21 +714,19 @@ class NetworkOperations:
         except Exception as e:
             return {"error": str(e)}
     
-    def get_bandwidth(self):
-        """Calculate current bandwidth usage"""
+    def get_bandwidth(self, window=None):
+        """Current bandwidth usage from the background interface collector"""
         try:
-            io1 = psutil.net_io_counters()
-            time.sleep(1)
-            io2 = psutil.net_io_counters()
-            
-            down = (io2.bytes_recv - io1.bytes_recv) / 1_000_000
-            up = (io2.bytes_sent - io1.bytes_sent) / 1_000_000
+            totals = self.nic_rates.totals(window)
+            down = totals["bytes_recv_per_sec"] / 1_000_000
+            up = totals["bytes_sent_per_sec"] / 1_000_000
             
             return {
                 "download_mbps": round(down * 8, 2),
                 "upload_mbps": round(up * 8, 2),
                 "download_MBps": round(down, 2),
-                "upload_MBps": round(up, 2)
+                "upload_MBps": round(up, 2),
+                "interfaces": self.nic_rates.rates(window)
             }
         except Exception as e:
             return {"error": str(e)}
@@ -951,44 +805,32 @@ class NetworkOperations:
         except Exception as e:
             return {"error": str(e)}
     
+    def _alert_metrics(self):
+        """Metrics sampled by the alert engine on each evaluation"""
+        mem = psutil.virtual_memory()
+        disk = psutil.disk_usage('/')
+        totals = self.nic_rates.totals()
+        return {
+            "cpu_percent": psutil.cpu_percent(interval=None),
+            "memory_percent": mem.percent,
+            "disk_percent": disk.percent,
+            "network_errors_per_sec": totals["errin_per_sec"] + totals["errout_per_sec"]
+        }
+    
+    def _record_alert(self, alert):
+        """Store an alert state transition emitted by the engine"""
+        self.alerts.add(alert)
+        tag = ALERT_LOG_TAGS[0] if alert['state'] == "firing" else ALERT_LOG_TAGS[1]
+        # Not counted as a log event: a spike alert would otherwise feed its own rate
+        self.logs.add(f"{tag}[{alert['severity'].title()}] {alert['type']} - {alert['msg']}", observe=False)
+    
     def check_alerts(self):
-        """Check for system alerts"""
-        alerts = []
-        ts = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        
-        try:
-            cpu = psutil.cpu_percent(interval=0.5)
-            if cpu > 85:
-                alerts.append({"time": ts, "severity": "CRITICAL" if cpu > 95 else "HIGH", "type": "CPU", "msg": f"High CPU: {cpu}%"})
-            
-            mem = psutil.virtual_memory()
-            if mem.percent > 85:
-                alerts.append({"time": ts, "severity": "CRITICAL" if mem.percent > 95 else "HIGH", "type": "Memory", "msg": f"High memory: {mem.percent}%"})
-            
-            disk = psutil.disk_usage('/')
-            if disk.percent > 85:
-                alerts.append({"time": ts, "severity": "CRITICAL" if disk.percent > 95 else "HIGH", "type": "Disk", "msg": f"High disk: {disk.percent}%"})
-            
-            io = psutil.net_io_counters()
-            if io.errin > 100 or io.errout > 100:
-                alerts.append({"time": ts, "severity": "MEDIUM", "type": "Network", "msg": f"Network errors: IN({io.errin}) OUT({io.errout})"})
-        except: pass
-        
-        for a in alerts:
-            self.alerts.append(a)
-        
-        return alerts
+        """Get currently firing alerts (metric rules from the alert engine, log-rate spikes from the anomaly detector)"""
+        return self.alert_engine.active() + self.logs.anomalies.active()
     
-    def get_recent_alerts(self, hours=24):
-        """Get recent alerts"""
-        cutoff = datetime.now() - timedelta(hours=hours)
-        result = []
-        for a in self.alerts:
-            try:
-                if datetime.strptime(a['time'], "%Y-%m-%d %H:%M:%S") > cutoff:
-                    result.append(a)
-            except: pass
-        return result
+    def get_recent_alerts(self, hours=24, severity=None, alert_type=None, limit=None):
+        """Get recent alerts, optionally filtered by severity and type"""
+        return self.alerts.recent(hours, severity=severity, type=alert_type, limit=limit)
     
     def summarize_logs(self, hours=24, use_ml=True):
         """Generate summary of recent logs"""
@@ -1009,6 +851,9 @@ class NetworkChatbot:
     def _build_command_map(self):
         """Map keywords to handlers"""
         return {
+            # Search comes first: its free-text query may contain any other command's keyword
+            "search_logs": (["search logs", "search log", "find in logs", "grep logs"], self._search_logs),
+            
             # Greetings
             "greeting": (["hi", "hello", "hey", "greetings", "howdy", "yo", "sup"], self._greet),
             "thanks": (["thanks", "thank", "thx", "ty", "appreciate"], self._thanks),
@@ -1138,6 +983,9 @@ class NetworkChatbot:
             if iface['mtu'] > 0:
                 r += f" | MTU: {iface['mtu']}"
             r += "\n"
+            if iface.get('rates'):
+                rates = iface['rates']
+                r += f"   Throughput: ↓ {rates['bytes_recv_per_sec'] / 1024:.1f} KB/s | ↑ {rates['bytes_sent_per_sec'] / 1024:.1f} KB/s\n"
             
             for addr in iface['addresses']:
                 if addr['family'] in ['AF_INET', 'AF_INET6']:
@@ -1179,11 +1027,25 @@ class NetworkChatbot:
         return r
     
     def _process_network(self, msg):
+        window = self._extract_window(msg) or 60
+        talkers = self.ops.get_top_talkers(window=window, limit=10)
         usage = self.ops.get_process_network_usage()
         if isinstance(usage, dict) and "error" in usage:
             return f"[ICON:x-circle] Error: {usage['error']}"
         
-        r = "[ICON:cpu] NETWORK USAGE BY PROCESS\n"
+        r = f"[ICON:cpu] TOP TALKERS (Last {window}s)\n"
+        r += "━" * 40 + "\n"
+        
+        if "error" in talkers:
+            r += f"[ICON:x-circle] Error: {talkers['error']}\n"
+        elif not talkers['talkers']:
+            r += "[ICON:loader] Collecting I/O samples... try again in a few seconds.\n"
+        else:
+            for t in talkers['talkers']:
+                r += f"[ICON:terminal] {t['process']} (PID: {t['pid']})\n"
+                r += f"   RX: {t['rx_Bps'] / 1024:.1f} KB/s | TX: {t['tx_Bps'] / 1024:.1f} KB/s | Total: {t['total_bytes'] // 1024} KB\n"
+        
+        r += "\n[ICON:cpu] CONNECTIONS BY PROCESS\n"
         r += "━" * 40 + "\n"
         
         for name, info in list(usage.items())[:15]:
@@ -1438,6 +1300,20 @@ class NetworkChatbot:
         r += f"[ICON:download] Download: {result['download_mbps']} Mbps ({result['download_MBps']} MB/s)\n"
         r += f"[ICON:upload] Upload: {result['upload_mbps']} Mbps ({result['upload_MBps']} MB/s)\n"
         
+        nics = sorted(result['interfaces'].items(),
+                      key=lambda x: x[1]['bytes_recv_per_sec'] + x[1]['bytes_sent_per_sec'], reverse=True)
+        if nics:
+            r += "\n[ICON:wifi] PER INTERFACE\n"
+        for name, rates in nics:
+            down = rates['bytes_recv_per_sec'] * 8 / 1_000_000
+            up = rates['bytes_sent_per_sec'] * 8 / 1_000_000
+            r += f"[ICON:arrow-right] {name}: ↓ {down:.2f} Mbps | ↑ {up:.2f} Mbps"
+            r += f" | {rates['packets_recv_per_sec']:.0f}/{rates['packets_sent_per_sec']:.0f} pkt/s\n"
+            errors = rates['errin_per_sec'] + rates['errout_per_sec']
+            drops = rates['dropin_per_sec'] + rates['dropout_per_sec']
+            if errors > 0 or drops > 0:
+                r += f"   [ICON:alert-triangle] Errors: {errors:.2f}/s | Drops: {drops:.2f}/s\n"
+        
         return r
     
     def _latency(self, msg):
@@ -1484,20 +1360,34 @@ class NetworkChatbot:
         return r
     
     def _alerts(self, msg):
-        # Check current alerts
-        current = self.ops.check_alerts()
-        recent = self.ops.get_recent_alerts(hours=24)
+        hours = self._extract_hours(msg) or 24
+        severity = self._extract_severity(msg)
+        alert_type = self._extract_alert_type(msg)
+        active = self.ops.check_alerts()
+        recent = self.ops.get_recent_alerts(hours=hours, severity=severity, alert_type=alert_type)
         
-        if not current and not recent:
+        if not active and not recent:
             return "[ICON:check-circle] No alerts. System is healthy!"
         
+        def sev_icon(severity):
+            return {"CRITICAL": "[ICON:x-circle]", "HIGH": "[ICON:alert-triangle]", "MEDIUM": "[ICON:alert-circle]"}.get(severity, "[ICON:info]")
+        
         r = f"[ICON:alert-triangle] SYSTEM ALERTS\n"
         r += "━" * 40 + "\n"
         
-        all_alerts = current + recent
-        for a in all_alerts[-10:]:
-            sev_icon = {"CRITICAL": "[ICON:x-circle]", "HIGH": "[ICON:alert-triangle]", "MEDIUM": "[ICON:alert-circle]"}.get(a['severity'], "[ICON:info]")
-            r += f"{sev_icon} [{a['severity']}] {a['type']}: {a['msg']}\n"
+        if active:
+            r += f"FIRING NOW ({len(active)}):\n"
+            for a in active:
+                r += f"{sev_icon(a['severity'])} [{a['severity']}] {a['type']}: {a['msg']} (since {a['time']})\n"
+        else:
+            r += "[ICON:check-circle] Nothing firing right now.\n"
+        
+        if recent:
+            scope = " ".join(x for x in [severity, alert_type] if x)
+            r += f"\nRECENT {scope + ' ' if scope else ''}TRANSITIONS (last {hours} hours, {len(recent)} total):\n"
+            for a in recent[-10:]:
+                state = "RESOLVED" if a.get('state') == "resolved" else "FIRED"
+                r += f"{sev_icon(a['severity'])} {a['time'][11:16]} {state} [{a['severity']}] {a['type']}: {a['msg']}\n"
         
         return r
     
@@ -1568,6 +1458,39 @@ class NetworkChatbot:
         
         return r
     
+    def _search_logs(self, msg):
+        """Boolean search over stored logs: search logs 10.0.3.7 OR gi0/24 last 6 hours"""
+        hours = self._extract_hours(msg)
+        m = re.search(r'\bpage\s+(\d+)', msg, re.IGNORECASE)
+        page = max(1, int(m.group(1))) if m else 1
+        query = re.sub(r'^.*?\b(?:search|find in|grep)\s+logs?\b\s*(?:for\b|mentioning\b)?', '', msg, count=1,
+                       flags=re.IGNORECASE)
+        query = re.sub(r'\b(?:in\s+|over\s+)?(?:the\s+)?(?:last|past)\s+(?:\d+\s*)?hours?\b|\bpage\s+\d+', '', query,
+                       flags=re.IGNORECASE).strip()
+        if not query:
+            return ("[ICON:search] Usage: search logs <terms> [last N hours]\n"
+                    "Words must all match; use OR for alternatives and -word to exclude.\n"
+                    "Example: search logs 10.0.3.7 OR gi0/24 last 6 hours")
+        
+        per_page = 20
+        result = self.ops.logs.search(query, hours=hours, limit=per_page, offset=(page - 1) * per_page)
+        scope = f"last {hours} hour(s)" if hours else "all stored logs"
+        if not result["total"]:
+            return f"[ICON:search] No log entries match '{query}' ({scope})."
+        if not result["results"]:
+            return f"[ICON:search] Only {result['total']} entries match '{query}' ({scope}); page {page} is empty."
+        
+        r = f"[ICON:search] LOG SEARCH: {query} ({scope})\n"
+        r += "━" * 40 + "\n"
+        shown = len(result["results"])
+        r += f"{result['total']} matches, newest first; showing {result['offset'] + 1}-{result['offset'] + shown}"
+        r += f" ({result['took_ms']} ms)\n\n"
+        for log in result["results"]:
+            r += f"{log['timestamp'][:19].replace('T', ' ')}  {log['content']}\n"
+        if result["next_offset"] is not None:
+            r += f"\nMore: search logs {query}{' last ' + str(hours) + ' hours' if hours else ''} page {page + 1}"
+        return r
+    
     def _summarize_logs(self, msg):
         """Smart log summarization using ML"""
         hours = self._extract_hours(msg) or 24
@@ -1586,7 +1509,7 @@ class NetworkChatbot:
             r = "[ICON:alert-triangle] AI ANALYSIS UNAVAILABLE\n"
             r += "━" * 40 + "\n"
             r += "To enable smart log analysis, install:\n"
-            r += "• pip install scikit-learn nltk\n\n"
+            r += "• pip install scikit-learn\n\n"
             r += "Using basic summary instead:\n\n"
             r += self.ops.summarize_logs(hours, use_ml=False)
             return r
@@ -1606,7 +1529,7 @@ class NetworkChatbot:
 • show interfaces - List network adapters
 • show connections - Active connections
 • listening ports - Open/listening ports
-• process network usage - Network by process
+• process network usage - Top talkers by bytes (last N minutes)
 
 [ICON:wifi] CONNECTIVITY TESTS
 • ping <host> - Ping a host (ping 8.8.8.8)
@@ -1637,7 +1560,7 @@ class NetworkChatbot:
 
 [ICON:heart] SYSTEM HEALTH
 • system health - CPU, memory, disk, network
-• show alerts - View system alerts
+• show alerts - View system alerts (e.g. critical memory alerts last 6 hours)
 • diagnose network - Full network diagnosis
 
 [ICON:brain] SMART LOG ANALYSIS
@@ -1645,12 +1568,14 @@ class NetworkChatbot:
 • analyze logs - ML-based log analysis
 • show logs - Raw log view
 • logs last 2 hours - Time-filtered logs
+• search logs <terms> - Search logs (OR, -exclude, last N hours)
 
 [ICON:zap] EXAMPLES
 • ping google.com
 • summarize logs last 24 hours
 • analyze logs
 • check port 192.168.1.1:22
+• search logs 10.0.3.7 OR gi0/24 last 6 hours
 • scan subnet 192.168.1.0/24
 """
         return help_text
@@ -1699,6 +1624,20 @@ class NetworkChatbot:
                     return words[i + 1]
         return None
     
+    def _extract_severity(self, msg):
+        m = re.search(r'\b(critical|high|medium|low)\b', msg.lower())
+        return m.group(1).upper() if m else None
+    
+    def _extract_alert_type(self, msg):
+        m = re.search(r'\b(cpu|memory|disk|network)\b', msg.lower())
+        return {"cpu": "CPU"}.get(m.group(1), m.group(1).title()) if m else None
+    
+    def _extract_window(self, msg):
+        m = re.search(r'(\d+)\s*(second|sec|s\b|minute|min|m\b)', msg.lower())
+        if not m: return None
+        value = int(m.group(1))
+        return value * 60 if m.group(2).startswith('m') else value
+    
     def _extract_hours(self, msg):
         m = re.search(r'(\d+)\s*hour', msg.lower())
         if m: return int(m.group(1))
@@ -0,0 +1,165 @@
+import re
+import json
+
+import numpy as np
+
+
+# -----------------------------
+# NUMPY-ONLY LINEAR SCORER
+# -----------------------------
+class LinearSeverityScorer:
+    """
+    A fitted TF-IDF + StandardScaler + LogisticRegression pipeline compiled to
+    plain numpy arrays.
+
+    Scoring re-implements exactly what the pipeline does (word n-gram
+    tokenization, vocabulary lookup, sublinear tf, idf, l2 norm, scaling,
+    linear decision function, softmax) without sklearn, pandas or a
+    DataFrame per request. Only numpy is needed to load and run it.
+    """
+
+    def __init__(self, terms, idf, mean, scale, coef, intercept, classes, params):
+        self.terms = np.asarray(terms, dtype=str)
+        self.vocabulary = {term: i for i, term in enumerate(self.terms.tolist())}
+        self.idf = np.asarray(idf, dtype=np.float64)
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = np.asarray(intercept, dtype=np.float64)
+        # Plain str labels, as in a fitted sklearn classifier
+        self.classes_ = np.asarray([str(c) for c in classes], dtype=object)
+        self.params = dict(params)
+        self.ngram_range = tuple(self.params["ngram_range"])
+        self._token_re = re.compile(self.params["token_pattern"])
+        n_terms = len(self.terms)
+        self._text_coef = np.ascontiguousarray(self.coef[:, :n_terms].T)
+        self._num_coef = np.ascontiguousarray(self.coef[:, n_terms:].T)
+
+    # -----------------------------
+    # EXPORT
+    # -----------------------------
+    @classmethod
+    def from_pipeline(cls, pipeline, text_column="text"):
+        """
+        Compile Pipeline([('preprocessor', ColumnTransformer([tfidf, scaler])), ('clf', LogisticRegression)]).
+        Raises ValueError for any pipeline this scorer cannot reproduce exactly.
+        """
+        steps = dict(pipeline.steps)
+        preprocessor, clf = steps.get("preprocessor"), steps.get("clf")
+        if preprocessor is None or type(clf).__name__ != "LogisticRegression":
+            raise ValueError("only preprocessor + LogisticRegression pipelines can be exported")
+        if getattr(clf, "multi_class", "auto") == "ovr":
+            raise ValueError("one-vs-rest logistic regression is not supported")
+
+        transformers = [(name, columns) for name, _, columns in preprocessor.transformers_
+                        if name != "remainder"]
+        if [name for name, _ in transformers] != ["tfidf", "num"] or transformers[0][1] != text_column:
+            raise ValueError(f"unexpected preprocessor layout: {transformers}")
+        tfidf = preprocessor.named_transformers_["tfidf"]
+        scaler = preprocessor.named_transformers_["num"]
+
+        p = tfidf.get_params()
+        unsupported = {k: p[k] for k in ("tokenizer", "preprocessor", "stop_words", "strip_accents")
+                       if p[k] is not None}
+        if p["analyzer"] != "word" or p["binary"] or p["norm"] not in ("l2", None) or unsupported:
+            raise ValueError(f"unsupported TfidfVectorizer settings: {unsupported or p}")
+
+        terms = sorted(tfidf.vocabulary_, key=tfidf.vocabulary_.get)
+        n_num = len(transformers[1][1])
+        return cls(
+            terms=terms,
+            idf=tfidf.idf_ if p["use_idf"] else np.ones(len(terms)),
+            mean=scaler.mean_ if scaler.with_mean else np.zeros(n_num),
+            scale=scaler.scale_ if scaler.with_std else np.ones(n_num),
+            coef=clf.coef_,
+            intercept=clf.intercept_,
+            classes=clf.classes_,
+            params={
+                "ngram_range": list(p["ngram_range"]),
+                "lowercase": p["lowercase"],
+                "token_pattern": p["token_pattern"],
+                "sublinear_tf": p["sublinear_tf"],
+                "norm": p["norm"],
+                "feature_columns": list(transformers[1][1])
+            }
+        )
+
+    def max_difference(self, pipeline, frame, text_column="text"):
+        """Largest absolute probability difference from `pipeline` on a DataFrame of inputs."""
+        expected = pipeline.predict_proba(frame)
+        actual = self.predict_proba(frame[text_column].tolist(),
+                                    frame[self.params["feature_columns"]].to_numpy(dtype=np.float64))
+        return float(np.max(np.abs(expected - actual))) if len(expected) else 0.0
+
+    # -----------------------------
+    # PERSISTENCE
+    # -----------------------------
+    def save(self, f):
+        np.savez(f, terms=self.terms, idf=self.idf, mean=self.mean, scale=self.scale, coef=self.coef,
+                 intercept=self.intercept, classes=self.classes_.astype(str), params=np.asarray(json.dumps(self.params)))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            arrays = {name: data[name] for name in data.files}
+        params = json.loads(str(arrays.pop("params")))
+        return cls(params=params, **arrays)
+
+    # -----------------------------
+    # SCORING
+    # -----------------------------
+    def _ngrams(self, text):
+        if self.params["lowercase"]:
+            text = text.lower()
+        tokens = self._token_re.findall(text)
+        min_n, max_n = self.ngram_range
+        grams = list(tokens) if min_n == 1 else []
+        for n in range(max(min_n, 2), min(max_n, len(tokens)) + 1):
+            grams.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+        return grams
+
+    def decision_function(self, texts, features):
+        n = len(texts)
+        rows, cols, vals = [], [], []
+        for r, text in enumerate(texts):
+            counts = {}
+            for gram in self._ngrams(text):
+                col = self.vocabulary.get(gram)
+                if col is not None:
+                    counts[col] = counts.get(col, 0) + 1
+            rows.extend([r] * len(counts))
+            cols.extend(counts)
+            vals.extend(counts.values())
+
+        scores = np.tile(self.intercept, (n, 1))
+        if vals:
+            rows, cols = np.asarray(rows), np.asarray(cols)
+            vals = np.asarray(vals, dtype=np.float64)
+            if self.params["sublinear_tf"]:
+                vals = np.log(vals) + 1
+            vals *= self.idf[cols]
+            if self.params["norm"] == "l2":
+                norms = np.sqrt(np.bincount(rows, weights=vals * vals, minlength=n))
+                vals /= norms[rows]
+            np.add.at(scores, rows, vals[:, None] * self._text_coef[cols])
+
+        features = np.asarray(features, dtype=np.float64).reshape(n, -1)
+        scores += ((features - self.mean) / self.scale) @ self._num_coef
+        return scores
+
+    def predict_proba(self, texts, features):
+        """Class probabilities, columns ordered like `classes_`."""
+        scores = self.decision_function(texts, features)
+        if scores.shape[1] == 1:
+            positive = 1.0 / (1.0 + np.exp(-scores[:, 0]))
+            return np.column_stack([1.0 - positive, positive])
+        scores -= scores.max(axis=1, keepdims=True)
+        np.exp(scores, out=scores)
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+    def predict(self, texts, features):
+        scores = self.decision_function(texts, features)
+        if scores.shape[1] == 1:
+            return self.classes_[(scores[:, 0] > 0).astype(int)]
+        return self.classes_[np.argmax(scores, axis=1)]
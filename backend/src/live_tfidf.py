@@ -0,0 +1,124 @@
+import math
+import threading
+from collections import deque
+
+
+# -----------------------------
+# INCREMENTAL HASHED TF-IDF
+# -----------------------------
+class IncrementalTfidf:
+    """
+    TF-IDF statistics kept up to date as documents arrive, instead of refit
+    per request.
+
+    Terms are hashed into a fixed `n_features` space (HashingVectorizer), so
+    the vocabulary is stable and never grows. Each document is hashed once,
+    lazily, in a batch with the other documents added since the last
+    transform; document frequencies are incremented then and decremented when
+    the document leaves the `max_docs` window. Memory is bounded by one int32
+    df array plus the hashed term counts of at most `max_docs` documents.
+
+    transform(positions) weights the stored counts with the current idf
+    (smooth, as TfidfVectorizer does), l2-normalizes them and returns a CSR
+    matrix over only the hashed columns that occur in those rows.
+
+    numpy and scikit-learn are imported on first transform, so adding
+    documents costs nothing when ML is unavailable.
+    """
+
+    def __init__(self, max_docs=10000, n_features=2 ** 18, ngram_range=(1, 2), stop_words="english"):
+        self.max_docs = max_docs
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+        self.stop_words = stop_words
+        # One [text, indices, counts] per document, oldest first; the newest
+        # `_pending` entries are not hashed yet (indices is None)
+        self._docs = deque()
+        self._pending = 0
+        self._df = None
+        self._vectorizer = None
+        self._lock = threading.Lock()
+        self.hashed = 0
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, text):
+        with self._lock:
+            if len(self._docs) == self.max_docs:
+                self._evict()
+            self._docs.append([text, None, None])
+            self._pending += 1
+
+    def clear(self):
+        with self._lock:
+            self._docs.clear()
+            self._pending = 0
+            self._df = None
+
+    def _evict(self):
+        _, indices, _ = self._docs.popleft()
+        if indices is None:
+            self._pending -= 1
+        else:
+            self._df[indices] -= 1
+
+    def _flush(self):
+        """Hash every pending document in one batch and add it to the document frequencies."""
+        if not self._pending:
+            return
+        import numpy as np
+        if self._vectorizer is None:
+            from sklearn.feature_extraction.text import HashingVectorizer
+            self._vectorizer = HashingVectorizer(n_features=self.n_features, ngram_range=self.ngram_range,
+                                                 stop_words=self.stop_words, alternate_sign=False, norm=None)
+            self._df = np.zeros(self.n_features, dtype=np.int32)
+        start = len(self._docs) - self._pending
+        pending = [self._docs[i] for i in range(start, len(self._docs))]
+        counts = self._vectorizer.transform([doc[0] for doc in pending]).tocsr()
+        counts.sum_duplicates()
+        for doc, lo, hi in zip(pending, counts.indptr[:-1], counts.indptr[1:]):
+            doc[1] = counts.indices[lo:hi].astype(np.int32)
+            doc[2] = counts.data[lo:hi].astype(np.float32)
+        np.add.at(self._df, counts.indices, 1)
+        self.hashed += self._pending
+        self._pending = 0
+
+    def transform(self, positions=None):
+        """TF-IDF rows for the documents at `positions` (oldest is 0; default: all), as CSR."""
+        import numpy as np
+        from scipy.sparse import csr_matrix
+
+        with self._lock:
+            self._flush()
+            n_docs = len(self._docs)
+            if positions is None:
+                positions = range(n_docs)
+            docs = [self._docs[i] for i in positions]
+            if not docs:
+                return csr_matrix((0, 0))
+            cols = np.concatenate([doc[1] for doc in docs])
+            vals = np.concatenate([doc[2] for doc in docs]).astype(np.float64)
+            vals *= np.log((1 + n_docs) / (1 + self._df[cols].astype(np.float64))) + 1
+
+        lengths = np.fromiter((len(doc[1]) for doc in docs), dtype=np.int64, count=len(docs))
+        indptr = np.concatenate([[0], np.cumsum(lengths)])
+        rows = np.repeat(np.arange(len(docs)), lengths)
+        norms = np.sqrt(np.bincount(rows, weights=vals * vals, minlength=len(docs)))
+        norms[norms == 0] = 1
+        vals /= norms[rows]
+        columns, local = np.unique(cols, return_inverse=True)
+        return csr_matrix((vals, local.ravel(), indptr), shape=(len(docs), len(columns)))
+
+    def stats(self):
+        with self._lock:
+            df_bytes = self._df.nbytes if self._df is not None else 0
+            stored = sum(doc[1].nbytes + doc[2].nbytes for doc in self._docs if doc[1] is not None)
+            return {
+                "documents": len(self._docs),
+                "pending": self._pending,
+                "hashed_total": self.hashed,
+                "n_features": self.n_features,
+                "active_features": int((self._df > 0).sum()) if self._df is not None else 0,
+                "memory_kb": math.ceil((df_bytes + stored) / 1024)
+            }
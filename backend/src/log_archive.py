@@ -0,0 +1,445 @@
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from log_records import content_match, LEVEL_SEVERITY
+from log_features import clean_text
+
+ARCHIVE_DIR = os.environ.get(
+    "NEXOOPS_LOG_ARCHIVE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "archive")
+)
+# Entries newer than this stay in the text log that LogStorage loads at startup
+KEEP_HOURS = float(os.environ.get("NEXOOPS_LOG_KEEP_HOURS", "24"))
+# Dictionary-encoded columns; code 0 is always "" (unknown / none)
+DICTIONARIES = ("level", "device", "event", "template")
+# Columns of a partition: epoch seconds (local wall time, as logged) plus one code per dictionary
+COLUMNS = ("ts",) + DICTIONARIES
+GROUP_KEYS = DICTIONARIES + ("hour", "day")
+_BUCKETS = {"hour": 3600, "day": 86400}
+TEMPLATE_MEMO_SIZE = 100000
+
+_LINE = re.compile(r'\[(.*?)\] (.*)')  # LogStorage's "[iso-timestamp] content" lines
+
+
+def _epoch_seconds(timestamps):
+    """ISO timestamp strings -> int64 seconds, vectorized; -1 where a string does not parse."""
+    try:
+        return np.asarray(timestamps, dtype="datetime64[us]").astype("datetime64[s]").astype(np.int64)
+    except ValueError:
+        out = np.full(len(timestamps), -1, dtype=np.int64)
+        for i, value in enumerate(timestamps):
+            try:
+                out[i] = np.datetime64(value, "s").astype(np.int64)
+            except ValueError:
+                pass
+        return out
+
+def _seconds(value):
+    """A datetime, ISO string or None as the archive's wall-clock epoch seconds."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        value = value.replace(tzinfo=None).isoformat()
+    return int(np.datetime64(value, "s").astype(np.int64))
+
+
+# -----------------------------
+# COLUMNAR ARCHIVE
+# -----------------------------
+class LogArchive:
+    """
+    Parsed log entries in column files, one directory per compaction.
+
+    Each partition holds `ts.npy` (int64 seconds) and a uint32 code column
+    per dictionary (level, device, event, template), plus `text.bin` and
+    `text_offsets.npy` with the original content so nothing is lost.
+    Dictionaries are shared by all partitions and only ever appended to, so
+    codes are stable; they are saved before the partition that first uses
+    them. A partition's `meta.json` records its row count and time range,
+    which lets queries skip partitions outside the range without opening
+    them. Aggregations memory-map just the columns they group or filter on.
+    """
+
+    def __init__(self, root=ARCHIVE_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self._load_dictionaries()
+
+    @property
+    def _dictionary_path(self):
+        return os.path.join(self.root, "dictionaries.json")
+
+    def _load_dictionaries(self):
+        try:
+            with open(self._dictionary_path) as f:
+                self.dictionaries = json.load(f)
+        except (OSError, ValueError):
+            self.dictionaries = {name: [""] for name in DICTIONARIES}
+        self._codes = {name: {value: code for code, value in enumerate(values)}
+                       for name, values in self.dictionaries.items()}
+
+    def _save_dictionaries(self):
+        tmp = f"{self._dictionary_path}.tmp-{os.getpid()}"
+        with open(tmp, "w") as f:
+            json.dump(self.dictionaries, f)
+        os.replace(tmp, self._dictionary_path)
+
+    def _encode(self, name, value):
+        codes = self._codes[name]
+        code = codes.get(value or "")
+        if code is None:
+            code = codes[value] = len(self.dictionaries[name])
+            self.dictionaries[name].append(value)
+        return code
+
+    # ---- writing ----
+    def append(self, entries, source=None):
+        """
+        Write (timestamp, content) pairs as a new partition; returns its
+        meta, or None when no entry has a readable timestamp. `source`
+        identifies where the rows came from (see compact()).
+        """
+        entries = list(entries)
+        ts = _epoch_seconds([timestamp for timestamp, _ in entries])
+        keep = ts >= 0
+        if not keep.any():
+            return None
+        entries = [entry for entry, ok in zip(entries, keep) if ok]
+        ts = ts[keep]
+
+        with self._lock:
+            os.makedirs(self.root, exist_ok=True)
+            codes = {name: np.empty(len(entries), dtype=np.uint32) for name in DICTIONARIES}
+            memo = {}
+            texts = []
+            for i, (_, content) in enumerate(entries):
+                match = content_match(content)
+                if match:
+                    groups = match.groupdict()
+                    level, event, device = groups["level"].upper(), groups.get("event"), groups.get("source")
+                    message = groups["message"]
+                else:
+                    level = event = device = None
+                    message = content
+                template = memo.get(message)
+                if template is None:
+                    if len(memo) >= TEMPLATE_MEMO_SIZE:
+                        memo.clear()
+                    template = memo[message] = clean_text(message)
+                codes["level"][i] = self._encode("level", level)
+                codes["device"][i] = self._encode("device", device)
+                codes["event"][i] = self._encode("event", event)
+                codes["template"][i] = self._encode("template", template)
+                texts.append(content.encode("utf-8"))
+            self._save_dictionaries()
+
+            order = np.argsort(ts, kind="stable")
+            name = f"part-{time.strftime('%Y%m%d%H%M%S')}-{len(self._partition_names()):06d}"
+            tmp = os.path.join(self.root, f".{name}.tmp")
+            os.makedirs(tmp)
+            np.save(os.path.join(tmp, "ts.npy"), ts[order])
+            for column, values in codes.items():
+                np.save(os.path.join(tmp, f"{column}.npy"), values[order])
+            texts = [texts[i] for i in order]
+            with open(os.path.join(tmp, "text.bin"), "wb") as f:
+                f.write(b"".join(texts))
+            np.save(os.path.join(tmp, "text_offsets.npy"),
+                    np.concatenate([[0], np.cumsum([len(t) for t in texts])]).astype(np.int64))
+            meta = {"name": name, "rows": len(entries), "min_ts": int(ts.min()), "max_ts": int(ts.max()),
+                    "source": source, "created": time.time()}
+            with open(os.path.join(tmp, "meta.json"), "w") as f:
+                json.dump(meta, f)
+            os.replace(tmp, os.path.join(self.root, name))
+            return meta
+
+    # ---- reading ----
+    def _partition_names(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(n for n in os.listdir(self.root) if n.startswith("part-"))
+
+    def partitions(self, since=None, until=None):
+        """(path, meta) of every partition overlapping [since, until] (epoch seconds)."""
+        out = []
+        for name in self._partition_names():
+            path = os.path.join(self.root, name)
+            try:
+                with open(os.path.join(path, "meta.json")) as f:
+                    meta = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if (since is not None and meta["max_ts"] < since) or (until is not None and meta["min_ts"] > until):
+                continue
+            out.append((path, meta))
+        return out
+
+    @staticmethod
+    def column(path, name):
+        return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+    def level_codes(self, levels=None, severities=None):
+        """Codes of the given level names and of every level mapping to one of `severities`."""
+        wanted = {level.upper() for level in levels or ()}
+        wanted |= {level for level, severity in LEVEL_SEVERITY.items() if severity in (severities or ())}
+        return [code for value, code in self._codes["level"].items() if value in wanted]
+
+    def aggregate(self, by=("device", "hour"), levels=None, severities=None, since=None, until=None, top=None):
+        """
+        Entry counts grouped by `by` (any of GROUP_KEYS), optionally filtered
+        by level names or severities and a time range; largest first.
+        "Errors per device per hour over 30 days" is
+        aggregate(("device", "hour"), severities=("High", "Critical"), since=now - 30 days).
+        """
+        by = tuple(by)
+        unknown = [key for key in by if key not in GROUP_KEYS]
+        if unknown or not by:
+            raise ValueError(f"Group by one or more of {list(GROUP_KEYS)}, got {list(by)}")
+        since, until = _seconds(since), _seconds(until)
+        wanted = None
+        if levels is not None or severities is not None:
+            # Lookup table over level codes: one gather per row instead of np.isin
+            wanted = np.zeros(len(self.dictionaries["level"]), dtype=bool)
+            wanted[self.level_codes(levels, severities)] = True
+
+        parts = {key: [] for key in by}
+        scanned = 0
+        for path, meta in self.partitions(since, until):
+            mask = None
+            need_ts = since is not None or until is not None or any(key in _BUCKETS for key in by)
+            ts = self.column(path, "ts") if need_ts else None
+            if since is not None or until is not None:
+                lo = np.searchsorted(ts, since, side="left") if since is not None else 0
+                hi = np.searchsorted(ts, until, side="right") if until is not None else len(ts)
+                window = slice(lo, hi)
+            else:
+                window = slice(0, meta["rows"])
+            if wanted is not None:
+                mask = wanted[self.column(path, "level")[window]]
+            for key in by:
+                values = ts[window] // _BUCKETS[key] if key in _BUCKETS else self.column(path, key)[window]
+                parts[key].append(np.asarray(values if mask is None else values[mask], dtype=np.int64))
+            scanned += meta["rows"]
+
+        columns = [np.concatenate(parts[key]) if parts[key] else np.empty(0, np.int64) for key in by]
+        groups, counts = _group_count(columns)
+        order = np.argsort(-counts, kind="stable")
+        if top:
+            order = order[:top]
+        labels = []
+        for key, values in zip(by, groups):
+            values = values[order]
+            if key in _BUCKETS:
+                labels.append(np.datetime_as_string((values * _BUCKETS[key]).astype("datetime64[s]")).tolist())
+            else:
+                labels.append(np.asarray(self.dictionaries[key], dtype=object)[values].tolist())
+        rows = [dict(zip(by, row), count=count) for *row, count in zip(*labels, counts[order].tolist())]
+        return {"by": list(by), "groups": rows, "total": int(counts.sum()), "rows_scanned": scanned}
+
+    def entries(self, since=None, until=None):
+        """(iso timestamp, content) of archived entries in [since, until], oldest first per partition."""
+        since, until = _seconds(since), _seconds(until)
+        for path, meta in self.partitions(since, until):
+            ts = self.column(path, "ts")
+            offsets = self.column(path, "text_offsets")
+            lo = np.searchsorted(ts, since, side="left") if since is not None else 0
+            hi = np.searchsorted(ts, until, side="right") if until is not None else len(ts)
+            with open(os.path.join(path, "text.bin"), "rb") as f:
+                f.seek(int(offsets[lo]))
+                blob = f.read(int(offsets[hi]) - int(offsets[lo]))
+            base = int(offsets[lo])
+            for i in range(lo, hi):
+                text = blob[int(offsets[i]) - base:int(offsets[i + 1]) - base].decode("utf-8", "replace")
+                yield str(np.datetime64(int(ts[i]), "s")), text
+
+    def stats(self):
+        parts = self.partitions()
+        return {
+            "partitions": len(parts),
+            "rows": sum(meta["rows"] for _, meta in parts),
+            "min_ts": str(np.datetime64(min(m["min_ts"] for _, m in parts), "s")) if parts else None,
+            "max_ts": str(np.datetime64(max(m["max_ts"] for _, m in parts), "s")) if parts else None,
+            "dictionary_sizes": {name: len(values) for name, values in self.dictionaries.items()},
+        }
+
+
+def _group_count(columns):
+    """Distinct rows of parallel int64 columns and their counts, via one mixed-radix key when it fits."""
+    if not len(columns[0]):
+        return [np.empty(0, np.int64) for _ in columns], np.empty(0, np.int64)
+    lows = [int(c.min()) for c in columns]
+    spans = [int(c.max()) - lo + 1 for c, lo in zip(columns, lows)]
+    size = np.prod([float(s) for s in spans])
+    if size >= 2 ** 62:
+        rows, counts = np.unique(np.stack(columns, axis=1), axis=0, return_counts=True)
+        return [rows[:, i] for i in range(len(columns))], counts
+    key = np.zeros(len(columns[0]), dtype=np.int64)
+    for c, lo, span in zip(columns, lows, spans):
+        key = key * span + (c - lo)
+    if size <= max(1 << 22, 4 * len(key)):
+        # Dense key space (e.g. devices x hours): count without sorting
+        counts = np.bincount(key, minlength=int(size))
+        keys = np.flatnonzero(counts)
+        counts = counts[keys]
+    else:
+        keys, counts = np.unique(key, return_counts=True)
+    groups = []
+    for lo, span in reversed(list(zip(lows, spans))):
+        keys, digit = np.divmod(keys, span)
+        groups.append(digit + lo)
+    return groups[::-1], counts
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+def get_archive():
+    """The process-wide archive (its dictionaries stay loaded between queries)."""
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = LogArchive()
+        return _archive
+
+
+# -----------------------------
+# COMPACTION
+# -----------------------------
+class CompactionRunning(RuntimeError):
+    """Another compaction of the same log is in progress (HTTP 409)."""
+
+
+_compact_lock = threading.Lock()
+
+def _try_lock_file(handle):
+    """Non-blocking exclusive lock on an open file, held until it is closed; False if another process has it."""
+    try:
+        if os.name == "nt":
+            import msvcrt
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+def compact(log_file, archive=None, keep_hours=KEEP_HOURS, lock=None, now=None):
+    """
+    Roll entries older than `keep_hours` out of the text log into the
+    archive (see _compact). Whole runs are serialized, within this process
+    and against others (the CLI next to the server) through a lock on
+    `log_file`.lock; CompactionRunning if one is already in progress.
+    """
+    if not _compact_lock.acquire(blocking=False):
+        raise CompactionRunning("A compaction is already running")
+    try:
+        with open(log_file + ".lock", "a") as handle:
+            if not _try_lock_file(handle):
+                raise CompactionRunning(f"A compaction of {log_file} is already running in another process")
+            return _compact(log_file, archive, keep_hours, lock, now)
+    finally:
+        _compact_lock.release()
+
+def _compact(log_file, archive, keep_hours, lock, now):
+    """
+    One compaction run, with compact()'s locks held: old entries go into a
+    new archive partition and the log is rewritten with the rest.
+
+    The log is renamed aside first (under `lock`, the writer's lock, so
+    LogStorage appends go to a fresh file meanwhile). The recent lines plus
+    anything appended during the run are written back, the renamed file is
+    marked done, and only then are the old rows archived. A run that died
+    midway is finished by the next one: from the start while the renamed file
+    is unmarked, from the archive step once marked. The partition records
+    the renamed file as its `source`, so rows are never archived twice.
+    """
+    archive = archive or get_archive()
+    lock = lock or threading.Lock()
+    pending, done, tmp = log_file + ".compacting", log_file + ".compacted", log_file + ".tmp"
+    cutoff = ((now or datetime.now()) - timedelta(hours=keep_hours)).isoformat()
+    start = time.perf_counter()
+    resumed = os.path.exists(pending) or os.path.exists(done)
+
+    with lock:
+        if not resumed:
+            if not os.path.exists(log_file):
+                return {"archived": 0, "kept": 0, "partition": None, "resumed": False}
+            os.replace(log_file, pending)
+    rotated = done if os.path.exists(done) else pending
+    source = f"{os.path.basename(log_file)}:{os.path.getsize(rotated)}:{int(os.path.getmtime(rotated))}"
+
+    old, recent = [], []
+    with open(rotated, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            m = _LINE.match(line)
+            if m and m.group(1) < cutoff:
+                old.append((m.group(1), m.group(2).rstrip("\n")))
+            else:
+                recent.append(line if line.endswith("\n") else line + "\n")
+
+    with lock:
+        if rotated == pending:
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.writelines(recent)
+            os.replace(pending, done)
+        if os.path.exists(tmp):
+            # Entries LogStorage appended meanwhile go after the kept ones
+            if os.path.exists(log_file):
+                with open(log_file, "r", encoding="utf-8", errors="replace") as src, open(tmp, "a") as dst:
+                    dst.write(src.read())
+            os.replace(tmp, log_file)
+
+    meta = None
+    if old and not any(m.get("source") == source for _, m in archive.partitions()):
+        meta = archive.append(old, source=source)
+    os.remove(done)
+    return {"archived": meta["rows"] if meta else 0, "kept": len(recent), "partition": meta["name"] if meta else None,
+            "resumed": resumed, "seconds": round(time.perf_counter() - start, 3)}
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compact the text log into the columnar archive, or query it")
+    sub = parser.add_subparsers(dest="command", required=True)
+    c = sub.add_parser("compact", help="roll old entries of the text log into a new partition "
+                                       "(stop the server first, or use POST /logs/compact)")
+    c.add_argument("--log-file", default="network_logs.txt")
+    c.add_argument("--keep-hours", type=float, default=KEEP_HOURS)
+    q = sub.add_parser("query", help="count entries grouped by columns")
+    q.add_argument("--by", default="device,hour", help=f"comma-separated, from {','.join(GROUP_KEYS)}")
+    q.add_argument("--levels", default=None, help="e.g. ERROR,CRITICAL")
+    q.add_argument("--severities", default=None, help="e.g. High,Critical")
+    q.add_argument("--days", type=float, default=None)
+    q.add_argument("--top", type=int, default=20)
+    sub.add_parser("stats")
+    args = parser.parse_args()
+
+    archive = get_archive()
+    if args.command == "compact":
+        try:
+            print(json.dumps(compact(args.log_file, archive, keep_hours=args.keep_hours)))
+        except CompactionRunning as e:
+            sys.exit(str(e))
+    elif args.command == "stats":
+        print(json.dumps(archive.stats(), indent=2))
+    else:
+        since = datetime.now() - timedelta(days=args.days) if args.days else None
+        try:
+            result = archive.aggregate(args.by.split(","), since=since, top=args.top,
+                                       levels=args.levels.split(",") if args.levels else None,
+                                       severities=args.severities.split(",") if args.severities else None)
+        except ValueError as e:
+            sys.exit(str(e))
+        for row in result["groups"]:
+            print(f"{row['count']:>9}  " + "  ".join(str(row[key]) for key in result["by"]))
+        print(f"{result['total']} matching of {result['rows_scanned']} scanned")
@@ -0,0 +1,43 @@
+import re
+
+# -----------------------------
+# CLEAN LOG TEXT
+# -----------------------------
+# Applied in order to lower-cased text: variable fields (IPs, bracketed ids,
+# hex, numbers) are masked so every line of one template cleans to one string.
+_CLEAN_STEPS = [
+    (r'\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}', ' IPADDR '),
+    (r'\[.*?\]', ' '),
+    (r'\{.*?\}', ' '),
+    (r'\(.*?\)', ' '),
+    (r'\b(0x)?[0-9a-f]+\b', ' HEX '),
+    (r'\b\d+\b', ' NUM '),
+    (r'[^a-z\s]', ' '),
+    (r'\s+', ' '),
+]
+_COMPILED_STEPS = [(re.compile(pattern), repl) for pattern, repl in _CLEAN_STEPS]
+
+def clean_text(text):
+    if not isinstance(text, str):
+        return ""
+    text = text.lower()
+    for pattern, repl in _COMPILED_STEPS:
+        text = pattern.sub(repl, text)
+    return text.strip()
+
+# -----------------------------
+# FEATURE EXTRACTION
+# -----------------------------
+CRITICAL_KEYWORDS = ['error', 'failed', 'critical', 'fatal', 'panic', 'crash', 'corruption', 'breach']
+WARNING_KEYWORDS = ['warning', 'timeout', 'slow', 'high', 'full', 'exceeded', 'congestion']
+INFO_KEYWORDS = ['success', 'completed', 'started', 'normal', 'stable']
+FEATURE_COLUMNS = ['char_count','word_count','critical_words','warning_words','info_words']
+
+def extract_features(text):
+    features = {}
+    features['char_count'] = len(text)
+    features['word_count'] = len(text.split())
+    features['critical_words'] = sum(1 for word in CRITICAL_KEYWORDS if word in text)
+    features['warning_words'] = sum(1 for word in WARNING_KEYWORDS if word in text)
+    features['info_words'] = sum(1 for word in INFO_KEYWORDS if word in text)
+    return features
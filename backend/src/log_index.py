@@ -0,0 +1,218 @@
+import re
+import time
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+# Postings are grouped by the hour the entry was logged, so a time-bounded
+# query only opens the segments that overlap its range
+SEGMENT_SECONDS = 3600
+
+# Tokens keep their inner punctuation: IPs (10.0.3.7), interfaces (gi0/24),
+# hosts (router-r1) and paths (/api/v1/login) are single searchable terms
+_TOKEN = re.compile(r'[a-z0-9_]+(?:[./:\-][a-z0-9_]+)*')
+_IPV4 = re.compile(r'\d{1,3}(?:\.\d{1,3}){3}')
+_PARTS = re.compile(r'[./:\-]')
+_INTERFACE = re.compile(r'^([a-z][a-z\-]*?)(\d+(?:/\d+)*(?:\.\d+)?)$')
+# Long and short interface names index both ways, so Gi0/24 finds GigabitEthernet0/24
+INTERFACE_ALIASES = {
+    "gigabitethernet": "gi", "tengigabitethernet": "te", "fastethernet": "fa", "ethernet": "eth",
+    "port-channel": "po", "loopback": "lo", "tunnel": "tu", "vlan": "vl",
+}
+_ALIAS_OF = dict(INTERFACE_ALIASES, **{short: long for long, short in INTERFACE_ALIASES.items()})
+
+
+def tokenize(text):
+    """Index terms of `text`: whole tokens, the alphanumeric parts of compound ones, embedded IPs, interface aliases."""
+    terms = set()
+    for token in _TOKEN.findall(text.lower()):
+        terms.add(token)
+        if not _PARTS.search(token):
+            _add_alias(token, terms)
+            continue
+        terms.update(_IPV4.findall(token))
+        for part in _PARTS.split(token):
+            if part and not part.isdigit():
+                terms.add(part)
+        _add_alias(token, terms)
+    return terms
+
+def _add_alias(token, terms):
+    match = _INTERFACE.match(token)
+    if match and match.group(1) in _ALIAS_OF:
+        terms.add(_ALIAS_OF[match.group(1)] + match.group(2))
+
+
+def parse_query(query):
+    """
+    Boolean query -> list of (required, excluded) term lists, one per OR branch.
+
+    Words are ANDed; OR separates branches; NOT or a leading '-' excludes a
+    word. "10.0.3.7 OR gi0/24 -debug" is [(["10.0.3.7"], ["debug"]), (["gi0/24"], ["debug"])]:
+    exclusions apply to every branch.
+    """
+    branches, excluded, negate = [[]], [], False
+    for word in query.split():
+        upper = word.upper()
+        if upper == "OR":
+            branches.append([])
+            continue
+        if upper == "AND":
+            continue
+        if upper == "NOT":
+            negate = True
+            continue
+        if word.startswith("-") and len(word) > 1:
+            negate, word = True, word[1:]
+        terms = _TOKEN.findall(word.lower())
+        (excluded if negate else branches[-1]).extend(terms)
+        negate = False
+    return [(required, excluded) for required in branches if required or excluded]
+
+
+def _epoch(timestamp):
+    if isinstance(timestamp, (int, float)):
+        return float(timestamp)
+    if isinstance(timestamp, datetime):
+        return timestamp.timestamp()
+    try:
+        return datetime.fromisoformat(timestamp).timestamp()
+    except (TypeError, ValueError):
+        return time.time()
+
+
+class _Segment:
+    """Entries logged in one SEGMENT_SECONDS slot: their sequence numbers, times and term postings."""
+
+    __slots__ = ("seqs", "times", "postings")
+
+    def __init__(self):
+        self.seqs = array("q")
+        self.times = array("d")
+        self.postings = {}
+
+    def add(self, seq, ts, terms):
+        position = len(self.seqs)
+        self.seqs.append(seq)
+        self.times.append(ts)
+        for term in terms:
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = array("l")
+            posting.append(position)
+
+    def match(self, required, excluded):
+        """Positions (into seqs) of entries with every required term and no excluded one."""
+        if required:
+            postings = [self.postings.get(term) for term in required]
+            if not all(postings):
+                return set()
+            postings.sort(key=len)
+            matches = set(postings[0])
+            for posting in postings[1:]:
+                matches.intersection_update(posting)
+                if not matches:
+                    return matches
+        else:
+            matches = set(range(len(self.seqs)))
+        for term in excluded:
+            posting = self.postings.get(term)
+            if posting:
+                matches.difference_update(posting)
+        return matches
+
+
+# -----------------------------
+# INVERTED INDEX
+# -----------------------------
+class LogIndex:
+    """
+    Inverted index over a stream of log entries, built as they arrive.
+
+    Every entry gets the next sequence number and is tokenized once (see
+    tokenize). Postings live in per-hour segments keyed by the entry's own
+    timestamp, so entries uploaded late land in the hour they happened and a
+    query for the last N hours only intersects the postings of N+1 segments.
+    Only the newest `max_docs` sequence numbers are live, matching the
+    LogStorage deque; segments are dropped once all their entries are older.
+    """
+
+    def __init__(self, max_docs=10000, segment_seconds=SEGMENT_SECONDS):
+        self.max_docs = max_docs
+        self.segment_seconds = segment_seconds
+        self._segments = {}
+        self._keys = []  # sorted segment keys
+        self.next_seq = 0
+        self._lock = threading.Lock()
+
+    @property
+    def first_seq(self):
+        """Oldest live sequence number."""
+        return max(0, self.next_seq - self.max_docs)
+
+    def __len__(self):
+        return self.next_seq - self.first_seq
+
+    def add(self, timestamp, text):
+        """Index one entry; returns its sequence number."""
+        ts = _epoch(timestamp)
+        terms = tokenize(text)
+        key = int(ts // self.segment_seconds)
+        with self._lock:
+            segment = self._segments.get(key)
+            if segment is None:
+                segment = self._segments[key] = _Segment()
+                self._keys.insert(bisect_left(self._keys, key), key)
+            seq = self.next_seq
+            segment.add(seq, ts, terms)
+            self.next_seq += 1
+            if seq % 1024 == 0:
+                self._drop_expired()
+            return seq
+
+    def clear(self):
+        with self._lock:
+            self._segments.clear()
+            self._keys = []
+            self.next_seq = 0
+
+    def _drop_expired(self):
+        first = self.first_seq
+        expired = [key for key in self._keys if self._segments[key].seqs[-1] < first]
+        for key in expired:
+            del self._segments[key]
+        if expired:
+            self._keys = [key for key in self._keys if key in self._segments]
+
+    def search(self, query, since=None, until=None):
+        """
+        Sequence numbers of live entries matching the boolean `query`
+        (see parse_query) logged within [since, until], newest first.
+        """
+        branches = parse_query(query) if isinstance(query, str) else query
+        if not branches:
+            return []
+        since = _epoch(since) if since is not None else None
+        until = _epoch(until) if until is not None else None
+        with self._lock:
+            first = self.first_seq
+            lo = bisect_left(self._keys, int(since // self.segment_seconds)) if since is not None else 0
+            hi = bisect_right(self._keys, int(until // self.segment_seconds)) if until is not None else len(self._keys)
+            hits = []
+            for key in self._keys[lo:hi]:
+                segment = self._segments[key]
+                positions = set()
+                for required, excluded in branches:
+                    positions |= segment.match(required, excluded)
+                for p in positions:
+                    ts = segment.times[p]
+                    if segment.seqs[p] >= first and (since is None or ts >= since) and (until is None or ts <= until):
+                        hits.append((ts, segment.seqs[p]))
+        hits.sort(reverse=True)
+        return [seq for _, seq in hits]
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self), "segments": len(self._keys),
+                    "terms": sum(len(s.postings) for s in self._segments.values())}
@@ -0,0 +1,196 @@
+import re
+from datetime import datetime
+
+# -----------------------------
+# LEVELS
+# -----------------------------
+# Explicit log levels and the classifier severity they stand for
+LEVEL_SEVERITY = {
+    "DEBUG": "Low", "INFO": "Low", "NOTICE": "Low",
+    "WARN": "Medium", "WARNING": "Medium",
+    "ERR": "High", "ERROR": "High",
+    "CRIT": "Critical", "CRITICAL": "Critical", "FATAL": "Critical", "ALERT": "Critical", "EMERG": "Critical"
+}
+
+_TIMESTAMP = r'(?P<timestamp>\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?)'
+_LEVEL = r'(?P<level>' + '|'.join(sorted(LEVEL_SEVERITY, key=len, reverse=True)) + r')'
+
+# -----------------------------
+# FORMATS
+# -----------------------------
+# Header pattern per format. A line matching the header starts a record; any
+# other non-blank line continues the current one, so multi-line bodies (and
+# stack traces under single-line formats) stay with their header.
+FORMATS = {
+    # 2025-11-24 09:05:12 [WARN] CPU_USAGE_MODERATE :   (body on the next line)
+    "header_body": re.compile(_TIMESTAMP + r'\s+\[' + _LEVEL + r'\]\s+(?P<event>[A-Za-z0-9_.\-]+)\s*:\s*(?P<message>.*)$',
+                              re.IGNORECASE),
+    # 2025-11-12 00:01:00 WARN Router-R1: BGP neighbor 10.0.0.2 flapped
+    "single_line": re.compile(_TIMESTAMP + r'\s+\[?' + _LEVEL + r'\]?\s+(?:(?P<source>[^\s:]+):\s+)?(?P<message>.*)$',
+                              re.IGNORECASE),
+}
+SNIFF_LINES = 20
+_LEADING_TIMESTAMP = re.compile(r'^' + _TIMESTAMP + r'\s*')
+# Every format's header starts with a timestamp: enough to find record boundaries
+_RECORD_START = re.compile(r'\d{4}-\d\d-\d\d[ T]\d\d:\d\d:\d\d')
+
+
+class LogRecord:
+    """One log record: its typed header fields plus the (possibly multi-line) message."""
+
+    __slots__ = ("timestamp", "level", "event", "source", "message", "text", "line")
+
+    def __init__(self, text, line=None, timestamp=None, level=None, event=None, source=None, message=None):
+        self.text = text
+        self.line = line
+        self.timestamp = timestamp
+        self.level = level
+        self.event = event
+        self.source = source
+        self.message = message if message is not None else text
+
+    @property
+    def severity(self):
+        """Classifier severity implied by the explicit level, or None."""
+        return LEVEL_SEVERITY.get(self.level) if self.level else None
+
+    @property
+    def content(self):
+        """The record's text without its leading timestamp (what LogStorage stores)."""
+        if self.timestamp is None:
+            return self.text
+        return _LEADING_TIMESTAMP.sub('', self.text, count=1)
+
+    def to_dict(self):
+        return {
+            "timestamp": self.timestamp.isoformat() if self.timestamp else None,
+            "level": self.level,
+            "severity": self.severity,
+            "event": self.event,
+            "source": self.source,
+            "message": self.message,
+            "line": self.line
+        }
+
+
+def _parse_timestamp(value):
+    try:
+        return datetime.fromisoformat(value.replace(',', '.'))
+    except ValueError:
+        return None
+
+
+def detect_format(lines):
+    """Name of the format whose header matches most of `lines` (non-blank), or None for plain text."""
+    sample = [line.strip() for line in lines if line.strip()][:SNIFF_LINES]
+    if not sample:
+        return None
+    best, best_hits = None, 0
+    for name, pattern in FORMATS.items():
+        hits = sum(1 for line in sample if pattern.match(line))
+        if hits > best_hits:
+            best, best_hits = name, hits
+    # header_body headers are about half the lines; a stray match is not a format
+    return best if best_hits >= max(1, len(sample) // 4) else None
+
+
+def _assemble(header, number, body):
+    message = " ".join([header.group("message").strip()] + body).strip()
+    level = header.group("level").upper()
+    groups = header.groupdict()
+    return LogRecord(
+        text=" ".join([header.string.strip()] + body),
+        line=number,
+        timestamp=_parse_timestamp(header.group("timestamp")),
+        level=level,
+        event=groups.get("event"),
+        source=(groups.get("source") or "").strip() or None,
+        message=message
+    )
+
+
+def parse_records(lines, fmt="auto"):
+    """
+    Stream LogRecords from an iterable of lines (a file object works).
+
+    With fmt="auto" the format is sniffed from the first SNIFF_LINES non-blank
+    lines; fmt=None treats every non-blank line as its own record. Blank lines
+    never produce records. `line` is the 1-based line number of the header.
+    """
+    if isinstance(lines, str):
+        lines = lines.split('\n')
+    lines = iter(lines)
+    buffered = []
+    if fmt == "auto":
+        seen = 0
+        for line in lines:
+            buffered.append(line)
+            seen += bool(line.strip())
+            if seen >= SNIFF_LINES:
+                break
+        fmt = detect_format(buffered)
+    pattern = FORMATS[fmt] if fmt else None
+
+    def numbered():
+        for n, line in enumerate(buffered, 1):
+            yield n, line
+        for n, line in enumerate(lines, len(buffered) + 1):
+            yield n, line
+
+    header, header_line, body = None, None, []
+    for n, line in numbered():
+        line = line.strip()
+        if not line:
+            continue
+        match = pattern.match(line) if pattern else None
+        if match:
+            if header is not None:
+                yield _assemble(header, header_line, body)
+            header, header_line, body = match, n, []
+        elif header is not None:
+            body.append(line)
+        else:
+            yield LogRecord(line, line=n)
+    if header is not None:
+        yield _assemble(header, header_line, body)
+
+
+def record_texts(text):
+    """
+    Just the joined text of each record, as parse_records(text) would give it,
+    without building records: boundaries come from a timestamp prefix check,
+    which keeps this close to a plain split for the summarizer's hot path.
+    """
+    lines = text.split('\n')
+    if detect_format(lines[:SNIFF_LINES * 4]) is None:
+        return [line.strip() for line in lines if line.strip()]
+    texts, joinable = [], False
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if _RECORD_START.match(line):
+            texts.append(line)
+            joinable = True
+        elif joinable:
+            texts[-1] += " " + line
+        else:
+            texts.append(line)
+    return texts
+
+
+def content_match(content):
+    """Header match of stored LogRecord.content (the record minus its timestamp), or None."""
+    for pattern in FORMATS.values():
+        match = pattern.match("1970-01-01 00:00:00 " + content)
+        if match:
+            return match
+    return None
+
+
+def content_fields(content):
+    """level and event recovered from stored LogRecord.content (e.g. "[WARN] CPU_HIGH : ...")."""
+    match = content_match(content)
+    if match:
+        return {"level": match.group("level").upper(), "event": match.groupdict().get("event")}
+    return {}
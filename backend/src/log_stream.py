@@ -0,0 +1,211 @@
+import os
+import bz2
+import zlib
+import codecs
+from importlib.util import find_spec
+
+try:
+    ZSTD_AVAILABLE = find_spec("zstandard") is not None
+except (ImportError, ValueError):
+    ZSTD_AVAILABLE = False
+
+# Codecs are recognised by their magic bytes, so clients need not say what they send
+MAGIC = ((b"\x1f\x8b", "gzip"), (b"BZh", "bz2"), (b"\x28\xb5\x2f\xfd", "zstd"))
+CHUNK_SIZE = 64 * 1024
+# Decompressed bytes accepted per request; guards against decompression bombs
+MAX_DECOMPRESSED = int(os.environ.get("NEXOOPS_UPLOAD_MAX_BYTES", str(2 * 1024 ** 3)))
+
+
+class UnsupportedCodec(ValueError):
+    """The stream is compressed with a codec that is not available here."""
+
+
+class UploadTooLarge(ValueError):
+    """More than the allowed number of bytes came out of the decompressor."""
+
+
+# -----------------------------
+# INCREMENTAL DECODING
+# -----------------------------
+class StreamDecoder:
+    """
+    Push decoder for one uploaded stream: feed() compressed (or plain) bytes,
+    get complete text lines back. The codec is sniffed from the first bytes.
+    Decompressed output is produced in CHUNK_SIZE pieces and a partial last
+    line is carried over, so memory stays bounded whatever the file size.
+    Concatenated gzip members and bz2 streams (as logrotate and pigz/pbzip2
+    write them) are decoded back to back.
+    """
+
+    def __init__(self, limit=None, max_bytes=MAX_DECOMPRESSED):
+        self.codec = None
+        # [bytes left], shared by the streams of one request
+        self.limit = limit if limit is not None else [max_bytes]
+        self.max_bytes = max_bytes
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._head = b""
+        self._decompressor = None
+        self._in_member = False
+        self._text = codecs.getincrementaldecoder("utf-8")("replace")
+        self._partial = ""
+        self.error = None  # set by iter_multipart_lines when this part failed to decode
+
+    def _start(self, head):
+        for magic, codec in MAGIC:
+            if head.startswith(magic):
+                self.codec = codec
+                break
+        else:
+            self.codec = "plain"
+        self._decompressor = self._new_decompressor()
+
+    def _new_decompressor(self):
+        if self.codec == "gzip":
+            return zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+        if self.codec == "bz2":
+            return bz2.BZ2Decompressor()
+        if self.codec == "zstd":
+            if not ZSTD_AVAILABLE:
+                raise UnsupportedCodec("zstd upload received but the zstandard package is not installed")
+            import zstandard
+            return zstandard.ZstdDecompressor().decompressobj()
+        return None
+
+    def _inflate(self, data):
+        """Decompressed pieces of `data`, at most CHUNK_SIZE each where the codec allows it."""
+        if self._decompressor is None:
+            yield data
+            return
+        while True:
+            d = self._decompressor
+            self._in_member = True
+            if self.codec == "gzip":
+                yield d.decompress(data, CHUNK_SIZE)
+                data = d.unconsumed_tail
+            elif self.codec == "bz2":
+                yield d.decompress(data, CHUNK_SIZE)
+                data = b""
+                if not d.eof and not d.needs_input:
+                    continue  # more output is buffered
+            else:
+                yield d.decompress(data)
+                data = b""
+            if getattr(d, "eof", False):
+                # The next member of a multi-member file starts in unused_data or the next chunk
+                data = d.unused_data + data
+                self._decompressor = self._new_decompressor()
+                self._in_member = False
+            if not data:
+                return
+
+    def _count(self, piece):
+        self.bytes_out += len(piece)
+        self.limit[0] -= len(piece)
+        if self.limit[0] < 0:
+            raise UploadTooLarge(f"upload decompresses to more than {self.max_bytes} bytes")
+
+    def feed(self, data):
+        self.bytes_in += len(data)
+        if self.codec is None:
+            self._head += data
+            if len(self._head) < 4:
+                return []
+            data, self._head = self._head, b""
+            self._start(data)
+        lines = []
+        try:
+            for piece in self._inflate(data):
+                lines.extend(self._lines(piece))
+        except zlib.error as e:
+            # OSError like bz2's, as the gzip module does
+            raise OSError(f"Corrupt gzip stream: {e}") from e
+        return lines
+
+    def _lines(self, piece):
+        if not piece:
+            return []
+        self._count(piece)
+        text = self._partial + self._text.decode(piece)
+        *complete, self._partial = text.split("\n")
+        return complete
+
+    def close(self):
+        """Lines left at the end of the stream (a short stream is sniffed here); OSError if it was cut off."""
+        lines = []
+        if self.codec is None:
+            head, self._head = self._head, b""
+            self.bytes_in -= len(head)
+            self._start(head)
+            lines = self.feed(head)
+        if self.codec == "gzip":
+            lines += self._lines(self._decompressor.flush())
+        if self._in_member:
+            raise OSError(f"Truncated {self.codec} stream after {self.bytes_out} decompressed bytes")
+        text = self._partial + self._text.decode(b"", final=True)
+        self._partial = ""
+        return lines + ([text] if text else [])
+
+    def stats(self):
+        return {"codec": self.codec, "compressed_bytes": self.bytes_in, "decompressed_bytes": self.bytes_out}
+
+
+def _read_chunks(stream):
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_lines(stream, decoder):
+    """Text lines of a raw (optionally compressed) byte stream, read CHUNK_SIZE at a time."""
+    for chunk in _read_chunks(stream):
+        yield from decoder.feed(chunk)
+    yield from decoder.close()
+
+
+def iter_multipart_lines(stream, boundary, max_bytes=MAX_DECOMPRESSED):
+    """
+    (part number, filename, decoder, line) for every line of every file part of
+    a multipart/form-data body, parsed straight off `stream`: parts are never
+    spooled to memory or disk. Each part has its own StreamDecoder, so parts
+    may use different codecs. Consume with itertools.groupby on the part.
+
+    The first item of every part has line None, so parts without lines still
+    show up. A corrupt or truncated part ends early with the OSError message
+    in its decoder's `error`; the parts after it are still parsed.
+    """
+    from werkzeug.sansio.multipart import MultipartDecoder, File, Data, Epilogue, NeedData
+
+    parser = MultipartDecoder(boundary.encode("latin-1"))
+    limit = [max_bytes]
+    part, filename, decoder = 0, None, None
+    chunks = _read_chunks(stream)
+    ended = False
+    while True:
+        event = parser.next_event()
+        if isinstance(event, NeedData):
+            if ended:
+                raise ValueError("multipart body ended before its closing boundary")
+            chunk = next(chunks, None)
+            ended = chunk is None
+            parser.receive_data(chunk)
+        elif isinstance(event, File):
+            part, filename = part + 1, event.filename or event.name
+            decoder = StreamDecoder(limit=limit, max_bytes=max_bytes)
+            yield part, filename, decoder, None
+        elif isinstance(event, Data) and decoder is not None:
+            current, lines = decoder, []
+            try:
+                lines += current.feed(event.data)
+                if not event.more_data:
+                    decoder = None
+                    lines += current.close()
+            except OSError as e:
+                # Keep the lines decoded so far, skip the rest of this part's data and carry on with the next part
+                current.error, decoder = str(e), None
+            for line in lines:
+                yield part, filename, current, line
+        elif isinstance(event, Epilogue):
+            return
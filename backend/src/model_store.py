@@ -0,0 +1,173 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from importlib.metadata import version, PackageNotFoundError
+
+import joblib
+
+MODEL_DIR = os.environ.get(
+    "NEXOOPS_MODEL_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+)
+
+# Artifacts are dumped uncompressed, so their numpy arrays can be memory-mapped
+# on load: every worker process maps the same file and shares the physical
+# pages through the page cache instead of holding a private copy.
+MODEL_MMAP = os.environ.get("NEXOOPS_MODEL_MMAP", "r") or None
+
+
+def library_versions():
+    """Versions of the libraries a pickled pipeline depends on."""
+    result = {}
+    for package in ("scikit-learn", "numpy", "joblib"):
+        try:
+            result[package] = version(package)
+        except PackageNotFoundError:
+            result[package] = None
+    return result
+
+
+def fingerprint(obj):
+    """Stable sha256 of a JSON-serialisable config."""
+    return hashlib.sha256(json.dumps(obj, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def _atomic_write(path, write):
+    """Write via a temp file in the same directory, fsync, then rename over `path`."""
+    tmp = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    try:
+        with open(tmp, "wb") as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+# -----------------------------
+# VERSIONED ARTIFACT STORE
+# -----------------------------
+class ModelStore:
+    """
+    Versioned on-disk store for a trained model.
+
+    Each save writes `<name>-v<N>.joblib` and then a `<name>.manifest.json`
+    describing it (training data fingerprint, library versions, metrics). Both
+    are written to a temp file and renamed, so readers see either the old
+    artifact or the new one, never a partial file. Artifacts are never
+    compressed so that `load()` can memory-map their arrays.
+
+    Optional sidecar files (`<name>-v<N>.<suffix>`, e.g. an exported scorer)
+    are written with the artifact, before the manifest that lists them.
+    """
+
+    def __init__(self, name="alert_model", root=MODEL_DIR, keep=2):
+        self.name = name
+        self.root = root
+        self.keep = keep
+        self.manifest_path = os.path.join(root, f"{name}.manifest.json")
+
+    def manifest(self):
+        try:
+            with open(self.manifest_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def artifact_path(self, manifest=None):
+        manifest = manifest or self.manifest()
+        return os.path.join(self.root, manifest["file"]) if manifest else None
+
+    def is_current(self, data_fingerprint):
+        """True if the stored artifact was trained on these inputs with these library versions."""
+        manifest = self.manifest()
+        if not manifest:
+            return False
+        return (manifest.get("data_fingerprint") == data_fingerprint
+                and manifest.get("libraries") == library_versions()
+                and os.path.exists(self.artifact_path(manifest)))
+
+    def sidecar_path(self, suffix, manifest=None):
+        manifest = manifest or self.manifest()
+        filename = ((manifest or {}).get("sidecars") or {}).get(suffix)
+        return os.path.join(self.root, filename) if filename else None
+
+    def save(self, model, data_fingerprint, metrics=None, extra=None, sidecars=None):
+        """`sidecars` maps a file suffix to a callable that writes that file given a binary handle."""
+        os.makedirs(self.root, exist_ok=True)
+        previous = self.manifest()
+        model_version = (previous or {}).get("version", 0) + 1
+        filename = f"{self.name}-v{model_version}.joblib"
+        path = os.path.join(self.root, filename)
+
+        # compress=0 keeps arrays as aligned raw buffers that joblib can mmap
+        _atomic_write(path, lambda f: joblib.dump(model, f, compress=0))
+        sidecar_files = {}
+        for suffix, write in (sidecars or {}).items():
+            sidecar_files[suffix] = f"{self.name}-v{model_version}.{suffix}"
+            _atomic_write(os.path.join(self.root, sidecar_files[suffix]), write)
+
+        manifest = {
+            "name": self.name,
+            "version": model_version,
+            "file": filename,
+            "sha256": self._file_hash(path),
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "data_fingerprint": data_fingerprint,
+            "libraries": library_versions(),
+            "metrics": metrics or {},
+            "sidecars": sidecar_files
+        }
+        if extra:
+            manifest.update(extra)
+        _atomic_write(self.manifest_path, lambda f: f.write(json.dumps(manifest, indent=2).encode("utf-8")))
+        self._prune(model_version)
+        return manifest
+
+    def load(self, mmap_mode=MODEL_MMAP):
+        """
+        Return (model, manifest), or (None, None) if nothing has been stored.
+
+        With `mmap_mode` ('r' read-only, 'c' copy-on-write) numpy arrays in the
+        artifact are mapped from disk rather than read into private memory.
+        Pruning an old version while it is still mapped is safe on POSIX: the
+        mapping keeps the unlinked file alive.
+        """
+        manifest = self.manifest()
+        if not manifest:
+            return None, None
+        return joblib.load(self.artifact_path(manifest), mmap_mode=mmap_mode), manifest
+
+    def mtime(self):
+        try:
+            return os.stat(self.manifest_path).st_mtime_ns
+        except OSError:
+            return None
+
+    @staticmethod
+    def _file_hash(path):
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def _prune(self, current_version):
+        """Remove artifact versions (and their sidecars) older than the newest `keep`."""
+        prefix = f"{self.name}-v"
+        for filename in os.listdir(self.root):
+            if not filename.startswith(prefix) or ".tmp-" in filename:
+                continue
+            try:
+                file_version = int(filename[len(prefix):].split(".", 1)[0])
+            except ValueError:
+                continue
+            if file_version <= current_version - self.keep:
+                try:
+                    os.remove(os.path.join(self.root, filename))
+                except OSError:
+                    pass
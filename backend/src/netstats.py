@@ -0,0 +1,477 @@
+import time
+import threading
+from array import array
+from collections import OrderedDict, deque
+
+import psutil
+
+
+# -----------------------------
+# PID -> PROCESS NAME CACHE
+# -----------------------------
+class ProcessNameCache:
+    """
+    Bounded LRU cache of pid -> process name lookups.
+    Entries expire after `ttl` seconds so a recycled pid is eventually re-resolved.
+    """
+
+    def __init__(self, max_size=4096, ttl=300.0, resolver=None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.resolver = resolver or self._resolve
+        self._names = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _resolve(pid):
+        try:
+            return psutil.Process(pid).name()
+        except Exception:
+            return "Unknown"
+
+    def get(self, pid, now=None):
+        if not pid:
+            return "Unknown"
+        now = time.monotonic() if now is None else now
+
+        with self._lock:
+            entry = self._names.get(pid)
+            if entry is not None and now - entry[1] < self.ttl:
+                self._names.move_to_end(pid)
+                self.hits += 1
+                return entry[0]
+
+        name = self.resolver(pid)
+
+        with self._lock:
+            self.misses += 1
+            self._names[pid] = (name, now)
+            self._names.move_to_end(pid)
+            while len(self._names) > self.max_size:
+                self._names.popitem(last=False)
+                self.evictions += 1
+        return name
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._names),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
+
+
+# -----------------------------
+# SHARED CONNECTION SNAPSHOT
+# -----------------------------
+class ConnectionSnapshot:
+    """
+    Single read of the inet connection table shared by every connection view.
+
+    The table is read at most once per `max_age` seconds; status counts, the
+    established list, the listening list and per-process usage are all derived
+    from the same snapshot, and process names come from a shared pid cache.
+    """
+
+    def __init__(self, max_age=2.0, source=None, name_cache=None):
+        self.max_age = max_age
+        self.source = source or (lambda: psutil.net_connections(kind='inet'))
+        self.names = name_cache or ProcessNameCache()
+        self._lock = threading.Lock()
+        self._conns = None
+        self._taken_at = 0.0
+        self._views = {}
+
+    def _refresh(self, force=False):
+        """Return the current table, re-reading it if the snapshot is stale."""
+        with self._lock:
+            now = time.monotonic()
+            if force or self._conns is None or now - self._taken_at >= self.max_age:
+                self._conns = self.source()
+                self._taken_at = now
+                self._views = {}
+            return self._conns, self._views
+
+    def _view(self, key, build, force=False):
+        conns, views = self._refresh(force)
+        view = views.get(key)
+        if view is None:
+            view = build(conns)
+            views[key] = view
+        return view
+
+    def counts(self, force=False):
+        """Connection totals by status."""
+        def build(conns):
+            established = listening = 0
+            for c in conns:
+                if c.status == 'ESTABLISHED':
+                    established += 1
+                elif c.status == 'LISTEN':
+                    listening += 1
+            return {"established": established, "listening": listening, "total_connections": len(conns)}
+        return dict(self._view("counts", build, force))
+
+    def established(self, limit=50, force=False):
+        """Established connections with owning process names."""
+        def build(conns):
+            result = []
+            for c in conns:
+                if c.status == 'ESTABLISHED':
+                    result.append({
+                        "local": f"{c.laddr.ip}:{c.laddr.port}" if c.laddr else "N/A",
+                        "remote": f"{c.raddr.ip}:{c.raddr.port}" if c.raddr else "N/A",
+                        "status": c.status,
+                        "pid": c.pid,
+                        "process": self.names.get(c.pid)
+                    })
+            return result
+        return self._view("established", build, force)[:limit]
+
+    def listening(self, force=False):
+        """Listening sockets sorted by port."""
+        def build(conns):
+            result = []
+            for c in conns:
+                if c.status == 'LISTEN':
+                    result.append({
+                        "address": c.laddr.ip if c.laddr else "0.0.0.0",
+                        "port": c.laddr.port if c.laddr else 0,
+                        "pid": c.pid,
+                        "process": self.names.get(c.pid)
+                    })
+            return sorted(result, key=lambda x: x['port'])
+        return list(self._view("listening", build, force))
+
+    def process_usage(self, force=False):
+        """Socket counts per process name, busiest first."""
+        def build(conns):
+            usage = {}
+            for c in conns:
+                if not c.pid:
+                    continue
+                name = self.names.get(c.pid)
+                if name == "Unknown":
+                    continue
+                if name not in usage:
+                    usage[name] = {"pid": c.pid, "connections": 0, "established": 0, "listening": 0}
+                usage[name]["connections"] += 1
+                if c.status == 'ESTABLISHED':
+                    usage[name]["established"] += 1
+                elif c.status == 'LISTEN':
+                    usage[name]["listening"] += 1
+            return dict(sorted(usage.items(), key=lambda x: x[1]['connections'], reverse=True))
+        return {name: dict(info) for name, info in self._view("process_usage", build, force).items()}
+
+    def pids(self, force=False):
+        """Distinct pids that currently own an inet socket."""
+        return set(self._view("pids", lambda conns: frozenset(c.pid for c in conns if c.pid), force))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "connections": len(self._conns) if self._conns is not None else 0,
+                "age_seconds": round(time.monotonic() - self._taken_at, 3) if self._conns is not None else None,
+                "max_age": self.max_age,
+                "process_names": self.names.stats()
+            }
+
+
+# -----------------------------
+# BACKGROUND SAMPLER BASE
+# -----------------------------
+class PeriodicSampler:
+    """Calls `sample()` every `interval` seconds on a daemon thread."""
+
+    def __init__(self, interval, name):
+        self.interval = interval
+        self.name = name
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sample()
+            except Exception as e:
+                print(f"{self.name} sample failed: {e}")
+            self._stop.wait(self.interval)
+
+    def sample(self):
+        raise NotImplementedError
+
+
+# -----------------------------
+# PER-PROCESS THROUGHPUT
+# -----------------------------
+def read_proc_io(pid):
+    """
+    Cumulative (rx, tx) character counts for a pid.
+    Reads /proc/<pid>/io directly on Linux (rchar/wchar include socket reads and
+    writes) and falls back to psutil io_counters elsewhere. Returns None if unavailable.
+    """
+    try:
+        with open(f"/proc/{pid}/io", "rb") as f:
+            rx = tx = None
+            for line in f:
+                if line.startswith(b"rchar:"):
+                    rx = int(line[6:])
+                elif line.startswith(b"wchar:"):
+                    tx = int(line[6:])
+            if rx is not None and tx is not None:
+                return rx, tx
+    except (FileNotFoundError, PermissionError, ProcessLookupError):
+        pass
+    except OSError:
+        return None
+
+    try:
+        io = psutil.Process(pid).io_counters()
+        return getattr(io, "read_chars", io.read_bytes), getattr(io, "write_chars", io.write_bytes)
+    except Exception:
+        return None
+
+
+class ProcessIOAccountant(PeriodicSampler):
+    """
+    Samples per-pid I/O counters for every process that owns an inet socket and
+    keeps the per-interval deltas in a fixed-size ring buffer, so the busiest
+    talkers over any recent window can be answered without touching /proc.
+    """
+
+    def __init__(self, connections, interval=5.0, history=720, reader=None):
+        super().__init__(interval, "process-io-accountant")
+        self.connections = connections
+        self.reader = reader or read_proc_io
+        self._ring = deque(maxlen=history)
+        self._last = {}
+        self._last_at = None
+        self._lock = threading.Lock()
+
+    def sample(self):
+        now = time.time()
+        current = {}
+        for pid in self.connections.pids():
+            counters = self.reader(pid)
+            if counters is not None:
+                current[pid] = counters
+
+        pids, rx, tx = array('i'), array('Q'), array('Q')
+        for pid, (r, t) in current.items():
+            prev = self._last.get(pid)
+            if prev is None:
+                continue
+            dr, dt = r - prev[0], t - prev[1]
+            # Counters went backwards: the pid was recycled, start over from this sample
+            if dr < 0 or dt < 0:
+                continue
+            # No I/O since the last sample: nothing to rank
+            if dr == 0 and dt == 0:
+                continue
+            pids.append(pid)
+            rx.append(dr)
+            tx.append(dt)
+
+        with self._lock:
+            if self._last_at is not None:
+                self._ring.append((self._last_at, now, pids, rx, tx))
+            self._last = current
+            self._last_at = now
+
+    def top_talkers(self, window=60, limit=10):
+        """Processes moving the most bytes over the last `window` seconds."""
+        cutoff = time.time() - window
+        totals = {}
+        covered_from = covered_to = None
+
+        with self._lock:
+            samples = [s for s in self._ring if s[1] >= cutoff]
+
+        for started, ended, pids, rx, tx in samples:
+            covered_from = started if covered_from is None else min(covered_from, started)
+            covered_to = ended if covered_to is None else max(covered_to, ended)
+            for i, pid in enumerate(pids):
+                entry = totals.get(pid)
+                if entry is None:
+                    totals[pid] = [rx[i], tx[i]]
+                else:
+                    entry[0] += rx[i]
+                    entry[1] += tx[i]
+
+        seconds = (covered_to - covered_from) if samples else 0
+        ranked = sorted(totals.items(), key=lambda x: x[1][0] + x[1][1], reverse=True)[:limit]
+        result = []
+        for pid, (rx, tx) in ranked:
+            result.append({
+                "pid": pid,
+                "process": self.connections.names.get(pid),
+                "rx_bytes": rx,
+                "tx_bytes": tx,
+                "total_bytes": rx + tx,
+                "rx_Bps": round(rx / seconds, 1) if seconds else 0.0,
+                "tx_Bps": round(tx / seconds, 1) if seconds else 0.0
+            })
+        return {
+            "window_seconds": window,
+            "covered_seconds": round(seconds, 1),
+            "samples": len(samples),
+            "talkers": result
+        }
+
+
+# -----------------------------
+# PER-INTERFACE RATES
+# -----------------------------
+RATE_FIELDS = ("bytes_sent", "bytes_recv", "packets_sent", "packets_recv",
+               "errin", "errout", "dropin", "dropout")
+
+
+class RateSeries:
+    """Fixed-capacity ring of (timestamp, per-second rates) backed by flat double arrays."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._times = array('d', bytes(8 * capacity))
+        self._values = array('d', bytes(8 * capacity * len(RATE_FIELDS)))
+        self._head = 0
+        self.count = 0
+
+    def append(self, ts, rates):
+        width = len(RATE_FIELDS)
+        self._times[self._head] = ts
+        self._values[self._head * width:(self._head + 1) * width] = array('d', rates)
+        self._head = (self._head + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def latest(self):
+        if not self.count:
+            return None
+        i = (self._head - 1) % self.capacity
+        width = len(RATE_FIELDS)
+        return self._times[i], list(self._values[i * width:(i + 1) * width])
+
+    def average(self, seconds, now=None):
+        """Mean rates over samples newer than `seconds` ago."""
+        now = time.time() if now is None else now
+        width = len(RATE_FIELDS)
+        sums = [0.0] * width
+        n = 0
+        for k in range(self.count):
+            i = (self._head - 1 - k) % self.capacity
+            if now - self._times[i] > seconds:
+                break
+            for j in range(width):
+                sums[j] += self._values[i * width + j]
+            n += 1
+        return [v / n for v in sums] if n else None
+
+
+def _format_rates(values):
+    return {f"{field}_per_sec": round(v, 2) for field, v in zip(RATE_FIELDS, values)}
+
+
+class InterfaceRateCollector(PeriodicSampler):
+    """
+    Samples psutil.net_io_counters(pernic=True) in the background and keeps a
+    per-NIC series of bytes/packets/errors/drops per second, so bandwidth
+    queries read the latest rates instead of sleeping between two counter reads.
+    """
+
+    def __init__(self, interval=2.0, history=300, source=None):
+        super().__init__(interval, "interface-rate-collector")
+        self.history = history
+        self.source = source or (lambda: psutil.net_io_counters(pernic=True))
+        self._series = {}
+        self._last = None
+        self._last_at = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _diff(prev, cur, elapsed):
+        rates = []
+        for field in RATE_FIELDS:
+            delta = getattr(cur, field) - getattr(prev, field)
+            # Counter wrapped or the NIC was reset
+            rates.append(max(delta, 0) / elapsed)
+        return rates
+
+    def sample(self):
+        counters = self.source()
+        now = time.time()
+        with self._lock:
+            if self._last is not None and now > self._last_at:
+                elapsed = now - self._last_at
+                for nic, cur in counters.items():
+                    prev = self._last.get(nic)
+                    if prev is None:
+                        continue
+                    series = self._series.get(nic)
+                    if series is None:
+                        series = self._series[nic] = RateSeries(self.history)
+                    series.append(now, self._diff(prev, cur, elapsed))
+                for nic in set(self._series) - set(counters):
+                    del self._series[nic]
+            self._last = counters
+            self._last_at = now
+
+    def rates(self, window=None):
+        """
+        Per-interface rates keyed by NIC name.
+        Latest interval by default, or the mean over the last `window` seconds.
+        """
+        with self._lock:
+            if not self._series:
+                return self._instant_rates()
+            result = {}
+            for nic, series in self._series.items():
+                if window:
+                    values = series.average(window)
+                    if values is None:
+                        continue
+                    result[nic] = _format_rates(values)
+                else:
+                    ts, values = series.latest()
+                    result[nic] = _format_rates(values)
+                    result[nic]["age_seconds"] = round(time.time() - ts, 2)
+            return result
+
+    def _instant_rates(self):
+        """Before the first full interval: diff a fresh read against the startup sample."""
+        if self._last is None:
+            return {}
+        elapsed = time.time() - self._last_at
+        if elapsed < 0.05:
+            return {}
+        counters = self.source()
+        return {nic: _format_rates(self._diff(self._last[nic], cur, elapsed))
+                for nic, cur in counters.items() if nic in self._last}
+
+    def totals(self, window=None):
+        """Rates summed across every interface."""
+        per_nic = self.rates(window)
+        totals = {f"{field}_per_sec": 0.0 for field in RATE_FIELDS}
+        for rates in per_nic.values():
+            for key in totals:
+                totals[key] += rates[key]
+        return {key: round(v, 2) for key, v in totals.items()}
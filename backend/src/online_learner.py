@@ -0,0 +1,173 @@
+import os
+import copy
+import json
+import time
+import atexit
+import threading
+
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+
+from model_store import ModelStore
+
+SEVERITIES = ['Low', 'Medium', 'High', 'Critical']
+# Longest a learned update waits before it is checkpointed, i.e. before analysis workers see it
+CHECKPOINT_SECONDS = float(os.environ.get("NEXOOPS_ONLINE_CHECKPOINT_SECONDS", "1"))
+
+
+# -----------------------------
+# INCREMENTAL SEVERITY LEARNER
+# -----------------------------
+class OnlineSeverityLearner:
+    """
+    Severity classifier that learns from operator-labeled log lines one at a time.
+
+    Features come from a stateless HashingVectorizer, so there is no vocabulary
+    to refit, and the model is an SGD logistic regression updated with
+    partial_fit. An update costs well under a millisecond. State is
+    checkpointed to the model store in the background once `checkpoint_every`
+    updates are pending, or `checkpoint_seconds` after the first pending one,
+    and on exit. The checkpoint is how analysis pool workers (see refresh)
+    pick up operator feedback, so the default delay is short; a burst of
+    feedback still coalesces into one checkpoint.
+    """
+
+    def __init__(self, clean=None, store=None, n_features=2 ** 16, min_updates=20,
+                 checkpoint_every=50, checkpoint_seconds=CHECKPOINT_SECONDS):
+        self.clean = clean or (lambda text: text.lower())
+        self.store = store or ModelStore("alert_online")
+        self.min_updates = min_updates
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_seconds = checkpoint_seconds
+        self.vectorizer = HashingVectorizer(n_features=n_features, ngram_range=(1, 2),
+                                            alternate_sign=False, norm='l2')
+        self.model = SGDClassifier(loss='log_loss', alpha=1e-4, random_state=42)
+        self.updates = 0
+        self.version = 0
+        self._dirty = 0
+        self._checkpointing = False  # a checkpoint is scheduled or running
+        self._lock = threading.Lock()
+        self.feedback_path = os.path.join(self.store.root, "feedback.jsonl")
+        self._restore()
+        atexit.register(self.checkpoint)
+
+    @property
+    def ready(self):
+        return self.updates >= self.min_updates
+
+    def learn(self, text, severity):
+        """Apply one labeled example; returns the learner version after the update."""
+        return self.learn_many([(text, severity)])
+
+    def learn_many(self, examples):
+        texts = [self.clean(text) for text, _ in examples]
+        labels = [severity for _, severity in examples]
+        X = self.vectorizer.transform(texts)
+        with self._lock:
+            self.model.partial_fit(X, labels, classes=SEVERITIES)
+            self.updates += len(examples)
+            self.version += 1
+            self._dirty += len(examples)
+            version = self.version
+        self._record_feedback(examples)
+        self._maybe_checkpoint()
+        return version
+
+    def predict_proba(self, text):
+        """{severity: probability} or None until `min_updates` examples have been seen."""
+        if not self.ready:
+            return None
+        X = self.vectorizer.transform([self.clean(text)])
+        with self._lock:
+            probabilities = self.model.predict_proba(X)[0]
+            labels = self.model.classes_
+        return {labels[i]: float(probabilities[i]) for i in range(len(labels))}
+
+    def status(self):
+        return {
+            "updates": self.updates,
+            "version": self.version,
+            "ready": self.ready,
+            "pending_checkpoint": self._dirty
+        }
+
+    # -----------------------------
+    # CHECKPOINTING
+    # -----------------------------
+    def _maybe_checkpoint(self):
+        """Schedule one background checkpoint for pending updates unless one is already scheduled or running."""
+        with self._lock:
+            if not self._dirty or self._checkpointing:
+                return
+            self._checkpointing = True
+            delay = 0 if self._dirty >= self.checkpoint_every else self.checkpoint_seconds
+        timer = threading.Timer(delay, self.checkpoint)
+        timer.daemon = True
+        timer.start()
+
+    def checkpoint(self):
+        """Persist the learner to the model store if it changed since the last checkpoint."""
+        try:
+            with self._lock:
+                if not self._dirty:
+                    return None
+                state = {"model": copy.deepcopy(self.model), "updates": self.updates, "version": self.version}
+                self._dirty = 0
+            return self.store.save(state, data_fingerprint="online",
+                                   metrics={"updates": state["updates"], "learner_version": state["version"]})
+        except Exception as e:
+            print(f"Online learner checkpoint failed: {e}")
+            return None
+        finally:
+            with self._lock:
+                self._checkpointing = False
+            # Updates learned while this one was saving need a checkpoint of their own
+            self._maybe_checkpoint()
+
+    def refresh(self):
+        """
+        Re-read the latest checkpoint if another process published one since the
+        last restore. For read-only replicas (analysis workers): a process that
+        learns itself would lose updates made since its last checkpoint.
+        """
+        if self.store.mtime() != self._restored_mtime:
+            self._restore()
+            return True
+        return False
+
+    def _restore(self):
+        self._restored_mtime = self.store.mtime()
+        try:
+            # Copy-on-write: pages stay shared between workers until partial_fit writes to them
+            state, _ = self.store.load(mmap_mode='c')
+        except Exception as e:
+            print(f"Could not restore online learner: {e}")
+            return
+        if state:
+            self.model = state["model"]
+            self.updates = state["updates"]
+            self.version = state["version"]
+
+    def _record_feedback(self, examples):
+        """Keep every label so a future full retrain can include operator feedback."""
+        try:
+            os.makedirs(os.path.dirname(self.feedback_path), exist_ok=True)
+            with open(self.feedback_path, 'a') as f:
+                for text, severity in examples:
+                    f.write(json.dumps({"ts": time.time(), "log_text": text, "severity": severity}) + "\n")
+        except OSError:
+            pass
+
+
+def blend_probabilities(base, online, weight):
+    """Weighted mix of two {label: probability} dicts over the union of labels."""
+    labels = set(base) | set(online)
+    return {label: (1 - weight) * base.get(label, 0.0) + weight * online.get(label, 0.0) for label in labels}
+
+
+def normalize_severity(value):
+    """Canonical severity name for user input such as 'critical' or 'HIGH', else None."""
+    if not isinstance(value, str):
+        return None
+    value = value.strip().title()
+    return value if value in SEVERITIES else None
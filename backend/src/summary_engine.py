@@ -0,0 +1,576 @@
+import os
+import math
+import random
+import time
+import hashlib
+import threading
+from collections import Counter
+from importlib.util import find_spec
+
+from log_features import clean_text
+from log_records import record_texts
+from template_cache import TemplateCache
+
+try:
+    ML_AVAILABLE = find_spec("sklearn") is not None and find_spec("numpy") is not None
+except (ImportError, ValueError):
+    ML_AVAILABLE = False
+
+# Bump when a stage changes its output, so cached summaries are dropped
+ENGINE_REVISION = 2
+
+STAGES = ("split", "patterns", "vectorize", "cluster", "rank", "format")
+BACKENDS = ("auto", "kmeans", "minibatch", "template", "basic")
+
+NETWORK_KEYWORDS = [
+    'error', 'fail', 'timeout', 'warning', 'critical', 'alert',
+    'connection', 'port', 'ping', 'dns', 'ssl', 'certificate',
+    'bandwidth', 'latency', 'packet', 'drop', 'retry', 'refused',
+    'unreachable', 'closed', 'open', 'scan', 'subnet', 'arp',
+    'gateway', 'route', 'interface', 'adapter', 'throughput'
+]
+
+# -----------------------------
+# PROFILES
+# -----------------------------
+# A profile holds everything the two original summarizers disagreed on:
+# keywords, score weights, TF-IDF settings, cluster limits and output format.
+# Keyword tiers are checked in order and the first matching tier's boost applies.
+PROFILES = {
+    # summarizer.summarize_log: /summarize, /analyze and the alert classifier
+    "api": {
+        "n_sentences": 5,
+        "num_clusters": 10,
+        "max_clusters": None,
+        "pattern_keywords": ['error', 'fail', 'connection lost', 'timeout', 'warning'],
+        "vectorizer": {"stop_words": "english"},
+        "n_init": "auto",
+        "select_tiers": [],
+        "select_count_weight": 1.0,
+        "rank_tiers": [],
+        "rank_count_weight": 1.0,
+        "basic_keywords": ['error', 'fail', 'connection lost', 'timeout', 'warning'],
+        "short_input": "passthrough",
+        "format": "plain"
+    },
+    # chatbot.LogSummarizer: chat log analysis over LogStorage
+    "network": {
+        "n_sentences": 8,
+        "num_clusters": 5,
+        "max_clusters": 10,
+        "pattern_keywords": [
+            'error', 'fail', 'timeout', 'warning', 'critical', 'alert',
+            'connection lost', 'connection refused', 'unreachable',
+            'port closed', 'ssl error', 'certificate', 'dns failed',
+            'packet loss', 'bandwidth', 'latency', 'drop', 'retry',
+            'scan complete', 'subnet scan', 'arp', 'gateway', 'route'
+        ],
+        "vectorizer": {"stop_words": "english", "max_features": 1000, "ngram_range": (1, 2)},
+        "n_init": 10,
+        "select_tiers": [(NETWORK_KEYWORDS, 2.0)],
+        "select_count_weight": 0.5,
+        "rank_tiers": [
+            (['error', 'fail', 'critical', 'alert'], 3.0),
+            (['warning', 'timeout', 'drop'], 2.0),
+            (['scan', 'ping', 'dns', 'ssl'], 1.0)
+        ],
+        "rank_count_weight": 1.0,
+        "basic_keywords": NETWORK_KEYWORDS,
+        "short_input": "basic",
+        "format": "network"
+    }
+}
+
+# Inputs at least this long use MiniBatchKMeans when the backend is "auto"
+MINIBATCH_THRESHOLD = int(os.environ.get("NEXOOPS_MINIBATCH_THRESHOLD", "20000"))
+DEFAULT_BACKEND = os.environ.get("NEXOOPS_SUMMARY_BACKEND", "auto")
+
+# Deadline tiers, cheapest last. "sampled" clusters a reservoir sample of at
+# least MIN_SAMPLE_LINES lines; below that only the keyword fallback fits.
+TIERS = ("full", "single_init", "sampled", "keyword")
+MIN_SAMPLE_LINES = 200
+
+SUMMARY_CACHE = TemplateCache(max_size=int(os.environ.get("NEXOOPS_SUMMARY_CACHE_SIZE", "256")))
+
+
+# -----------------------------
+# STAGE TIMINGS
+# -----------------------------
+class StageTimings:
+    """Per (profile, stage) call counts and latency, shared by every engine."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    def record(self, profile, stage, seconds):
+        with self._lock:
+            entry = self._stages.setdefault((profile, stage), {"calls": 0, "total_ms": 0.0, "max_ms": 0.0})
+            ms = seconds * 1000
+            entry["calls"] += 1
+            entry["total_ms"] += ms
+            entry["max_ms"] = max(entry["max_ms"], ms)
+            entry["last_ms"] = ms
+
+    def stats(self):
+        with self._lock:
+            result = {}
+            for (profile, stage), e in self._stages.items():
+                result.setdefault(profile, {})[stage] = {
+                    "calls": e["calls"],
+                    "mean_ms": round(e["total_ms"] / e["calls"], 3),
+                    "max_ms": round(e["max_ms"], 3),
+                    "last_ms": round(e["last_ms"], 3)
+                }
+            return result
+
+TIMINGS = StageTimings()
+
+
+# -----------------------------
+# COST MODEL
+# -----------------------------
+class CostModel:
+    """
+    Observed cost per unit of work, per (profile, backend): vectorize is
+    measured in ms per line, cluster in ms per line x cluster x init. Rates
+    are an EWMA over runs large enough to be dominated by the per-line cost;
+    the priors are deliberately pessimistic.
+    """
+
+    PRIORS = {"vectorize": 0.05, "cluster": 0.005}
+    MIN_LINES = 200
+
+    def __init__(self, alpha=0.3):
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._rates = {}
+
+    def rate(self, profile, backend, stage):
+        with self._lock:
+            return self._rates.get((profile, backend, stage), self.PRIORS[stage])
+
+    def observe(self, profile, backend, stage, ms, lines, units):
+        if lines < self.MIN_LINES or units <= 0:
+            return
+        with self._lock:
+            key = (profile, backend, stage)
+            observed = ms / units
+            previous = self._rates.get(key)
+            self._rates[key] = observed if previous is None else previous + self.alpha * (observed - previous)
+
+    def estimate_ms(self, profile, backend, lines, clusters, inits, vectorize=True):
+        return (self.rate(profile, backend, "vectorize") * lines * vectorize
+                + self.rate(profile, backend, "cluster") * lines * clusters * inits)
+
+    def stats(self):
+        with self._lock:
+            return {f"{p}/{b}/{stage}": round(r, 6) for (p, b, stage), r in self._rates.items()}
+
+COSTS = CostModel()
+
+
+class SummaryState:
+    """What the stages read and write while summarizing one text."""
+
+    def __init__(self, text, n_sentences, num_clusters, backend, vectors=None):
+        self.text = text
+        self.vectors = vectors
+        self.n_sentences = n_sentences
+        self.num_clusters = num_clusters
+        self.backend = backend
+        self.sentences = []
+        self.total_lines = 0
+        self.n_init = None
+        self.line_counts = Counter()
+        self.scores = None
+        self.matrix = None
+        self.clusters = None
+        self.selected = []
+        self.summary = ""
+
+
+def _tier_boost(line, tiers):
+    for keywords, boost in tiers:
+        if any(kw in line for kw in keywords):
+            return boost
+    return 0.0
+
+
+# -----------------------------
+# DEFAULT STAGES
+# -----------------------------
+def split_lines(engine, st):
+    """One sentence per log record: a header and its body lines are joined (log_records)."""
+    st.sentences = record_texts(st.text)
+    st.total_lines = len(st.sentences)
+
+def detect_patterns(engine, st):
+    """Counts of lines that contain any of the profile's pattern keywords."""
+    keywords = [k.lower() for k in engine.profile["pattern_keywords"]]
+    st.line_counts = Counter(line for line in st.sentences if any(k in line.lower() for k in keywords))
+
+def vectorize(engine, st):
+    if st.backend in ("kmeans", "minibatch"):
+        import numpy as np
+        if st.vectors is not None:
+            # Rows precomputed by the caller (e.g. LogStorage's live TF-IDF)
+            st.matrix = st.vectors
+        else:
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            vectorizer = TfidfVectorizer(**engine.profile["vectorizer"])
+            st.matrix = vectorizer.fit_transform(st.sentences)
+        st.scores = np.asarray(st.matrix.sum(axis=1)).ravel()
+    elif st.backend == "template":
+        # No vectors: lines of a frequent template score higher
+        templates = [clean_text(line) for line in st.sentences]
+        counts = Counter(templates)
+        st.matrix = templates
+        st.scores = [math.log1p(counts[t]) for t in templates]
+
+def cluster(engine, st):
+    n = len(st.sentences)
+    if st.backend == "template":
+        groups = {}
+        for idx, template in enumerate(st.matrix):
+            groups.setdefault(template, []).append(idx)
+        st.clusters = dict(enumerate(groups.values()))
+        return
+    if st.backend not in ("kmeans", "minibatch"):
+        return
+
+    k = engine.cluster_count(n, st.num_clusters)
+    if k < 2:
+        st.clusters = {0: list(range(n))}
+        return
+    if st.backend == "minibatch":
+        from sklearn.cluster import MiniBatchKMeans
+        model = MiniBatchKMeans(n_clusters=k, random_state=42, n_init="auto", batch_size=1024)
+    else:
+        from sklearn.cluster import KMeans
+        model = KMeans(n_clusters=k, random_state=42, n_init=st.n_init or engine.profile["n_init"])
+    model.fit(st.matrix)
+    st.clusters = {i: [] for i in range(k)}
+    for idx, label in enumerate(model.labels_):
+        st.clusters[label].append(idx)
+
+def rank(engine, st):
+    """Best line per cluster, then the top n of those, kept in original order."""
+    if st.clusters is None:
+        st.selected = _basic_selection(engine, st)
+        return
+    p = engine.profile
+
+    def score(idx, tiers, count_weight):
+        line = st.sentences[idx]
+        value = st.scores[idx] if st.scores is not None else 0
+        value += _tier_boost(line.lower(), tiers)
+        if line in st.line_counts:
+            value += st.line_counts[line] * count_weight
+        return value
+
+    representatives = [max((score(i, p["select_tiers"], p["select_count_weight"]), i) for i in indices)[1]
+                       for indices in st.clusters.values() if indices]
+    ranked = sorted(((score(i, p["rank_tiers"], p["rank_count_weight"]), i) for i in representatives),
+                    reverse=True)
+    st.selected = sorted(i for _, i in ranked[:st.n_sentences])
+
+def _basic_selection(engine, st):
+    """No-ML selection: keyword lines first, then the rest, in original order."""
+    keywords = engine.profile["basic_keywords"]
+    flagged = [i for i, line in enumerate(st.sentences) if any(k in line.lower() for k in keywords)]
+    flagged_set = set(flagged)
+    others = [i for i in range(len(st.sentences)) if i not in flagged_set]
+    return (flagged + others)[:st.n_sentences]
+
+def format_summary(engine, st):
+    lines = [st.sentences[i] for i in st.selected]
+    if engine.profile["format"] == "network":
+        st.summary = _format_network(lines, st.total_lines)
+    else:
+        st.summary = ' '.join(lines)
+
+def _format_network(summary_sentences, total_lines):
+    header = f"🔍 NETWORK LOGS SUMMARY ({len(summary_sentences)} key entries from {total_lines} total)\n"
+    header += "━" * 50 + "\n\n"
+
+    formatted_summary = header
+    for sentence in summary_sentences:
+        line_lower = sentence.lower()
+        if any(word in line_lower for word in ['error', 'fail', 'critical']):
+            icon = "🔴"
+        elif any(word in line_lower for word in ['warning', 'timeout']):
+            icon = "🟡"
+        elif any(word in line_lower for word in ['success', 'complete', 'open']):
+            icon = "🟢"
+        elif any(word in line_lower for word in ['scan', 'ping', 'dns']):
+            icon = "🔍"
+        else:
+            icon = "📝"
+        formatted_summary += f"{icon} {sentence}\n"
+
+    if not ML_AVAILABLE:
+        formatted_summary += f"\n💡 Note: Basic summary mode (install scikit-learn for AI-powered summarization)"
+    return formatted_summary
+
+DEFAULT_STAGES = {
+    "split": split_lines,
+    "patterns": detect_patterns,
+    "vectorize": vectorize,
+    "cluster": cluster,
+    "rank": rank,
+    "format": format_summary
+}
+
+
+# -----------------------------
+# ENGINE
+# -----------------------------
+class SummaryEngine:
+    """
+    Extractive log summarizer built from pluggable stages.
+
+    Each stage is a function (engine, state) -> None; pass `stages` to replace
+    any of them. The backend decides how lines are grouped: exact KMeans,
+    MiniBatchKMeans for large inputs, template grouping (no ML), or basic
+    keyword selection. An ML backend that fails falls back to basic. Results
+    are cached in SUMMARY_CACHE and stage latencies recorded in TIMINGS, both
+    shared by every engine.
+
+    With a `deadline_ms`, clustering backends degrade through TIERS using the
+    shared COSTS model: full clustering, a single KMeans init, a reservoir
+    sample of the lines, and finally keyword selection. The tier is re-checked
+    against the real clock after vectorizing.
+    """
+
+    def __init__(self, profile="api", backend=None, stages=None, cache=SUMMARY_CACHE, timings=TIMINGS):
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown summary profile '{profile}'")
+        backend = backend or DEFAULT_BACKEND
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown summary backend '{backend}', expected one of {BACKENDS}")
+        unknown = set(stages or {}) - set(STAGES)
+        if unknown:
+            raise ValueError(f"Unknown summary stages {sorted(unknown)}, expected some of {STAGES}")
+        self.name = profile
+        self.profile = PROFILES[profile]
+        self.backend = backend
+        self.stages = dict(DEFAULT_STAGES, **(stages or {}))
+        self.cache = cache
+        self.timings = timings
+
+    def _resolve_backend(self, n_lines, requested):
+        if requested in ("kmeans", "minibatch") and not ML_AVAILABLE:
+            return "basic"
+        if requested != "auto":
+            return requested
+        if not ML_AVAILABLE:
+            return "basic"
+        return "minibatch" if n_lines >= MINIBATCH_THRESHOLD else "kmeans"
+
+    def cluster_count(self, n_lines, num_clusters):
+        k = min(num_clusters, n_lines)
+        if self.profile["max_clusters"]:
+            k = min(k, self.profile["max_clusters"])
+        return k
+
+    def _inits(self, st):
+        """KMeans inits the run will do ("auto" with k-means++ is a single init)."""
+        if st.backend == "minibatch":
+            return 1
+        n_init = st.n_init or self.profile["n_init"]
+        return n_init if isinstance(n_init, int) else 1
+
+    def _estimate(self, st, lines):
+        return COSTS.estimate_ms(self.name, st.backend, lines,
+                                 self.cluster_count(lines, st.num_clusters), self._inits(st),
+                                 vectorize=st.vectors is None)
+
+    def _plan(self, st, remaining_ms):
+        """Pick the first tier whose estimated cost fits; may reduce inits or sample lines."""
+        n = len(st.sentences)
+        if self._estimate(st, n) <= remaining_ms:
+            return "full"
+        if self._inits(st) > 1:
+            st.n_init = 1
+            if self._estimate(st, n) <= remaining_ms:
+                return "single_init"
+        st.n_init = 1
+        per_line = self._estimate(st, 1000) / 1000
+        sample = min(n - 1, int(remaining_ms / per_line)) if per_line > 0 else n - 1
+        if sample >= MIN_SAMPLE_LINES:
+            self._reservoir(st, sample)
+            return "sampled"
+        return "keyword"
+
+    @staticmethod
+    def _reservoir(st, size):
+        """Keep a uniform sample of `size` lines (algorithm R), in original order."""
+        rng = random.Random(42)
+        kept = list(range(size))
+        for i in range(size, len(st.sentences)):
+            j = rng.randint(0, i)
+            if j < size:
+                kept[j] = i
+        kept.sort()
+        st.sentences = [st.sentences[i] for i in kept]
+        if st.vectors is not None:
+            st.vectors = st.vectors[kept]
+
+    def _stage(self, name, st, timings):
+        start = time.perf_counter()
+        self.stages[name](self, st)
+        elapsed = time.perf_counter() - start
+        timings[name] = round(elapsed * 1000, 3)
+        self.timings.record(self.name, name, elapsed)
+
+    def _cache_key(self, text, n_sentences, num_clusters, backend):
+        digest = hashlib.sha1(text.encode("utf-8", "replace")).hexdigest()
+        return (self.name, backend, n_sentences, num_clusters, digest)
+
+    def run(self, text, n_sentences=None, num_clusters=None, backend=None, use_cache=True, deadline_ms=None,
+            vectors=None):
+        """
+        Summarize `text`. Returns {"summary", "backend", "tier", "lines",
+        "timings_ms", "cached"}; "fallback" is set when an ML backend failed,
+        and with a deadline "deadline_ms", "elapsed_ms" and "deadline_met".
+        Only full-tier results are cached, so a cached answer is never degraded.
+
+        `vectors` is an optional precomputed row matrix, one row per non-empty
+        line of `text`; clustering backends use it instead of fitting a
+        vectorizer (it is ignored if the row count does not match).
+        """
+        start = time.perf_counter()
+        elapsed_ms = lambda: (time.perf_counter() - start) * 1000
+        n_sentences = n_sentences or self.profile["n_sentences"]
+        num_clusters = num_clusters or self.profile["num_clusters"]
+        requested = backend or self.backend
+        if requested not in BACKENDS:
+            raise ValueError(f"Unknown summary backend '{requested}', expected one of {BACKENDS}")
+        key = self._cache_key(text, n_sentences, num_clusters, requested)
+        if use_cache and self.cache is not None:
+            cached = self.cache.get(key, ENGINE_REVISION)
+            if cached is not None:
+                return self._finish(dict(cached, cached=True), deadline_ms, elapsed_ms())
+
+        st = SummaryState(text, n_sentences, num_clusters, None, vectors)
+        timings = {}
+        self._stage("split", st, timings)
+        if vectors is not None and vectors.shape[0] != len(st.sentences):
+            st.vectors = None
+        st.backend = self._resolve_backend(len(st.sentences), requested)
+        tier = "full"
+        result = {}
+
+        if len(st.sentences) <= n_sentences and self.profile["short_input"] == "passthrough":
+            st.summary, st.backend = text, "passthrough"
+        else:
+            if len(st.sentences) <= n_sentences:
+                st.backend = "basic"
+            self._stage("patterns", st, timings)
+            clustering = st.backend in ("kmeans", "minibatch")
+            if deadline_ms is not None and clustering:
+                tier = self._plan(st, deadline_ms - elapsed_ms())
+                if tier == "keyword":
+                    st.backend = "basic"
+            try:
+                self._stage("vectorize", st, timings)
+                if deadline_ms is not None and st.backend != "basic":
+                    tier = self._recheck(st, tier, deadline_ms - elapsed_ms())
+                if st.backend != "basic":
+                    self._stage("cluster", st, timings)
+            except Exception as e:
+                print(f"{st.backend} summarization failed, using basic fallback: {e}")
+                result["fallback"] = str(e)
+                st.backend, st.scores, st.matrix, st.clusters = "basic", None, None, None
+            if clustering:
+                self._observe(st, timings)
+            if st.backend == "basic" and st.total_lines != len(st.sentences):
+                split_lines(self, st)  # keyword selection always sees every line
+            self._stage("rank", st, timings)
+            self._stage("format", st, timings)
+
+        result.update(summary=st.summary, backend=st.backend, tier=tier, lines=st.total_lines,
+                      timings_ms=timings)
+        if tier == "full" and use_cache and self.cache is not None:
+            self.cache.put(key, result, ENGINE_REVISION)
+        return self._finish(dict(result, cached=False), deadline_ms, elapsed_ms())
+
+    def _recheck(self, st, tier, remaining_ms):
+        """After vectorizing, drop to a single init or to keywords if clustering no longer fits."""
+        n = len(st.sentences)
+        clusters = self.cluster_count(n, st.num_clusters)
+        cluster_ms = lambda: COSTS.rate(self.name, st.backend, "cluster") * n * clusters * self._inits(st)
+        if cluster_ms() <= remaining_ms:
+            return tier
+        if self._inits(st) > 1:
+            st.n_init = 1
+            if cluster_ms() <= remaining_ms:
+                return "single_init"
+        st.backend, st.scores, st.matrix, st.clusters = "basic", None, None, None
+        return "keyword"
+
+    def _observe(self, st, timings):
+        """Feed this run's vectorize/cluster timings into the cost model."""
+        if st.backend not in ("kmeans", "minibatch"):
+            return
+        n = len(st.sentences)
+        if "vectorize" in timings and st.vectors is None:
+            COSTS.observe(self.name, st.backend, "vectorize", timings["vectorize"], n, n)
+        if "cluster" in timings and st.clusters is not None and len(st.clusters) > 1:
+            units = n * len(st.clusters) * self._inits(st)
+            COSTS.observe(self.name, st.backend, "cluster", timings["cluster"], n, units)
+
+    @staticmethod
+    def _finish(result, deadline_ms, elapsed_ms):
+        if deadline_ms is not None:
+            result.update(deadline_ms=deadline_ms, elapsed_ms=round(elapsed_ms, 3),
+                          deadline_met=elapsed_ms <= deadline_ms)
+        return result
+
+    def summarize(self, text, n_sentences=None, num_clusters=None, backend=None, deadline_ms=None, vectors=None):
+        return self.run(text, n_sentences, num_clusters, backend, deadline_ms=deadline_ms, vectors=vectors)["summary"]
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+def get_engine(profile="api"):
+    """Shared engine for a profile (default backend, default stages)."""
+    with _engines_lock:
+        if profile not in _engines:
+            _engines[profile] = SummaryEngine(profile)
+        return _engines[profile]
+
+def stats():
+    return {"cache": SUMMARY_CACHE.stats(), "stages": TIMINGS.stats(), "cost_model": COSTS.stats(),
+            "ml_available": ML_AVAILABLE}
+
+def merge_stats(stats):
+    """
+    Combine stats() of several processes (the API process and each analysis
+    worker keep their own cache, timings and cost model). Stage call counts
+    are summed with call-weighted means and `last_ms` is taken from the
+    first process in `stats` that ran the stage. Cost-model rates are
+    averaged.
+    """
+    from template_cache import merge_stats as merge_cache
+    stages = {}
+    for s in stats:
+        for profile, by_stage in s["stages"].items():
+            for stage, e in by_stage.items():
+                m = stages.setdefault(profile, {}).setdefault(stage, {"calls": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                                                      "last_ms": e["last_ms"]})
+                m["calls"] += e["calls"]
+                m["total_ms"] += e["mean_ms"] * e["calls"]
+                m["max_ms"] = max(m["max_ms"], e["max_ms"])
+    for by_stage in stages.values():
+        for m in by_stage.values():
+            m["mean_ms"] = round(m.pop("total_ms") / m["calls"], 3) if m["calls"] else 0.0
+    rates = {}
+    for s in stats:
+        for key, rate in s["cost_model"].items():
+            rates.setdefault(key, []).append(rate)
+    return {"cache": merge_cache([s["cache"] for s in stats]), "stages": stages,
+            "cost_model": {key: round(sum(r) / len(r), 6) for key, r in rates.items()},
+            "ml_available": all(s["ml_available"] for s in stats)}
@@ -0,0 +1,92 @@
+import threading
+from collections import OrderedDict
+
+
+# -----------------------------
+# VERSIONED LRU CACHE
+# -----------------------------
+class TemplateCache:
+    """
+    Bounded LRU cache keyed by normalized log template.
+
+    Every lookup carries the version of whatever produced the cached values
+    (e.g. the model artifact); a lookup with a different version clears the
+    cache, so verdicts from an old model are never served.
+    """
+
+    def __init__(self, max_size=50000):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_version(self, version):
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key, version):
+        with self._lock:
+            self._check_version(version)
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def count_hits(self, n):
+        """Record lookups answered without touching the cache (e.g. in-batch repeats)."""
+        with self._lock:
+            self.hits += n
+
+    def put(self, key, value, version):
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._version = None
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "version": self._version
+            }
+
+
+def merge_stats(stats):
+    """
+    Combine TemplateCache.stats() of several processes' caches (each API
+    and analysis worker process has its own): counts and sizes are summed,
+    the hit rate is recomputed and `version` is a list if they disagree.
+    """
+    merged = {key: sum(s[key] for s in stats) for key in ("size", "max_size", "hits", "misses",
+                                                          "evictions", "invalidations")}
+    total = merged["hits"] + merged["misses"]
+    merged["hit_rate"] = round(merged["hits"] / total, 4) if total else 0.0
+    versions = list(dict.fromkeys(s["version"] for s in stats if s["version"] is not None))
+    merged["version"] = versions[0] if len(versions) == 1 else (versions or None)
+    merged["processes"] = len(stats)
+    return merged
@@ -0,0 +1,344 @@
+import os
+import re
+import json
+import time
+import uuid
+import threading
+from collections import Counter
+
+import numpy as np
+
+from log_records import FORMATS
+from log_stream import CHUNK_SIZE, MAX_DECOMPRESSED
+
+SPOOL_DIR = os.environ.get(
+    "NEXOOPS_SPOOL_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "uploads")
+)
+# Largest body accepted per chunk request; the whole upload is capped like /upload
+MAX_CHUNK = int(os.environ.get("NEXOOPS_UPLOAD_CHUNK_BYTES", str(16 * 1024 * 1024)))
+MAX_UPLOAD = MAX_DECOMPRESSED
+# Uploads untouched for this long are deleted on the next create
+UPLOAD_TTL = float(os.environ.get("NEXOOPS_UPLOAD_TTL_HOURS", "24")) * 3600
+# Records handed to the summarizer for a whole upload (evenly spaced)
+SAMPLE_RECORDS = 4000
+# Whole-upload classification and search run in the analysis pool with this timeout
+# instead of NEXOOPS_ANALYSIS_TIMEOUT: they scan the full spool, gigabytes for large uploads
+UPLOAD_TASK_TIMEOUT = float(os.environ.get("NEXOOPS_UPLOAD_TASK_TIMEOUT", "600"))
+
+_UPLOAD_ID = re.compile(r'^[0-9a-f]{32}$')
+# Same boundaries as log_records.record_texts: a timestamp starts a record
+_RECORD_START = re.compile(rb'\s*\d{4}-\d\d-\d\d[ T]\d\d:\d\d:\d\d')
+_LEVEL_LINE = FORMATS["single_line"]
+_INDEX_DTYPE = np.dtype("<u8")
+
+
+class UnknownUpload(KeyError):
+    """No upload with this id (or it expired)."""
+
+
+class OffsetMismatch(ValueError):
+    """A chunk was sent for an offset other than the upload's current size."""
+
+    def __init__(self, expected, got):
+        super().__init__(f"Chunk offset {got} does not match the upload's size {expected}")
+        self.expected = expected
+
+
+class UploadClosed(ValueError):
+    """The upload is complete and takes no more chunks."""
+
+
+class ChunkTooLarge(ValueError):
+    """A chunk (or the upload as a whole) is over its size limit."""
+
+
+def _write_json(path, obj):
+    tmp = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+    with open(tmp, "w") as f:
+        json.dump(obj, f)
+    os.replace(tmp, path)
+
+
+# -----------------------------
+# ONE UPLOAD
+# -----------------------------
+class SpoolUpload:
+    """
+    One chunked upload: the raw text is appended to `<id>.log` on disk and
+    indexed as it arrives. The index, `<id>.idx`, holds the byte offset of
+    every record start (uint64), so records can be read back by number
+    without scanning; `<id>.json` holds the size, record and level counts and
+    the indexer's position.
+
+    Metadata is written after the data and index, so after a crash the files
+    are cut back to what it records and the client resumes from `size`.
+    """
+
+    def __init__(self, root, upload_id, meta):
+        self.id = upload_id
+        self.meta = meta
+        self.data_path = os.path.join(root, f"{upload_id}.log")
+        self.index_path = os.path.join(root, f"{upload_id}.idx")
+        self.meta_path = os.path.join(root, f"{upload_id}.json")
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, root, name):
+        upload_id = uuid.uuid4().hex
+        now = time.time()
+        meta = {"id": upload_id, "name": name, "created": now, "updated": now, "complete": False,
+                "size": 0, "indexed": 0, "record_open": False, "records": 0, "levels": {}}
+        upload = cls(root, upload_id, meta)
+        open(upload.data_path, "wb").close()
+        open(upload.index_path, "wb").close()
+        _write_json(upload.meta_path, meta)
+        return upload
+
+    def append(self, offset, stream):
+        """
+        Append the bytes of `stream` at `offset`, which must be the current size
+        (so a retried chunk is rejected, not duplicated). Returns the new size.
+        """
+        with self._lock:
+            if self.meta["complete"]:
+                raise UploadClosed(f"Upload {self.id} is complete")
+            size = self.meta["size"]
+            if offset != size:
+                raise OffsetMismatch(size, offset)
+            limit = min(MAX_CHUNK, MAX_UPLOAD - size)
+            with open(self.data_path, "r+b") as f:
+                f.truncate(size)  # drop the tail of a chunk that never finished
+                f.seek(size)
+                written = 0
+                try:
+                    while True:
+                        chunk = stream.read(CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        written += len(chunk)
+                        if written > limit:
+                            raise ChunkTooLarge(f"Chunks are limited to {MAX_CHUNK} bytes and uploads to {MAX_UPLOAD}")
+                        f.write(chunk)
+                except BaseException:
+                    f.truncate(size)
+                    raise
+            self._index(final=False)
+            self.meta["size"] = size + written
+            self.meta["updated"] = time.time()
+            _write_json(self.meta_path, self.meta)
+            return self.meta["size"]
+
+    def complete(self):
+        """Index the last (unterminated) line and close the upload to further chunks."""
+        with self._lock:
+            if not self.meta["complete"]:
+                self._index(final=True)
+                self.meta["complete"] = True
+                self.meta["updated"] = time.time()
+                _write_json(self.meta_path, self.meta)
+            return self.status()
+
+    def _index(self, final):
+        """Record starts in the bytes after meta["indexed"], up to the last newline (or the end if final)."""
+        record_open = self.meta["record_open"]
+        levels = Counter(self.meta["levels"])
+        starts = []
+
+        def scan(line, position):
+            nonlocal record_open
+            if not line.strip():
+                return
+            if _RECORD_START.match(line):
+                starts.append(position)
+                record_open = True
+                match = _LEVEL_LINE.match(line.strip().decode("utf-8", "replace"))
+                if match:
+                    levels[match.group("level").upper()] += 1
+            elif not record_open:
+                starts.append(position)
+
+        base = self.meta["indexed"]  # file offset of carry[0]
+        carry = b""
+        with open(self.data_path, "rb") as f:
+            f.seek(base)
+            while True:
+                block = f.read(CHUNK_SIZE * 16)
+                if not block:
+                    break
+                carry += block
+                cut = carry.rfind(b"\n") + 1
+                if cut:
+                    lines = carry[:cut - 1].split(b"\n")
+                elif len(carry) > MAX_CHUNK:
+                    cut, lines = len(carry), [carry]  # a runaway line is indexed in pieces
+                else:
+                    continue
+                position = base
+                for line in lines:
+                    scan(line, position)
+                    position += len(line) + 1
+                base, carry = base + cut, carry[cut:]
+        if final and carry:
+            scan(carry, base)
+            base += len(carry)
+        with open(self.index_path, "r+b") as f:
+            f.truncate(self.meta["records"] * _INDEX_DTYPE.itemsize)
+            f.seek(0, os.SEEK_END)
+            f.write(np.asarray(starts, dtype=_INDEX_DTYPE).tobytes())
+        self.meta.update(indexed=base, record_open=record_open, records=self.meta["records"] + len(starts),
+                         levels=dict(levels))
+
+    # ---- reading ----
+    def _offsets(self):
+        if not self.meta["records"]:
+            return np.empty(0, dtype=_INDEX_DTYPE)
+        return np.memmap(self.index_path, dtype=_INDEX_DTYPE, mode="r", shape=(self.meta["records"],))
+
+    def records(self, positions=None):
+        """(number, text) of the given record numbers, read through the index; all of them, in order, when None."""
+        offsets = self._offsets()
+        end = self.meta["indexed"]
+        if positions is None:
+            yield from self._scan(offsets, end)
+            return
+        with open(self.data_path, "rb") as f:
+            for i in positions:
+                stop = int(offsets[i + 1]) if i + 1 < len(offsets) else end
+                f.seek(int(offsets[i]))
+                yield i, f.read(stop - int(offsets[i])).decode("utf-8", "replace").strip()
+
+    def _scan(self, offsets, end, block_size=CHUNK_SIZE * 16):
+        """Every record, read in blocks that end on a record boundary."""
+        n = len(offsets)
+        bounds = np.append(offsets, np.uint64(end)).astype(np.int64)
+        i = 0
+        with open(self.data_path, "rb") as f:
+            while i < n:
+                j = min(n, max(i + 1, int(np.searchsorted(bounds, bounds[i] + block_size, side="right")) - 1))
+                f.seek(bounds[i])
+                block = f.read(bounds[j] - bounds[i])
+                cuts = (bounds[i:j + 1] - bounds[i]).tolist()
+                for k in range(j - i):
+                    yield i + k, block[cuts[k]:cuts[k + 1]].decode("utf-8", "replace").strip()
+                i = j
+
+    def sample_text(self, max_records=SAMPLE_RECORDS):
+        """Up to max_records evenly spaced records as one text, for summarizing the whole upload."""
+        n = self.meta["records"]
+        positions = range(n) if n <= max_records else np.linspace(0, n - 1, max_records).astype(int)
+        return "\n".join(text for _, text in self.records(positions))
+
+    def lines(self):
+        """The indexed text line by line, for the bulk classifier."""
+        remaining = self.meta["indexed"]
+        with open(self.data_path, "rb") as f:
+            for line in f:
+                if remaining <= 0:
+                    break
+                line = line[:remaining]
+                remaining -= len(line)
+                yield line.decode("utf-8", "replace")
+
+    def search(self, terms, limit=50, offset=0):
+        """Records containing every term (case-insensitive), by a scan of the spool; paginated."""
+        terms = [t.lower() for t in terms if t]
+        hits, total = [], 0
+        for i, text in self.records():
+            lowered = text.lower()
+            if all(t in lowered for t in terms):
+                if offset <= total < offset + limit:
+                    hits.append({"record": i, "text": text})
+                total += 1
+        return {"total": total, "offset": offset, "limit": limit, "results": hits}
+
+    def status(self):
+        return {"upload_id": self.id, "name": self.meta["name"], "offset": self.meta["size"],
+                "complete": self.meta["complete"], "records": self.meta["records"],
+                "levels": self.meta["levels"], "created": self.meta["created"], "updated": self.meta["updated"]}
+
+    def delete(self):
+        for path in (self.meta_path, self.index_path, self.data_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+# -----------------------------
+# REGISTRY
+# -----------------------------
+class UploadSpool:
+    """Uploads by id. Metadata lives on disk, so uploads survive a restart and can be resumed."""
+
+    def __init__(self, root=SPOOL_DIR, ttl=UPLOAD_TTL):
+        self.root = root
+        self.ttl = ttl
+        self._uploads = {}
+        self._lock = threading.Lock()
+
+    def create(self, name="upload"):
+        os.makedirs(self.root, exist_ok=True)
+        self.expire()
+        upload = SpoolUpload.create(self.root, name)
+        with self._lock:
+            self._uploads[upload.id] = upload
+        return upload
+
+    def get(self, upload_id):
+        with self._lock:
+            upload = self._uploads.get(upload_id)
+            if upload is None:
+                upload = self._uploads[upload_id] = load_upload(upload_id, self.root)
+            return upload
+
+    def delete(self, upload_id):
+        upload = self.get(upload_id)
+        with self._lock:
+            self._uploads.pop(upload_id, None)
+        upload.delete()
+
+    def expire(self):
+        """Delete uploads not updated within the TTL."""
+        cutoff = time.time() - self.ttl
+        for name in os.listdir(self.root):
+            if name.endswith(".json"):
+                path = os.path.join(self.root, name)
+                try:
+                    with open(path) as f:
+                        if json.load(f)["updated"] >= cutoff:
+                            continue
+                except (OSError, ValueError, KeyError):
+                    if os.path.getmtime(path) >= cutoff:
+                        continue
+                try:
+                    self.delete(name[:-5])
+                except UnknownUpload:
+                    pass
+
+
+def load_upload(upload_id, root=SPOOL_DIR):
+    """
+    An upload as its metadata on disk has it, uncached. Analysis pool
+    workers read uploads this way: they only see the API process's appends
+    through the files, and the metadata is written after each chunk.
+    """
+    if not _UPLOAD_ID.match(upload_id or ""):
+        raise UnknownUpload(upload_id)
+    try:
+        with open(os.path.join(root, f"{upload_id}.json")) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        raise UnknownUpload(upload_id)
+    return SpoolUpload(root, upload_id, meta)
+
+
+_spool = None
+_spool_lock = threading.Lock()
+
+def get_spool():
+    global _spool
+    with _spool_lock:
+        if _spool is None:
+            _spool = UploadSpool()
+        return _spool